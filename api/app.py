@@ -1,152 +1,661 @@
 # ============================================================
-# APP PRINCIPAL DE LA ATS ANEIAP - VERSIÓN FLASK
+# APP PRINCIPAL DE LA ATS ANEIAP - SERVICIO ASÍNCRONO (FastAPI)
 # ============================================================
 
-from flask import Flask, render_template, request, send_file, redirect, url_for, jsonify
+import asyncio
+import json
+import multiprocessing
 import os
+import shutil
 import tempfile
-from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import Dict, Optional
+from urllib.parse import quote
+
+from fastapi import FastAPI, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from fastapi.templating import Jinja2Templates
 
 # ============================================================
 # IMPORTS DE MÓDULOS INTERNOS
 # ============================================================
-from utils.ocr import extract_text_with_ocr
-from utils.extractors import (
-    extract_profile_section_with_ocr,
-    extract_experience_section_with_ocr,
-    extract_event_section_with_ocr,
-    extract_attendance_section_with_ocr
+from utils.cache import private_dir
+from utils.indicators import get_indicator_index, start_index_watcher
+from utils.jobs import JobQueue, QueueFullError, DONE, FAILED
+from utils.ocr import OCR_WORKERS, start_ocr_service
+from utils.pipeline import StageTimer, analysis_task, init_analysis_worker, report_filename, write_report
+from utils.reports import get_report_store, parse_byte_range, start_report_sweeper
+from utils.results import lookup_result, store_result, wants_report
+from utils.uploads import (
+    UPLOAD_SPOOL_DIR, UploadTooLargeError, iter_batch_pdfs, receive_multipart, receive_multipart_files
 )
-from utils.indicators import calculate_all_indicators, calculate_indicators_for_report
-from utils.report_generator import analyze_and_generate_descriptive_report
-from utils.evaluation import evaluate_cv_presentation
-from utils.analysis import generate_extended_analysis
-from utils.helpers import load_json, clean_text, extract_candidate_data
 
 # ============================================================
-# CONFIGURACIÓN DE LA APLICACIÓN FLASK
+# CONFIGURACIÓN DE LA APLICACIÓN
+# ============================================================
+
+API_DIR = os.path.dirname(os.path.abspath(__file__))
+
+BACKEND_DIR = os.path.join(API_DIR, "..", "backend")
+INDICATORS_PATH = os.path.join(BACKEND_DIR, "indicators.json")
+ADVICE_PATH = os.path.join(BACKEND_DIR, "advice.json")
+UPLOAD_NAME = "cv.pdf"
+# Datos del reporte (JSON) y hash del PDF dibujado a partir de ellos en la primera
+# descarga; el PDF vive en el almacén de reportes
+REPORT_DATA_NAME = "report.json"
+REPORT_REF_NAME = "report.sha256"
+REPORT_CHUNK_SIZE = 64 * 1024
+REPORT_CACHE_CONTROL = "private, max-age=86400"
+REPORT_FORMATS = ("pdf", "json")
+
+# Procesos para OCR y coincidencias (CPU) e hilos para dibujar reportes
+ANALYSIS_WORKERS = int(os.environ.get("ANALYSIS_WORKERS", os.cpu_count() or 1))
+RENDER_WORKERS = int(os.environ.get("RENDER_WORKERS", "2"))
+EVENTS_POLL_INTERVAL = 0.25
+EVENTS_MAX_SECONDS = 600
+# Lotes (/analyze/batch): tamaño máximo por archivo recibido (p. ej. un ZIP),
+# PDFs por lote y PDFs en el pool a la vez por lote
+BATCH_MAX_MB = float(os.environ.get("BATCH_MAX_MB", "500"))
+BATCH_MAX_FILES = int(os.environ.get("BATCH_MAX_FILES", "500"))
+BATCH_IN_FLIGHT = int(os.environ.get("BATCH_IN_FLIGHT", str(2 * ANALYSIS_WORKERS)))
+# Tamaño máximo del campo `metadata` (JSON con los datos de cada archivo)
+BATCH_METADATA_MAX_KB = float(os.environ.get("BATCH_METADATA_MAX_KB", "1024"))
+
+templates = Jinja2Templates(directory=os.path.join(API_DIR, "..", "templates"))
+
+# Los trabajos los atienden las tareas asyncio de run_jobs() (claim/finish)
+job_queue = JobQueue()
+_job_available: Optional[asyncio.Event] = None
+_analysis_pool: Optional[ProcessPoolExecutor] = None
+_render_pool: Optional[ThreadPoolExecutor] = None
+# Reportes que se están dibujando (job_id -> tarea), para no dibujarlos dos veces
+_report_builds: Dict[str, asyncio.Future] = {}
+
+
+# ============================================================
+# EJECUCIÓN DE TRABAJOS (CPU fuera del event loop)
 # ============================================================
 
-app = Flask(__name__)
-app.config["UPLOAD_FOLDER"] = "uploads"
-os.makedirs(app.config["UPLOAD_FOLDER"], exist_ok=True)
+def save_report_data(job_dir, data):
+    with open(os.path.join(job_dir, REPORT_DATA_NAME), "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+
+
+async def run_job(job, analysis_pool):
+    """
+    Analiza el PDF en el pool de procesos y guarda el resultado estructurado.
+    El reporte PDF se dibuja después, solo si alguien lo descarga.
+    """
+    loop = asyncio.get_running_loop()
+    job_id, params, job_dir = job["job_id"], job["params"], job["job_dir"]
+    # Cargas pequeñas llegan en memoria; las grandes quedaron en la carpeta del trabajo
+    source = job["payload"] if job["payload"] is not None else os.path.join(job_dir, UPLOAD_NAME)
+    try:
+        result, data = await loop.run_in_executor(
+            analysis_pool, analysis_task, source, params, job_id, job_queue.path
+        )
+        if data is not None:
+            await run_in_threadpool(save_report_data, job_dir, data)
+    except Exception as e:
+        print(f"⚠️ Error en el trabajo {job_id}: {e}")
+        await run_in_threadpool(job_queue.finish, job_id, FAILED, None, str(e))
+    else:
+        await run_in_threadpool(job_queue.finish, job_id, DONE, result)
+        await run_in_threadpool(store_result, params, result, data)
+
+
+def save_report_ref(job_dir, digest):
+    with open(os.path.join(job_dir, REPORT_REF_NAME), "w") as f:
+        f.write(digest)
+
+
+def build_report(job):
+    """
+    Dibuja el PDF del trabajo a partir de sus datos guardados (en un hilo del
+    pool de reportes), lo guarda en el almacén y lo agrega a la caché de resultados.
+    """
+    store = get_report_store()
+    job_dir = job_queue.job_dir(job["job_id"])
+    with open(os.path.join(job_dir, REPORT_DATA_NAME), encoding="utf-8") as f:
+        data = json.load(f)
+    tmp_path = store.temp_path()
+    # La etapa "report" se suma a los tiempos del análisis y llega a los eventos del trabajo
+    timer = StageTimer(job_queue.event_sink(job["job_id"]), timings=(job["result"] or {}).get("timings_ms"))
+    try:
+        write_report(data, tmp_path, timer)
+        digest = store.put_file(tmp_path)
+    except BaseException:
+        store.discard(tmp_path)
+        raise
+    save_report_ref(job_dir, digest)
+    store_result(job["params"], job["result"], data, digest)
+    return digest
+
+
+def stored_report(job_dir) -> Optional[str]:
+    """
+    Hash del PDF del trabajo si sigue en el almacén.
+    """
+    try:
+        with open(os.path.join(job_dir, REPORT_REF_NAME)) as f:
+            digest = f.read().strip()
+    except OSError:
+        return None
+    return digest if get_report_store().get(digest) else None
+
+
+async def ensure_report(job) -> Optional[str]:
+    """
+    Retorna el hash del PDF del trabajo; lo dibuja la primera vez que se pide
+    (o de nuevo si el almacén ya lo borró). None si el trabajo no tiene
+    reporte (format=json o todos los cargos).
+    """
+    job_dir = job_queue.job_dir(job["job_id"])
+    digest = await run_in_threadpool(stored_report, job_dir)
+    if digest:
+        return digest
+    if not os.path.exists(os.path.join(job_dir, REPORT_DATA_NAME)):
+        return None
+    build = _report_builds.get(job["job_id"])
+    if build is None:
+        build = asyncio.get_running_loop().run_in_executor(_render_pool, build_report, job)
+        _report_builds[job["job_id"]] = build
+        build.add_done_callback(lambda _: _report_builds.pop(job["job_id"], None))
+    return await asyncio.shield(build)
+
+
+async def run_jobs(analysis_pool):
+    """
+    Toma trabajos de la cola y los ejecuta; espera un aviso de /analyze o
+    revisa de nuevo cada cierto tiempo (otros procesos comparten la cola).
+    """
+    while True:
+        job = await run_in_threadpool(job_queue.claim)
+        if job is None:
+            try:
+                await asyncio.wait_for(_job_available.wait(), job_queue.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+            _job_available.clear()
+            continue
+        await run_job(job, analysis_pool)
+
+
+@asynccontextmanager
+async def lifespan(app):
+    global _job_available, _analysis_pool, _render_pool
+    # Índice de indicadores y consejos construido una sola vez al arrancar;
+    # el vigilante lo recarga en caliente cuando cambian los JSON.
+    get_indicator_index(INDICATORS_PATH, ADVICE_PATH)
+    start_index_watcher()
+    # Borra periódicamente los reportes vencidos o que exceden el tamaño máximo
+    start_report_sweeper()
+
+    # Un solo pool OCR para todos los workers de análisis: sus páginas se
+    # reconocen en paralelo, con límite de pendientes y plazo por página
+    ocr_service = start_ocr_service() if OCR_WORKERS > 0 else None
+
+    _job_available = asyncio.Event()
+    _analysis_pool = analysis_pool = ProcessPoolExecutor(
+        max_workers=ANALYSIS_WORKERS,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=init_analysis_worker,
+        initargs=(ocr_service.address if ocr_service else None,),
+    )
+    _render_pool = ThreadPoolExecutor(max_workers=RENDER_WORKERS, thread_name_prefix="report")
+    runners = [asyncio.create_task(run_jobs(analysis_pool)) for _ in range(ANALYSIS_WORKERS)]
+    try:
+        yield
+    finally:
+        for runner in runners:
+            runner.cancel()
+        await asyncio.gather(*runners, return_exceptions=True)
+        analysis_pool.shutdown(wait=False, cancel_futures=True)
+        _render_pool.shutdown(wait=False, cancel_futures=True)
+        if ocr_service is not None:
+            ocr_service.shutdown()
+
+
+app = FastAPI(title="ATS ANEIAP", lifespan=lifespan)
+
+
+def error(message, status_code, headers=None):
+    return JSONResponse({"error": message}, status_code=status_code, headers=headers)
+
 
 # ============================================================
 # RUTA PRINCIPAL (FORMULARIO)
 # ============================================================
 
-@app.route("/", methods=["GET"])
-def home():
-    return render_template("index.html")  # formulario principal
+@app.get("/")
+async def home(request: Request):
+    return templates.TemplateResponse(request, "index.html")  # formulario principal
 
 
 # ============================================================
-# RUTA DE ANÁLISIS (PROCESA EL PDF Y GENERA EL REPORTE)
+# RUTA DE ANÁLISIS (ENCOLA EL PDF Y RETORNA EL ID DEL TRABAJO)
 # ============================================================
 
-@app.route("/analyze", methods=["POST"])
-def analyze():
+@app.post("/analyze")
+async def analyze(request: Request):
+    upload = None
     try:
         # ------------------------------
-        # 1️⃣  Capturar datos del formulario
+        # 1️⃣  Recibir el formulario en streaming: el PDF queda en memoria
+        #     (o en disco si es grande) y se calcula su hash mientras llega
         # ------------------------------
-        candidate_name = request.form.get("candidate_name")
-        chapter = request.form.get("chapter")
-        position = request.form.get("position")
-        pdf_file = request.files.get("pdf")
+        try:
+            form, upload, _ = await receive_multipart(
+                request.headers.get("content-type", ""), request.stream(), file_field="pdf"
+            )
+        except UploadTooLargeError as e:
+            return error(str(e), 413)
+        except ValueError as e:
+            return error(str(e), 400)
 
-        if not all([candidate_name, chapter, position, pdf_file]):
-            return jsonify({"error": "Faltan campos obligatorios."}), 400
+        candidate_name = form.get("candidate_name")
+        chapter = form.get("chapter")
+        position = form.get("position")
+        # Modo "todos los cargos": position=ALL o all_positions=1
+        all_positions = (
+            form.get("all_positions", "").lower() in ("1", "true", "on")
+            or (position or "").strip().upper() == "ALL"
+        )
+        if all_positions:
+            position = position or "ALL"
 
-        # ------------------------------
-        # 2️⃣  Guardar archivo temporalmente
-        # ------------------------------
-        temp_dir = tempfile.mkdtemp()
-        pdf_path = os.path.join(temp_dir, pdf_file.filename)
-        pdf_file.save(pdf_path)
+        if not all([candidate_name, chapter, position, upload and upload.size]):
+            return error("Faltan campos obligatorios.", 400)
+        # Capítulo y cargo se validan antes de encolar: uno desconocido no tiene indicadores
+        index = get_indicator_index()
+        if not index.has_chapter(chapter):
+            return error(f"Capítulo desconocido: {chapter}.", 400)
+        if not all_positions and not index.has_position(chapter, position):
+            return error(f"El cargo {position} no existe en el capítulo {chapter}.", 400)
+        # format=json: solo los números, sin preparar el reporte PDF
+        report_format = (form.get("format") or request.query_params.get("format") or "pdf").lower()
+        if report_format not in REPORT_FORMATS:
+            return error("format debe ser 'pdf' o 'json'.", 400)
 
-        # ------------------------------
-        # 3️⃣  Extraer texto del PDF
-        # ------------------------------
-        extracted_text = extract_text_with_ocr(pdf_path)
-        clean_extracted_text = clean_text(extracted_text)
+        params = {
+            "candidate_name": candidate_name,
+            "chapter": chapter,
+            "position": position,
+            "all_positions": all_positions,
+            "format": report_format,
+            "sha256": upload.digest,
+        }
 
         # ------------------------------
-        # 4️⃣  Extraer secciones específicas
+        # 2️⃣  Mismo PDF, capítulo, cargo y versión de indicadores: responder
+        #     con el resultado guardado, sin pasar por la cola
         # ------------------------------
-        profile_text = extract_profile_section_with_ocr(clean_extracted_text)
-        experience_text = extract_experience_section_with_ocr(clean_extracted_text)
-        event_text = extract_event_section_with_ocr(clean_extracted_text)
-        attendance_text = extract_attendance_section_with_ocr(clean_extracted_text)
+        cached = await run_in_threadpool(lookup_result, params, index.version)
+        if cached is not None:
+            result, data, digest = cached["result"], cached["report_data"], cached["report_digest"]
 
-        # ------------------------------
-        # 5️⃣  Calcular indicadores
-        # ------------------------------
-        indicators_results = calculate_all_indicators(
-            {
-                "Perfil": profile_text,
-                "Experiencia": experience_text,
-                "Eventos": event_text,
-                "Asistencia": attendance_text,
-            },
-            position,
-            chapter
-        )
+            def save_report(job_dir):
+                if not wants_report(params):
+                    return
+                save_report_data(job_dir, data)
+                # Si el almacén ya borró el PDF, se vuelve a dibujar desde sus datos al descargarlo
+                if digest and get_report_store().get(digest):
+                    save_report_ref(job_dir, digest)
 
-        indicator_percentages = calculate_indicators_for_report(indicators_results)
+            job_id = await run_in_threadpool(job_queue.record, params, result, save_report)
+            response = {
+                "job_id": job_id,
+                "status": DONE,
+                "cached": True,
+                "status_url": app.url_path_for("job_status", job_id=job_id),
+                "result_url": app.url_path_for("job_result", job_id=job_id),
+                "result": result,
+            }
+            if wants_report(params):
+                response["report_url"] = app.url_path_for("job_report", job_id=job_id)
+            return JSONResponse(response)
 
         # ------------------------------
-        # 6️⃣  Evaluar presentación del CV
+        # 3️⃣  Encolar el trabajo (SQLite en un hilo, sin bloquear el event loop)
         # ------------------------------
-        presentation_scores = evaluate_cv_presentation(clean_extracted_text)
+        try:
+            if upload.in_memory:
+                job_id = await run_in_threadpool(job_queue.submit, params, None, upload.getvalue())
+            else:
+                job_id = await run_in_threadpool(
+                    job_queue.submit, params, lambda job_dir: upload.move_to(os.path.join(job_dir, UPLOAD_NAME))
+                )
+        except QueueFullError as e:
+            return error(f"Servidor ocupado: {e} Intenta de nuevo más tarde.", 503, {"Retry-After": "30"})
+        _job_available.set()
 
         # ------------------------------
-        # 7️⃣  Generar análisis extendido
+        # 4️⃣  Retornar el id del trabajo y las rutas de consulta
         # ------------------------------
-        extended_analysis = generate_extended_analysis(
-            indicators_results, profile_text, experience_text
-        )
+        return JSONResponse({
+            "job_id": job_id,
+            "status": "queued",
+            "status_url": app.url_path_for("job_status", job_id=job_id),
+            "events_url": app.url_path_for("job_events", job_id=job_id),
+            "result_url": app.url_path_for("job_result", job_id=job_id),
+        }, status_code=202)
 
-        # ------------------------------
-        # 8️⃣  Generar reporte PDF
-        # ------------------------------
-        output_filename = f"Reporte_{candidate_name.replace(' ', '_')}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
-        output_path = os.path.join(app.config["UPLOAD_FOLDER"], output_filename)
-
-        analyze_and_generate_descriptive_report(
-            candidate_name=candidate_name,
-            position=position,
-            chapter=chapter,
-            pdf_path=pdf_path,
-            indicator_percentages=indicator_percentages,
-            presentation_scores=presentation_scores,
-            extended_analysis=extended_analysis,
-            output_path=output_path
+    except Exception as e:
+        return error(str(e), 500)
+    finally:
+        if upload is not None:
+            upload.close()
+
+
+# ============================================================
+# RUTA DE ANÁLISIS POR LOTES (NDJSON, UNA LÍNEA POR HOJA DE VIDA)
+# ============================================================
+
+def batch_metadata(form) -> Dict[str, Dict[str, str]]:
+    """
+    Metadatos por archivo del campo `metadata` (JSON): un objeto
+    {nombre: {"chapter", "position", "candidate_name"}} o una lista de objetos
+    con "file". Lanza ValueError si no se puede leer.
+    """
+    raw = form.get("metadata")
+    if not raw:
+        return {}
+    try:
+        data = json.loads(raw)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"metadata no es un JSON válido: {e}")
+    if isinstance(data, list):
+        data = {item.get("file"): item for item in data if isinstance(item, dict)}
+    if not isinstance(data, dict):
+        raise ValueError("metadata debe ser un objeto o una lista de objetos.")
+    return {str(name): meta for name, meta in data.items() if isinstance(meta, dict)}
+
+
+def batch_params(name, form, metadata) -> Dict[str, object]:
+    """
+    Parámetros de análisis de un PDF del lote: sus metadatos (por ruta o por
+    nombre del archivo) y, si faltan, los campos generales del formulario.
+    """
+    meta = metadata.get(name) or metadata.get(os.path.basename(name)) or {}
+    position = meta.get("position") or form.get("position")
+    all_positions = (position or "").strip().upper() == "ALL"
+    return {
+        "candidate_name": meta.get("candidate_name") or os.path.splitext(os.path.basename(name))[0],
+        "chapter": meta.get("chapter") or form.get("chapter"),
+        "position": position,
+        "all_positions": all_positions,
+        "format": "json",
+    }
+
+
+def discard_file(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+@app.post("/analyze/batch")
+async def analyze_batch(request: Request):
+    """
+    Recibe varios PDFs (campo `pdf` repetido) o ZIPs (campo `archive`), con
+    capítulo y cargo generales y/o `metadata` por archivo. Los analiza en el
+    pool de procesos y responde en NDJSON una línea por hoja de vida apenas
+    termina cada una. Los archivos van a disco y se procesan de a unos pocos,
+    así la memoria no crece con el tamaño del lote.
+    """
+    private_dir(UPLOAD_SPOOL_DIR)
+    batch_dir = tempfile.mkdtemp(prefix="batch_", dir=UPLOAD_SPOOL_DIR)
+    try:
+        form, files = await receive_multipart_files(
+            request.headers.get("content-type", ""), request.stream(), batch_dir,
+            max_size=int(BATCH_MAX_MB * 1024 * 1024), max_files=BATCH_MAX_FILES,
+            max_field_size=int(BATCH_METADATA_MAX_KB * 1024),
         )
+        metadata = batch_metadata(form)
+        if not files:
+            raise ValueError("No se recibió ningún archivo (campos 'pdf' o 'archive').")
+    except UploadTooLargeError as e:
+        shutil.rmtree(batch_dir, ignore_errors=True)
+        return error(str(e), 413)
+    except ValueError as e:
+        shutil.rmtree(batch_dir, ignore_errors=True)
+        return error(str(e), 400)
+    except BaseException:
+        shutil.rmtree(batch_dir, ignore_errors=True)
+        raise
 
-        # ------------------------------
-        # 9️⃣  Retornar éxito y enlace de descarga
-        # ------------------------------
-        return render_template("result.html",
-                               candidate_name=candidate_name,
-                               position=position,
-                               chapter=chapter,
-                               report_path=url_for("download", filename=output_filename))
+    version = get_indicator_index().version
+    pdfs = iter_batch_pdfs(files, batch_dir, max_files=BATCH_MAX_FILES)
+
+    async def analyze_one(item, params):
+        try:
+            result, _ = await asyncio.get_running_loop().run_in_executor(
+                _analysis_pool, analysis_task, item["path"], params
+            )
+        except Exception as e:
+            return item, params, None, str(e)
+        await run_in_threadpool(store_result, params, result)
+        return item, params, result, None
+
+    def line(item, params, result=None, error_message=None, cached=False):
+        record = {"file": item["name"], "status": FAILED if error_message else DONE}
+        if params:
+            record.update(candidate_name=params["candidate_name"], chapter=params["chapter"],
+                          position=params["position"])
+        if item.get("sha256"):
+            record["sha256"] = item["sha256"]
+        if error_message:
+            record["error"] = error_message
+        else:
+            record["result"] = result
+            record["cached"] = cached
+        return json.dumps(record, ensure_ascii=False) + "\n"
+
+    async def stream():
+        in_flight = set()
+        exhausted = False
+        try:
+            while True:
+                # Llenar el pool sin pasar de BATCH_IN_FLIGHT (el ZIP se extrae de a un PDF)
+                while not exhausted and len(in_flight) < BATCH_IN_FLIGHT:
+                    item = await run_in_threadpool(next, pdfs, None)
+                    if item is None:
+                        exhausted = True
+                        break
+                    if "error" in item:
+                        yield line(item, None, error_message=item["error"])
+                        continue
+                    params = batch_params(item["name"], form, metadata)
+                    if not params["chapter"] or not params["position"]:
+                        await run_in_threadpool(discard_file, item["path"])
+                        yield line(item, params, error_message="Faltan capítulo o cargo para este archivo.")
+                        continue
+                    params["sha256"] = item["sha256"]
+                    cached = await run_in_threadpool(lookup_result, params, version)
+                    if cached is not None:
+                        await run_in_threadpool(discard_file, item["path"])
+                        yield line(item, params, cached["result"], cached=True)
+                        continue
+                    in_flight.add(asyncio.ensure_future(analyze_one(item, params)))
+                if not in_flight:
+                    return
+                done, in_flight = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    item, params, result, error_message = task.result()
+                    await run_in_threadpool(discard_file, item["path"])
+                    yield line(item, params, result, error_message)
+                if await request.is_disconnected():
+                    return
+        finally:
+            for task in in_flight:
+                task.cancel()
+            pdfs.close()
+            for _, upload in files:
+                upload.close()
+            await run_in_threadpool(shutil.rmtree, batch_dir, True)
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
 
+
+# ============================================================
+# RUTAS DE ESTADO Y RESULTADO DE LOS TRABAJOS
+# ============================================================
+
+def _public_job(job):
+    return {key: job[key] for key in ("job_id", "status", "stage", "progress", "error", "queue_position") if key in job}
+
+
+@app.get("/jobs/{job_id}")
+def job_status(job_id: str):
+    job = job_queue.get(job_id)
+    if job is None:
+        return error("Trabajo no encontrado.", 404)
+    return _public_job(job)
+
+
+@app.get("/jobs/{job_id}/events")
+async def job_events(job_id: str, request: Request, format: str = "sse", after: int = 0):
+    """
+    Transmite los eventos de avance del trabajo a medida que ocurren (una etapa
+    o página por evento, con sus tiempos) y termina con el estado final.
+    Por defecto usa Server-Sent Events; con ?format=ndjson, una línea JSON por evento.
+    """
+    if await run_in_threadpool(job_queue.get, job_id) is None:
+        return error("Trabajo no encontrado.", 404)
+    ndjson = format == "ndjson"
+    after = int(request.headers.get("last-event-id") or after)
+
+    def encode(name, data, seq=None):
+        if ndjson:
+            return json.dumps(dict(data, event=name)) + "\n"
+        head = f"id: {seq}\n" if seq is not None else ""
+        return f"{head}event: {name}\ndata: {json.dumps(data)}\n\n"
+
+    async def stream():
+        last_seq = after
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + EVENTS_MAX_SECONDS
+        while loop.time() < deadline:
+            job = await run_in_threadpool(job_queue.get, job_id)
+            for event in await run_in_threadpool(job_queue.events, job_id, last_seq):
+                last_seq = event["seq"]
+                yield encode("progress", event, last_seq)
+            if job is None or job["status"] in (DONE, FAILED):
+                final = _public_job(job) if job else {"status": "expired"}
+                if job and job["status"] == DONE:
+                    final["result_url"] = app.url_path_for("job_result", job_id=job_id)
+                    final["timings_ms"] = (job["result"] or {}).get("timings_ms")
+                yield encode(final["status"], final)
+                return
+            if await request.is_disconnected():
+                return
+            await asyncio.sleep(EVENTS_POLL_INTERVAL)
+
+    media_type = "application/x-ndjson" if ndjson else "text/event-stream"
+    return StreamingResponse(stream(), media_type=media_type,
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
+@app.get("/jobs/{job_id}/result")
+def job_result(job_id: str):
+    job = job_queue.get(job_id)
+    if job is None:
+        return error("Trabajo no encontrado.", 404)
+    if job["status"] == FAILED:
+        return JSONResponse(_public_job(job), status_code=500)
+    if job["status"] != DONE:
+        return JSONResponse(_public_job(job), status_code=202)
+
+    result = dict(job["result"])
+    if wants_report(job["params"]):
+        result["report_url"] = app.url_path_for("job_report", job_id=job_id)
+    return result
+
+
+@app.get("/jobs/{job_id}/report")
+async def job_report(job_id: str, request: Request):
+    """
+    Descarga el reporte PDF; la primera descarga lo dibuja a partir de los
+    datos guardados y las siguientes reutilizan el archivo del almacén.
+    """
+    job = await run_in_threadpool(job_queue.get, job_id)
+    if job is None or job["status"] != DONE or not wants_report(job["params"]):
+        return error("Reporte no disponible.", 404)
+    try:
+        digest = await ensure_report(job)
     except Exception as e:
-        return jsonify({"error": str(e)}), 500
+        print(f"⚠️ Error al generar el reporte del trabajo {job_id}: {e}")
+        return error("No se pudo generar el reporte.", 500)
+    if digest is None:
+        return error("Reporte no disponible.", 404)
+    return await run_in_threadpool(
+        report_response, request, digest, report_filename(job["params"]["candidate_name"])
+    )
 
 
 # ============================================================
-# RUTA DE DESCARGA DEL REPORTE
+# RUTA DE DESCARGA DEL REPORTE (ALMACÉN POR HASH)
 # ============================================================
 
-@app.route("/download/<filename>")
-def download(filename):
-    file_path = os.path.join(app.config["UPLOAD_FOLDER"], filename)
-    if os.path.exists(file_path):
-        return send_file(file_path, as_attachment=True)
-    return jsonify({"error": "Archivo no encontrado."}), 404
+def report_response(request: Request, digest: str, filename: Optional[str] = None) -> Response:
+    """
+    Respuesta de descarga de un reporte del almacén con ETag (el hash),
+    If-None-Match (304) y Range de un solo tramo (206 / 416).
+    """
+    path = get_report_store().get(digest)
+    if path is None:
+        return error("Archivo no encontrado.", 404)
+    etag = f'"{digest}"'
+    headers = {"ETag": etag, "Accept-Ranges": "bytes", "Cache-Control": REPORT_CACHE_CONTROL}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and (if_none_match.strip() == "*" or etag in [t.strip() for t in if_none_match.split(",")]):
+        return Response(status_code=304, headers=headers)
+
+    # El archivo se abre antes de responder: si el sweeper lo borra, la descarga sigue
+    f = open(path, "rb")
+    size = os.fstat(f.fileno()).st_size
+    byte_range = None
+    if request.headers.get("if-range", etag) == etag:
+        try:
+            byte_range = parse_byte_range(request.headers.get("range"), size)
+        except ValueError:
+            f.close()
+            return Response(status_code=416, headers=dict(headers, **{"Content-Range": f"bytes */{size}"}))
+    start, end = byte_range or (0, size - 1)
+
+    def chunks():
+        with f:
+            f.seek(start)
+            remaining = end - start + 1
+            while remaining > 0:
+                chunk = f.read(min(REPORT_CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                yield chunk
+
+    headers["Content-Length"] = str(end - start + 1)
+    if filename:
+        headers["Content-Disposition"] = f"attachment; filename*=utf-8''{quote(filename)}"
+    if byte_range:
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    return StreamingResponse(chunks(), status_code=206 if byte_range else 200,
+                             media_type="application/pdf", headers=headers)
+
+
+@app.get("/download/{filename}")
+def download(filename: str, request: Request):
+    """
+    Descarga un reporte por su nombre en el almacén (`<sha256>.pdf`).
+    """
+    digest = os.path.basename(filename)
+    if digest.endswith(".pdf"):
+        digest = digest[:-4]
+    return report_response(request, digest)
 
 
 # ============================================================
@@ -154,4 +663,6 @@ def download(filename):
 # ============================================================
 
 if __name__ == "__main__":
-    app.run(debug=True)
+    import uvicorn
+
+    uvicorn.run("app:app", reload=True)
@@ -0,0 +1,4 @@
+# Punto de entrada ASGI: uvicorn main:app
+from app import app
+
+__all__ = ["app"]
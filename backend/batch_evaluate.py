@@ -0,0 +1,324 @@
+# ============================================================
+# EVALUACIÓN MASIVA DE HOJAS DE VIDA (LÍNEA DE COMANDOS)
+# ============================================================
+# Uso (desde backend/):
+#   python batch_evaluate.py <carpeta_pdfs> <mapeo.csv> -o resultados.jsonl
+#   python batch_evaluate.py <carpeta_pdfs> <mapeo.csv> -o resultados.csv --reports reportes/
+#
+# El CSV de mapeo trae una fila por hoja de vida con las columnas
+# archivo, capitulo, cargo y (opcional) nombre; también se aceptan
+# file, chapter, position y candidate_name. cargo=ALL puntúa todos los cargos
+# (sin reporte PDF). Las filas con capítulo o cargo desconocido se anotan como
+# inválidas sin analizarlas.
+# Si la ejecución se interrumpe, al repetir el mismo comando se retoma desde el
+# punto de control sin volver a procesar los archivos ya terminados.
+
+import argparse
+import csv
+import json
+import multiprocessing
+import os
+import re
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Any, Dict, Iterator, List, Optional, Set
+
+from utils.indicators import ADVICE_PATH, INDICATORS_PATH, IndicatorIndex, get_indicator_index
+from utils.ocr import OCR_WORKERS, start_ocr_service
+from utils.pipeline import analyze_cv, init_analysis_worker, report_data, write_report
+
+# ============================================================
+# 🔹 CONFIGURACIÓN
+# ============================================================
+COLUMN_ALIASES = {
+    "file": ("archivo", "file", "pdf"),
+    "chapter": ("capitulo", "capítulo", "chapter"),
+    "position": ("cargo", "position"),
+    "candidate_name": ("nombre", "candidate_name", "candidato"),
+}
+CSV_FIELDS = [
+    "file", "candidate_name", "chapter", "position", "status", "error",
+    "average_percentage", "presentation_score", "indicators", "report", "indicators_version", "elapsed_ms",
+]
+# Tareas en vuelo por proceso: mantiene ocupados los núcleos sin cargar todo el lote
+IN_FLIGHT_PER_WORKER = 2
+
+
+# ============================================================
+# 🔹 LECTURA DEL MAPEO Y PUNTO DE CONTROL
+# ============================================================
+def read_mapping(path: str, index: Optional[IndicatorIndex] = None) -> List[Dict[str, str]]:
+    """
+    Lee el CSV de mapeo y retorna [{"file", "chapter", "position", "candidate_name"}]
+    con capítulo y cargo en mayúsculas. Si recibe `index`, las filas con capítulo
+    o cargo desconocido traen además "error".
+    """
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        reader = csv.DictReader(f)
+        headers = {name.strip().lower(): name for name in reader.fieldnames or []}
+        columns = {}
+        for key, aliases in COLUMN_ALIASES.items():
+            columns[key] = next((headers[a] for a in aliases if a in headers), None)
+        missing = [key for key in ("file", "chapter", "position") if columns[key] is None]
+        if missing:
+            raise ValueError(f"El CSV de mapeo no tiene las columnas: {', '.join(missing)}.")
+
+        rows = []
+        for row in reader:
+            entry = {key: (row.get(column) or "").strip() if column else "" for key, column in columns.items()}
+            if not entry["file"]:
+                continue
+            entry["candidate_name"] = entry["candidate_name"] or os.path.splitext(os.path.basename(entry["file"]))[0]
+            entry["chapter"] = entry["chapter"].upper()
+            entry["position"] = entry["position"].upper()
+            if index is not None:
+                error = mapping_error(entry, index)
+                if error:
+                    entry["error"] = error
+            rows.append(entry)
+        return rows
+
+
+def mapping_error(task: Dict[str, str], index: IndicatorIndex) -> Optional[str]:
+    """
+    Motivo por el que la fila no se puede evaluar, o None si es válida.
+    """
+    if not index.has_chapter(task["chapter"]):
+        return f"Capítulo desconocido: {task['chapter'] or '(vacío)'}."
+    if task["position"] != "ALL" and not index.has_position(task["chapter"], task["position"]):
+        return f"El cargo {task['position'] or '(vacío)'} no existe en el capítulo {task['chapter']}."
+    return None
+
+
+def invalid_row(task: Dict[str, str]) -> Dict[str, Any]:
+    """
+    Fila de resultado de una entrada del mapeo que no se analiza.
+    """
+    row = {key: task[key] for key in ("file", "candidate_name", "chapter", "position")}
+    row.update(status="invalid", error=task["error"], elapsed_ms=0.0)
+    return row
+
+
+def task_key(task: Dict[str, str]) -> str:
+    return "|".join((task["file"], task["chapter"].strip().upper(), task["position"].strip().upper()))
+
+
+def load_checkpoint(path: str) -> Set[str]:
+    """
+    Claves (archivo|capítulo|cargo) ya terminadas en una ejecución anterior.
+    """
+    if not os.path.exists(path):
+        return set()
+    with open(path, encoding="utf-8") as f:
+        return {line.rstrip("\n") for line in f if line.strip()}
+
+
+# ============================================================
+# 🔹 TRABAJO DE CADA PROCESO
+# ============================================================
+def init_batch_worker(indicators_path: str, advice_path: str, ocr_address=None):
+    """
+    Prepara un proceso del pool: OCR por el servicio compartido (o en el mismo
+    proceso con OCR_WORKERS=0) e índice cargado una vez.
+    """
+    init_analysis_worker(ocr_address)
+    get_indicator_index(indicators_path, advice_path)
+
+
+def evaluate_one(task: Dict[str, str], cvs_dir: str, reports_dir: Optional[str]) -> Dict[str, Any]:
+    """
+    Evalúa una hoja de vida y retorna la fila de resultado (nunca lanza excepción).
+    """
+    started = time.perf_counter()
+    row: Dict[str, Any] = {
+        "file": task["file"],
+        "candidate_name": task["candidate_name"],
+        "chapter": task["chapter"],
+        "position": task["position"],
+        "status": "ok",
+        "error": None,
+    }
+    all_positions = task["position"].strip().upper() == "ALL"
+    pdf_path = os.path.join(cvs_dir, task["file"])
+    try:
+        if not os.path.isfile(pdf_path):
+            raise FileNotFoundError(f"No existe el archivo {pdf_path}.")
+        index = get_indicator_index()
+        _, result = analyze_cv(pdf_path, task["candidate_name"], task["chapter"],
+                               task["position"], all_positions=all_positions, index=index)
+        if reports_dir and not all_positions:
+            # Nombre estable por archivo y cargo: al retomar no se duplican reportes
+            stem = os.path.splitext(task["file"])[0]
+            filename = re.sub(r"[^\w\-]", "_", f"Reporte_{stem}_{task['position']}") + ".pdf"
+            write_report(report_data(result, index), os.path.join(reports_dir, filename))
+            result["report_filename"] = filename
+        row["result"] = result
+    except Exception as e:
+        row["status"] = "error"
+        row["error"] = str(e)
+    row["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    return row
+
+
+# ============================================================
+# 🔹 SALIDA EN STREAMING (JSONL O CSV)
+# ============================================================
+def csv_row(row: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Aplana una fila para el CSV: promedio de indicadores, puntaje de presentación
+    y los porcentajes (o la tabla de cargos) como JSON.
+    """
+    result = row.get("result") or {}
+    flat = {key: row.get(key) for key in ("file", "candidate_name", "chapter", "position", "status", "error",
+                                          "elapsed_ms")}
+    flat["indicators_version"] = result.get("indicators_version")
+    flat["report"] = result.get("report_filename")
+    percentages = result.get("indicator_percentages")
+    if percentages:
+        values = [v["percentage"] for v in percentages.values()]
+        flat["average_percentage"] = round(sum(values) / len(values), 2)
+        flat["indicators"] = json.dumps(
+            {name: round(v["percentage"], 2) for name, v in percentages.items()}, ensure_ascii=False
+        )
+    elif "ranking" in result:
+        flat["indicators"] = json.dumps(result["ranking"], ensure_ascii=False)
+    flat["presentation_score"] = (result.get("presentation_scores") or {}).get("overall_score")
+    return flat
+
+
+class ResultWriter:
+    """
+    Escribe cada fila apenas termina (JSONL o CSV según la extensión) y anota
+    su clave en el punto de control solo después de escribirla.
+    """
+
+    def __init__(self, output_path: str, checkpoint_path: str):
+        self.csv = output_path.lower().endswith(".csv")
+        new_file = not os.path.exists(output_path) or os.path.getsize(output_path) == 0
+        self._out = open(output_path, "a", newline="" if self.csv else None, encoding="utf-8")
+        self._checkpoint = open(checkpoint_path, "a", encoding="utf-8")
+        self._csv_writer = csv.DictWriter(self._out, fieldnames=CSV_FIELDS) if self.csv else None
+        if self.csv and new_file:
+            self._csv_writer.writeheader()
+
+    def write(self, key: str, row: Dict[str, Any]):
+        if self.csv:
+            self._csv_writer.writerow(csv_row(row))
+        else:
+            self._out.write(json.dumps(row, ensure_ascii=False) + "\n")
+        self._out.flush()
+        # Los errores no se marcan: se reintentan al retomar. Las filas inválidas sí:
+        # corregir el capítulo o el cargo en el mapeo cambia su clave
+        if row["status"] in ("ok", "invalid"):
+            self._checkpoint.write(key + "\n")
+            self._checkpoint.flush()
+
+    def close(self):
+        self._out.close()
+        self._checkpoint.close()
+
+
+# ============================================================
+# 🔹 EJECUCIÓN DEL LOTE
+# ============================================================
+def iter_results(tasks: List[Dict[str, str]], cvs_dir: str, reports_dir: Optional[str], workers: int,
+                 indicators_path: str, advice_path: str) -> Iterator[Dict[str, Any]]:
+    """
+    Reparte las hojas de vida entre `workers` procesos y entrega cada resultado
+    apenas termina (no en el orden del CSV), con pocas tareas en vuelo a la vez.
+    """
+    pending_tasks = iter(tasks)
+    # Las páginas escaneadas de todos los procesos comparten un pool OCR
+    ocr_service = start_ocr_service() if OCR_WORKERS > 0 else None
+    try:
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=init_batch_worker,
+            initargs=(indicators_path, advice_path, ocr_service.address if ocr_service else None),
+        ) as pool:
+            in_flight = set()
+
+            def fill():
+                while len(in_flight) < workers * IN_FLIGHT_PER_WORKER:
+                    task = next(pending_tasks, None)
+                    if task is None:
+                        return
+                    in_flight.add(pool.submit(evaluate_one, task, cvs_dir, reports_dir))
+
+            fill()
+            while in_flight:
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    in_flight.discard(future)
+                    yield future.result()
+                fill()
+    finally:
+        if ocr_service is not None:
+            ocr_service.shutdown()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Evalúa en lote una carpeta de hojas de vida ANEIAP.")
+    parser.add_argument("cvs_dir", help="Carpeta con las hojas de vida en PDF.")
+    parser.add_argument("mapping", help="CSV con archivo, capitulo, cargo y (opcional) nombre.")
+    parser.add_argument("-o", "--output", default="resultados.jsonl",
+                        help="Archivo de resultados (.jsonl o .csv); se agregan filas al retomar.")
+    parser.add_argument("--checkpoint", help="Punto de control (por defecto <output>.checkpoint).")
+    parser.add_argument("--reports", help="Carpeta donde generar los reportes PDF (opcional).")
+    parser.add_argument("-w", "--workers", type=int, default=os.cpu_count() or 1, help="Procesos en paralelo.")
+    parser.add_argument("--indicators", default=INDICATORS_PATH, help="Ruta de indicators.json.")
+    parser.add_argument("--advice", default=ADVICE_PATH, help="Ruta de advice.json.")
+    args = parser.parse_args(argv)
+
+    try:
+        index = get_indicator_index(args.indicators, args.advice)
+        tasks = read_mapping(args.mapping, index)
+    except (OSError, ValueError) as e:
+        print(f"⚠️ {e}", file=sys.stderr)
+        return 2
+
+    checkpoint_path = args.checkpoint or args.output + ".checkpoint"
+    finished = load_checkpoint(checkpoint_path)
+    tasks = [task for task in tasks if task_key(task) not in finished]
+    invalid = [task for task in tasks if task.get("error")]
+    tasks = [task for task in tasks if not task.get("error")]
+    for task in invalid:
+        print(f"⚠️ Fila inválida {task['file']}: {task['error']}", file=sys.stderr)
+    if args.reports:
+        os.makedirs(args.reports, exist_ok=True)
+        no_report = [task["file"] for task in tasks if task["position"] == "ALL"]
+        if no_report:
+            print(f"⚠️ {len(no_report)} filas con cargo=ALL no generan reporte PDF: {', '.join(no_report)}",
+                  file=sys.stderr)
+    print(f"📄 {len(tasks)} hojas de vida por evaluar ({len(finished)} ya terminadas, {len(invalid)} inválidas).",
+          file=sys.stderr)
+
+    writer = ResultWriter(args.output, checkpoint_path)
+    started = time.perf_counter()
+    errors = len(invalid)
+    try:
+        for task in invalid:
+            writer.write(task_key(task), invalid_row(task))
+        results = iter_results(tasks, args.cvs_dir, args.reports, max(1, args.workers),
+                               args.indicators, args.advice)
+        for count, row in enumerate(results, 1):
+            writer.write(task_key(row), row)
+            if row["status"] == "ok":
+                print(f"✅ [{count}/{len(tasks)}] {row['file']} ({row['elapsed_ms']:.0f} ms)", file=sys.stderr)
+            else:
+                errors += 1
+                print(f"⚠️ [{count}/{len(tasks)}] {row['file']}: {row['error']}", file=sys.stderr)
+    except KeyboardInterrupt:
+        print("⏸️ Interrumpido; vuelve a ejecutar el mismo comando para retomar.", file=sys.stderr)
+        return 130
+    finally:
+        writer.close()
+
+    print(f"🏁 Terminado en {time.perf_counter() - started:.1f} s ({errors} con error).", file=sys.stderr)
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
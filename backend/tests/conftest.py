@@ -0,0 +1,10 @@
+# conftest.py
+import os
+import sys
+import tempfile
+
+# Los módulos se importan como desde backend/ (`from utils...`, `import batch_evaluate`)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+# Cachés y artefactos de las pruebas fuera de la caché del usuario
+os.environ.setdefault("EVALHV_CACHE_DIR", tempfile.mkdtemp(prefix="evalhv-tests-"))
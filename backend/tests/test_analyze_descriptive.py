@@ -0,0 +1,33 @@
+# test_analyze_descriptive.py
+import importlib.util
+import os
+from importlib.machinery import SourceFileLoader
+
+import fitz
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+SCRIPT = os.path.join(BACKEND_DIR, "utils", "analyze-descriptive")
+BACKGROUND = os.path.join(BACKEND_DIR, "assets", "Fondo reporte.png")
+
+
+def test_descriptive_report_renders(tmp_path):
+    # El script no tiene extensión .py: se carga indicando el cargador
+    loader = SourceFileLoader("analyze_descriptive", SCRIPT)
+    script = importlib.util.module_from_spec(importlib.util.spec_from_loader(loader.name, loader))
+    loader.exec_module(script)
+    cv_path = tmp_path / "cv.pdf"
+    doc = fitz.open()
+    page = doc.new_page()
+    for i, line in enumerate(["PERFIL", "Estudiante de ingeniería", "EXPERIENCIA EN ANEIAP",
+                              "Director de capítulo", "Diseño académico de talleres"]):
+        page.insert_text((72, 72 + 20 * i), line, fontname="helv", fontsize=11)
+    doc.save(str(cv_path))
+    doc.close()
+
+    output = script.analyze_and_generate_descriptive_report_with_background(
+        str(cv_path), "Ana <b> & Co", "DCA", "UNIGUAJIRA", BACKGROUND, str(tmp_path / "reporte.pdf")
+    )
+    with fitz.open(output) as report:
+        text = "".join(page.get_text() for page in report)
+    assert "Resultados de Indicadores" in text
+    assert "Ana <b> & Co" in text
@@ -0,0 +1,49 @@
+# test_batch_evaluate.py
+from batch_evaluate import ResultWriter, load_checkpoint, read_mapping, task_key
+from utils.indicators import IndicatorIndex
+
+INDICATORS = {"UNIGUAJIRA": {"DCA": {"Diseño académico": ["diseño"]}}}
+
+
+def write_mapping(path, rows):
+    path.write_text("archivo,capitulo,cargo\n" + "".join(f"{row}\n" for row in rows), encoding="utf-8")
+    return str(path)
+
+
+def test_task_key_ignores_case_and_spaces():
+    assert task_key({"file": "a.pdf", "chapter": " uniguajira", "position": "dca "}) == "a.pdf|UNIGUAJIRA|DCA"
+
+
+def test_load_checkpoint_missing_file_is_empty(tmp_path):
+    assert load_checkpoint(str(tmp_path / "no_existe.checkpoint")) == set()
+
+
+def test_resume_skips_finished_and_invalid_rows_but_retries_errors(tmp_path):
+    index = IndicatorIndex(INDICATORS, "test")
+    mapping = write_mapping(tmp_path / "mapeo.csv", [
+        "a.pdf,uniguajira,dca", "b.pdf,UNIGUAJIRA,DCA", "c.pdf,XYZ,DCA", "d.pdf,UNIGUAJIRA,all",
+    ])
+    tasks = read_mapping(mapping, index)
+    assert [task["file"] for task in tasks if "error" in task] == ["c.pdf"]
+    assert tasks[0]["chapter"] == "UNIGUAJIRA" and tasks[0]["position"] == "DCA"
+    assert "error" not in tasks[3]
+
+    checkpoint = str(tmp_path / "out.jsonl.checkpoint")
+    writer = ResultWriter(str(tmp_path / "out.jsonl"), checkpoint)
+    base = {"candidate_name": "x", "error": None, "elapsed_ms": 1.0}
+    writer.write(task_key(tasks[0]), dict(base, file="a.pdf", status="ok"))
+    writer.write(task_key(tasks[1]), dict(base, file="b.pdf", status="error"))
+    writer.write(task_key(tasks[2]), dict(base, file="c.pdf", status="invalid"))
+    writer.close()
+
+    finished = load_checkpoint(checkpoint)
+    remaining = [task["file"] for task in read_mapping(mapping, index) if task_key(task) not in finished]
+    assert remaining == ["b.pdf", "d.pdf"]
+
+
+def test_fixed_mapping_row_gets_a_new_key(tmp_path):
+    index = IndicatorIndex(INDICATORS, "test")
+    invalid = read_mapping(write_mapping(tmp_path / "m1.csv", ["c.pdf,XYZ,DCA"]), index)[0]
+    fixed = read_mapping(write_mapping(tmp_path / "m2.csv", ["c.pdf,uniguajira,DCA"]), index)[0]
+    assert "error" in invalid and "error" not in fixed
+    assert task_key(invalid) != task_key(fixed)
@@ -0,0 +1,109 @@
+# test_cache.py
+import time
+
+import fitz
+import pytest
+
+from utils import cache
+from utils.cache import DiskCache
+from utils.ocr import OCR_REGION_CONFIG, image_cache_key, page_cache_key
+
+VALUE = b"x" * 1000
+
+
+def accessed(store, key):
+    return store._connect().execute("SELECT accessed FROM entries WHERE key = ?", (key,)).fetchone()[0]
+
+
+@pytest.fixture
+def store(tmp_path):
+    return DiskCache(str(tmp_path / "cache.sqlite3"), max_bytes=2500)
+
+
+def test_least_recently_used_entry_is_evicted(store, monkeypatch):
+    monkeypatch.setattr(cache, "ACCESS_RESOLUTION", 0)
+    store.set("a", VALUE)
+    store.set("b", VALUE)
+    time.sleep(0.01)
+    assert store.get("a") == VALUE
+    store.set("c", VALUE)
+
+    assert store.get("b") is None
+    assert store.get("a") == VALUE and store.get("c") == VALUE
+    assert store.stats()["bytes"] <= store.max_bytes
+
+
+def test_running_size_catches_writes_from_other_instances(store, monkeypatch):
+    monkeypatch.setattr(cache, "SIZE_CHECK_EVERY", 2)
+    other = DiskCache(store.path, max_bytes=store.max_bytes)
+    store.set("a", VALUE)
+    other.set("b", VALUE)
+    other.set("c", VALUE)
+    # La estimación de `store` no ve las escrituras de `other` hasta la siguiente suma
+    store.set("d", VALUE)
+    assert store.stats()["entries"] == 3
+    store.set("e", VALUE)
+
+    stats = store.stats()
+    assert stats["entries"] == 2
+    assert stats["bytes"] <= store.max_bytes
+    assert store.get("d") == VALUE and store.get("e") == VALUE
+
+
+def test_hits_do_not_write_until_the_batch_is_full(store, monkeypatch):
+    monkeypatch.setattr(cache, "ACCESS_RESOLUTION", 0)
+    monkeypatch.setattr(cache, "TOUCH_BATCH", 2)
+    store.set("a", VALUE)
+    store.set("b", VALUE)
+    before = accessed(store, "a")
+    time.sleep(0.01)
+
+    store.get("a")
+    assert accessed(store, "a") == before
+    store.get("b")
+    assert accessed(store, "a") > before
+
+
+def test_recently_used_entry_is_not_touched(store):
+    store.set("a", VALUE)
+    store.get("a")
+    assert store._touched == {}
+    assert store.stats()["hits"] == 1
+
+
+def test_expired_entries_are_misses(tmp_path):
+    store = DiskCache(str(tmp_path / "ttl.sqlite3"), max_bytes=10_000, ttl=-1)
+    store.set("a", VALUE)
+    assert store.get("a") is None
+    assert store.stats()["misses"] == 1
+
+
+def test_oversized_value_is_not_stored(store):
+    store.set("big", b"x" * 5000)
+    assert store.get("big") is None
+
+
+def scanned_page(text):
+    doc = fitz.open()
+    page = doc.new_page()
+    page.insert_text((72, 72), text, fontsize=11)
+    return doc, page
+
+
+def test_page_key_follows_content_and_ocr_settings():
+    _, page = scanned_page("Ingeniera industrial")
+    _, same = scanned_page("Ingeniera industrial")
+    _, other = scanned_page("Directora de capítulo")
+
+    key = page_cache_key(page)
+    assert page_cache_key(same) == key
+    assert page_cache_key(other) != key
+    assert page_cache_key(page, dpi=150) != key
+    assert page_cache_key(page, lang="spa") != key
+
+
+def test_image_key_follows_bytes_and_config():
+    key = image_cache_key(b"png")
+    assert image_cache_key(b"png") == key
+    assert image_cache_key(b"jpg") != key
+    assert image_cache_key(b"png", config=OCR_REGION_CONFIG + " -c x=1") != key
@@ -0,0 +1,105 @@
+# test_document.py
+import fitz
+import pytest
+
+from utils.document import ParsedCV, as_parsed_cv, parse_cv
+from utils.ocr import page_image_blocks
+from utils.utils import _merge_in_reading_order, layout_text
+
+
+def make_pdf(pages):
+    doc = fitz.open()
+    for lines in pages:
+        page = doc.new_page()
+        for i, line in enumerate(lines):
+            page.insert_text((72, 72 + 20 * i), line, fontname="helv", fontsize=11)
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+PAGES = [["Perfil", "Ingeniera industrial"], ["Experiencia", "Directora de capítulo"]]
+
+
+@pytest.fixture
+def pdf_path(tmp_path):
+    path = tmp_path / "cv.pdf"
+    path.write_bytes(make_pdf(PAGES))
+    return str(path)
+
+
+def test_parse_cv_builds_text_lines_and_spans(pdf_path):
+    seen = []
+    cv = parse_cv(pdf_path, on_page=lambda number, total: seen.append((number, total)))
+
+    assert isinstance(cv, ParsedCV)
+    assert cv.source == pdf_path
+    assert cv.lines == [line for page in PAGES for line in page]
+    assert cv.text_lower == cv.text.lower()
+    assert [page.number for page in cv.pages] == [0, 1]
+    assert not any(page.ocr for page in cv.pages)
+    assert sorted(seen) == [(0, 2), (1, 2)]
+
+    span_lines = list(cv.iter_span_lines())
+    assert ["".join(span["text"] for span in line) for line in span_lines] == cv.lines
+    assert {"text", "font", "size", "flags", "bbox"} <= set(span_lines[0][0])
+
+
+def test_parse_cv_from_bytes_matches_path(pdf_path):
+    with open(pdf_path, "rb") as f:
+        data = f.read()
+    from_bytes, from_path = parse_cv(data), parse_cv(pdf_path)
+    assert from_bytes.source is None
+    assert from_bytes.text == from_path.text
+    assert from_bytes.lines == from_path.lines
+
+
+def test_as_parsed_cv_reuses_the_document(pdf_path):
+    cv = parse_cv(pdf_path)
+    assert as_parsed_cv(cv) is cv
+    assert as_parsed_cv(pdf_path).lines == cv.lines
+
+
+@pytest.mark.parametrize("source", [b"esto no es un pdf", b"", "/no/existe/cv.pdf"])
+def test_unreadable_pdf_raises_value_error(source):
+    with pytest.raises(ValueError):
+        parse_cv(source)
+
+
+def hybrid_page():
+    """
+    Página con texto arriba y abajo, una captura grande (dos veces) y un ícono.
+    """
+    capture = fitz.open()
+    source = capture.new_page(width=300, height=100)
+    source.insert_text((10, 50), "CERTIFICADO", fontsize=30)
+    pixmap = source.get_pixmap(dpi=100)
+    icon = fitz.Pixmap(fitz.csRGB, fitz.IRect(0, 0, 20, 20), 0)
+
+    doc = fitz.open()
+    page = doc.new_page()
+    page.insert_text((72, 72), "Perfil\tcon  espacios", fontsize=11)
+    page.insert_text((72, 90), "Ingeniera industrial", fontsize=11)
+    page.insert_image(fitz.Rect(72, 200, 372, 300), pixmap=pixmap)
+    page.insert_image(fitz.Rect(72, 400, 372, 500), pixmap=pixmap)
+    page.insert_image(fitz.Rect(500, 40, 520, 60), pixmap=icon)
+    page.insert_text((72, 700), "Experiencia", fontsize=11)
+    return doc, page
+
+
+def test_layout_text_matches_plain_text_extraction():
+    doc, page = hybrid_page()
+    assert layout_text(page.get_text("dict")) == page.get_text("text").strip()
+
+
+def test_image_blocks_come_from_the_layout_without_icons_or_repeats():
+    doc, page = hybrid_page()
+    blocks = page_image_blocks(page, page.get_text("dict"))
+    assert [tuple(bbox) for bbox, _ in blocks] == [(72, 200, 372, 300)]
+    assert blocks[0][1].startswith(b"\x89PNG")
+
+
+def test_image_text_is_merged_in_reading_order():
+    doc, page = hybrid_page()
+    merged = _merge_in_reading_order(page.get_text("dict"), [(fitz.Rect(72, 200, 372, 300), "CERTIFICADO")])
+    assert merged.split("\n") == ["Perfil\tcon  espacios", "Ingeniera industrial", "CERTIFICADO", "Experiencia"]
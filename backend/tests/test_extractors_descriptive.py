@@ -0,0 +1,97 @@
+# test_extractors_descriptive.py
+import pytest
+
+from utils.document import ParsedPage, build_parsed_cv
+from utils.extractors_descriptive import (
+    DESCRIPTIVE_SECTIONS,
+    extract_experience_items_with_details,
+    extract_profile_section_with_details,
+    walk_descriptive_sections,
+)
+
+BOLD, REGULAR = "Helvetica-Bold", "Helvetica"
+
+# Cada línea: [(texto, fuente)] (varios spans por línea en algunas)
+LINES = [
+    [("Perfil", BOLD)],
+    [("Estudiante de ingeniería industrial", REGULAR)],
+    [("con interés en ", REGULAR), ("logística", BOLD)],
+    [("Experiencia en ANEIAP", BOLD)],
+    [("Director de capítulo", BOLD)],
+    [("- Coordiné el equipo", REGULAR)],
+    [("Lideré el congreso", REGULAR), ("Reconocimientos", BOLD), ("perdido en la misma línea", REGULAR)],
+    [("Asistencia a eventos ANEIAP", BOLD)],
+    [("Dirección de residencia:", REGULAR)],
+    [("Congreso nacional", BOLD)],
+    [("Bogotá 2023", REGULAR)],
+    [("Actualización profesional", BOLD)],
+    [("Eventos organizados", BOLD)],
+    [("Semana de la ingeniería", BOLD)],
+    [("   ", REGULAR), ("Encargado de logística", REGULAR)],
+    [("Firma", BOLD)],
+]
+
+
+def make_cv(lines=LINES):
+    span_lines = [[{"text": text, "font": font, "size": 11, "flags": 0, "bbox": (0, 0, 1, 1)}
+                   for text, font in line] for line in lines]
+    text = "\n".join("".join(text for text, _ in line) for line in lines)
+    return build_parsed_cv([ParsedPage(number=0, text=text, span_lines=span_lines)])
+
+
+def naive_section(cv, start, ends, excluded, grouped):
+    """
+    Recorrido independiente de una sola sección (como lo hacía cada extractor).
+    """
+    in_section = start is None
+    current, items, content = None, {}, []
+    for line in cv.iter_span_lines():
+        for span in line:
+            text = span["text"].strip()
+            if not text:
+                continue
+            lower = text.lower()
+            if lower in excluded:
+                continue
+            if start is not None:
+                if start in lower:
+                    in_section = True
+                    continue
+                if any(end in lower for end in ends):
+                    in_section = False
+                    break
+                if not in_section:
+                    continue
+            if not grouped:
+                content.append(text)
+            elif "bold" in span["font"].lower() and not text.startswith("-"):
+                current = text
+                items[current] = []
+            elif current:
+                items[current].append(text)
+    return items if grouped else " ".join(content).strip()
+
+
+@pytest.mark.parametrize("lines", [LINES, LINES[3:], LINES[:3], []])
+def test_single_walk_matches_one_walk_per_section(lines):
+    cv = make_cv(lines)
+    sections = walk_descriptive_sections(cv)
+    for name, spec in DESCRIPTIVE_SECTIONS.items():
+        assert sections[name] == naive_section(cv, *spec), name
+
+
+def test_sections_are_cut_at_their_headers():
+    cv = make_cv()
+    assert extract_experience_items_with_details(cv) == {
+        "Director de capítulo": ["- Coordiné el equipo", "Lideré el congreso"],
+    }
+    assert walk_descriptive_sections(cv)["attendance"] == {"Congreso nacional": ["Bogotá 2023"]}
+    assert walk_descriptive_sections(cv)["events"] == {"Semana de la ingeniería": ["Encargado de logística"]}
+    profile = extract_profile_section_with_details(cv)
+    assert profile.startswith("Estudiante de ingeniería industrial con interés en logística Experiencia")
+    assert profile.endswith("perdido en la misma línea")
+
+
+def test_walk_is_done_once_per_document():
+    cv = make_cv()
+    assert walk_descriptive_sections(cv) is walk_descriptive_sections(cv)
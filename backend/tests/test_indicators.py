@@ -0,0 +1,84 @@
+# test_indicators.py
+import json
+
+import pytest
+
+from utils import indicators
+from utils.indicators import (
+    INDEX_DIR,
+    IndexWatcher,
+    IndicatorIndex,
+    _artifact_path,
+    build_indicator_index,
+    get_indicator_index,
+)
+
+DATA = {"CAP": {"DCA": {"liderazgo": ["lider", "coordinar"]}}}
+
+
+@pytest.fixture
+def sources(tmp_path):
+    path, advice_path = tmp_path / "indicators.json", tmp_path / "advice.json"
+    path.write_text(json.dumps(DATA), encoding="utf-8")
+    advice_path.write_text(json.dumps({"DCA": {"liderazgo": ["Dirige un equipo"]}}), encoding="utf-8")
+    return str(path), str(advice_path)
+
+
+@pytest.fixture
+def fresh_index(monkeypatch):
+    """
+    Índice del proceso vacío, sin vigilante, restaurado al terminar la prueba.
+    """
+    for name, value in [("_index", None), ("_index_paths", indicators._index_paths),
+                        ("_artifact_stamp", ()), ("_artifact_checked", 0.0), ("_watcher", None)]:
+        monkeypatch.setattr(indicators, name, value)
+
+
+def add_position(path):
+    data = dict(DATA, CAP=dict(DATA["CAP"], DCC={"redes": ["instagram"]}))
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+
+
+def test_artifact_is_written_to_the_private_cache(sources):
+    path, advice_path = sources
+    index = build_indicator_index(path, advice_path)
+
+    artifact = _artifact_path(path)
+    assert artifact.startswith(INDEX_DIR)
+    loaded = IndicatorIndex.load(artifact, expected_version=index.version)
+    assert loaded.version == index.version
+    assert loaded.position_indicators("cap", "dca") == DATA["CAP"]["DCA"]
+
+
+def test_version_follows_the_sources(sources):
+    path, advice_path = sources
+    index = build_indicator_index(path, advice_path)
+    add_position(path)
+    changed = build_indicator_index(path, advice_path)
+
+    assert changed.version != index.version
+    assert changed.has_position("CAP", "DCC") and not index.has_position("CAP", "DCC")
+    assert IndicatorIndex.load(_artifact_path(path), expected_version=index.version) is None
+
+
+def test_watcher_swaps_the_index_without_touching_the_one_in_use(sources, fresh_index):
+    index = get_indicator_index(*sources)
+    watcher = IndexWatcher(interval=60)
+    assert not watcher.check()
+
+    add_position(sources[0])
+    assert watcher.check()
+    current = get_indicator_index(*sources)
+    assert current.version != index.version
+    assert current.has_position("CAP", "DCC")
+    assert not index.has_position("CAP", "DCC")
+
+
+def test_worker_loads_the_artifact_published_by_the_main_process(sources, fresh_index, monkeypatch):
+    monkeypatch.setattr(indicators, "INDEX_RELOAD_INTERVAL", 0)
+    index = get_indicator_index(*sources)
+
+    add_position(sources[0])
+    published = build_indicator_index(*sources)
+    assert get_indicator_index(*sources).version == published.version != index.version
@@ -0,0 +1,142 @@
+# test_jobs.py
+import socket
+import subprocess
+import sys
+
+import pytest
+
+from utils.jobs import DONE, FAILED, QUEUED, RUNNING, JobQueue, QueueFullError, job_event_sink
+from utils.pipeline import StageTimer
+
+
+def make_queue(tmp_path, **kwargs):
+    return JobQueue(path=str(tmp_path / "jobs.sqlite3"), jobs_dir=str(tmp_path / "jobs"), **kwargs)
+
+
+def dead_owner() -> str:
+    """
+    Dueño de un proceso de este host que ya terminó.
+    """
+    process = subprocess.Popen([sys.executable, "-c", "pass"])
+    process.wait()
+    return f"{socket.gethostname()}:{process.pid}:x"
+
+
+def set_owner(queue, job_id, owner):
+    queue._connect().execute("UPDATE jobs SET owner = ? WHERE id = ?", (owner, job_id))
+
+
+def test_claim_takes_oldest_job_and_marks_it_running(tmp_path):
+    queue = make_queue(tmp_path)
+    first = queue.submit({"n": 1})
+    second = queue.submit({"n": 2})
+    assert queue.get(second)["queue_position"] == 1
+
+    job = queue.claim()
+    assert job["job_id"] == first
+    assert job["params"] == {"n": 1}
+    assert job["payload"] is None
+    assert queue.get(first)["status"] == RUNNING
+    assert queue.get(second)["queue_position"] == 0
+
+    queue.finish(first, DONE, result={"ok": True})
+    assert queue.get(first)["result"] == {"ok": True}
+    assert queue.claim()["job_id"] == second
+    assert queue.claim() is None
+
+
+def test_submit_rejects_jobs_when_the_queue_is_full(tmp_path):
+    queue = make_queue(tmp_path, max_pending=1)
+    queue.submit({})
+    with pytest.raises(QueueFullError):
+        queue.submit({})
+    assert queue.pending_count() == 1
+
+
+def test_in_memory_job_is_only_claimed_by_its_instance(tmp_path):
+    queue = make_queue(tmp_path)
+    other = make_queue(tmp_path)
+    job_id = queue.submit({}, payload=b"%PDF")
+
+    assert other.claim() is None
+    job = queue.claim()
+    assert job["job_id"] == job_id
+    assert job["payload"] == b"%PDF"
+
+
+def test_running_job_of_a_dead_owner_returns_to_the_queue(tmp_path):
+    queue = make_queue(tmp_path)
+    job_id = queue.submit({})
+    queue.claim()
+    queue.add_event(job_id, {"stage": "text", "progress": 0.5})
+    set_owner(queue, job_id, dead_owner())
+
+    job = make_queue(tmp_path).claim()
+    assert job["job_id"] == job_id
+    assert queue.events(job_id) == []
+
+
+def test_running_job_of_a_live_owner_is_left_alone(tmp_path):
+    queue = make_queue(tmp_path)
+    job_id = queue.submit({})
+    queue.claim()
+
+    assert make_queue(tmp_path).claim() is None
+    assert queue.get(job_id)["status"] == RUNNING
+
+
+def test_in_memory_job_of_a_dead_owner_fails(tmp_path):
+    queue = make_queue(tmp_path)
+    job_id = queue.submit({}, payload=b"%PDF")
+    set_owner(queue, job_id, dead_owner())
+
+    assert make_queue(tmp_path).claim() is None
+    job = queue.get(job_id)
+    assert job["status"] == FAILED
+    assert job["error"]
+
+
+def test_prune_removes_finished_jobs_and_their_files(tmp_path):
+    queue = make_queue(tmp_path)
+    done = queue.record({}, {"ok": True}, save_outputs=lambda d: open(f"{d}/out.json", "w").close())
+    waiting = queue.submit({})
+
+    queue.prune(ttl=-1)
+    assert queue.get(done) is None
+    assert not (tmp_path / "jobs" / done).exists()
+    assert queue.get(waiting)["status"] == QUEUED
+
+
+def test_events_update_the_job_and_resume_after_a_sequence(tmp_path):
+    queue = make_queue(tmp_path)
+    job_id = queue.submit({})
+    queue.claim()
+    sink = queue.event_sink(job_id)
+    sink({"stage": "page", "progress": 0.25, "page": 1})
+    sink({"stage": "text", "progress": 0.5})
+
+    job = queue.get(job_id)
+    assert (job["stage"], job["progress"]) == ("text", 0.5)
+    events = queue.events(job_id)
+    assert [event["stage"] for event in events] == ["page", "text"]
+    assert events[0]["page"] == 1
+    assert queue.events(job_id, after=events[0]["seq"]) == events[1:]
+
+
+def test_event_sink_writes_from_another_queue_instance(tmp_path):
+    queue = make_queue(tmp_path)
+    job_id = queue.submit({})
+    job_event_sink(job_id, queue.path)({"stage": "sections", "progress": 0.6})
+    assert queue.events(job_id)[0]["stage"] == "sections"
+
+
+def test_stage_timer_emits_one_event_per_stage_with_timings():
+    events = []
+    timer = StageTimer(events.append, timings={"text": 100.0})
+    timer.tick("page", 0.1, page=1)
+    timer.done("sections", 0.6)
+
+    assert [event["stage"] for event in events] == ["page", "sections"]
+    assert events[0]["page"] == 1
+    assert set(timer.timings) == {"text", "sections"}
+    assert events[1]["total_ms"] >= 100.0
@@ -0,0 +1,53 @@
+# test_matcher.py
+import random
+
+import pytest
+
+from utils.matcher import KeywordMatcher, normalize_text
+
+KEYWORDS = ["gestión", "gestion de proyectos", "proyecto", "yecto", "lider", "liderazgo", "a", "ñandú", "Diseño"]
+
+
+def naive_find(keywords, text):
+    return {kw for kw in keywords if kw in text}
+
+
+@pytest.mark.parametrize("text", [
+    "",
+    "Líder de gestión de proyectos",
+    "LIDERAZGO y diseño académico",
+    "el ñandú corre",
+    "sin coincidencias xyz",
+])
+def test_find_ids_matches_naive_substring_search(text):
+    matcher = KeywordMatcher(KEYWORDS)
+    text = normalize_text(text)
+    found = {matcher.keywords[kw_id] for kw_id in matcher.find_ids(text)}
+    assert found == naive_find(matcher.keywords, text)
+
+
+def test_random_texts_match_naive_substring_search():
+    rng = random.Random(0)
+    alphabet = "abcdeñ "
+    keywords = ["".join(rng.choice(alphabet) for _ in range(rng.randint(1, 4))) for _ in range(40)]
+    matcher = KeywordMatcher(keywords)
+    for _ in range(200):
+        text = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 60)))
+        found = {matcher.keywords[kw_id] for kw_id in matcher.find_ids(text)}
+        assert found == naive_find(matcher.keywords, text)
+
+
+def test_hits_per_line_do_not_cross_line_boundaries():
+    matcher = KeywordMatcher(["ab", "gestión"])
+    lines = ["xa", "bx", "Gestión", "abab"]
+    hits = matcher.hits_per_line(lines)
+    expected = [
+        {matcher.keyword_id(kw) for kw in naive_find(matcher.keywords, normalize_text(line))}
+        for line in lines
+    ]
+    assert hits == expected
+
+
+def test_keywords_are_normalized_and_deduplicated():
+    matcher = KeywordMatcher(["Gestión", "gestion", "GESTIÓN", ""])
+    assert matcher.keywords == ["gestion"]
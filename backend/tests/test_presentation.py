@@ -0,0 +1,52 @@
+# test_presentation.py
+import pytest
+
+from utils.presentation import PresentationEngine, count_syllables
+
+
+@pytest.fixture(scope="module")
+def engine():
+    return PresentationEngine()
+
+
+@pytest.mark.parametrize("word, syllables", [
+    ("casa", 2), ("país", 2), ("aéreo", 4), ("ingeniería", 5), ("construcción", 3),
+])
+def test_count_syllables(word, syllables):
+    assert count_syllables(word) == syllables
+
+
+def test_empty_text_gets_neutral_scores(engine):
+    assert engine.evaluate("") == {
+        "spelling_score": 100, "capitalization_score": 100, "coherence_score": 50, "overall_score": 83.33,
+    }
+
+
+def test_capitalization_counts_sentences_starting_uppercase(engine):
+    scores = engine.evaluate("Hola mundo. adiós mundo. Buenas noches.")
+    assert scores["capitalization_score"] == round(2 / 3 * 100, 2)
+
+
+def test_unknown_words_lower_spelling(engine):
+    clean = engine.evaluate("La casa es grande y el perro come.")
+    typo = engine.evaluate("La casa es grnde y el pero xqzwvk.")
+    assert typo["spelling_score"] < clean["spelling_score"]
+
+
+def test_scores_follow_fernandez_huerta_and_average(engine):
+    text = "La asociación organiza eventos académicos. Los estudiantes participan."
+    words = text.lower().replace(".", "").split()
+    syllables = sum(count_syllables(word) for word in words)
+    expected = round(max(0, min(100, 206.84 - 60 * syllables / len(words) - 102 * 2 / len(words))), 2)
+    scores = engine.evaluate(text)
+    assert scores["coherence_score"] == expected
+    assert scores["overall_score"] == round(
+        (scores["spelling_score"] + scores["capitalization_score"] + scores["coherence_score"]) / 3, 2
+    )
+
+
+def test_word_cache_is_bounded_and_reused():
+    engine = PresentationEngine(cache_size=3)
+    first = engine.evaluate("Uno dos tres cuatro cinco.")
+    assert len(engine._words) == 3
+    assert engine.evaluate("Uno dos tres cuatro cinco.") == first
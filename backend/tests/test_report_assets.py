@@ -0,0 +1,30 @@
+# test_report_assets.py
+import os
+
+import fitz
+from reportlab.pdfgen import canvas as pdf_canvas
+
+from utils.report_generator import report_fonts, report_styles
+from utils.utils import add_background
+
+BACKGROUND = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "assets", "Fondo reporte.png")
+
+
+def test_fonts_and_styles_are_built_once():
+    assert report_fonts() is report_fonts()
+    assert report_styles() is report_styles()
+    assert report_styles()["normal"].fontName == report_fonts()[0]
+
+
+def test_background_image_is_embedded_once_per_document(tmp_path):
+    path = str(tmp_path / "fondo.pdf")
+    canvas = pdf_canvas.Canvas(path)
+    for _ in range(3):
+        add_background(canvas, BACKGROUND)
+        canvas.showPage()
+    canvas.save()
+
+    with fitz.open(path) as doc:
+        xrefs = {image[0] for page in doc for image in page.get_images(full=True)}
+        assert doc.page_count == 3
+    assert len(xrefs) == 1
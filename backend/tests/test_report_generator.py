@@ -0,0 +1,54 @@
+# test_report_generator.py
+import fitz
+import pytest
+
+from utils.extractors import calculate_indicators_for_report
+from utils.indicators import IndicatorIndex
+from utils.pipeline import report_data
+from utils.report_generator import build_report_data, position_advice, render_report_pdf
+
+INDICATORS = {"UNIGUAJIRA": {"DCA": {"Diseño académico": ["diseño", "académico"], "Formación": ["taller"]}}}
+ADVICE = {"DCA": {"Diseño académico": ["Diseña un programa."], "Formación": ["Dicta un taller.", "Asiste a cursos."]}}
+
+
+@pytest.fixture
+def index():
+    return IndicatorIndex(INDICATORS, "test", ADVICE)
+
+
+def test_unknown_position_gives_empty_report(index, tmp_path):
+    lines = ["Diseño académico de talleres", "Otra línea"]
+    indicators = calculate_indicators_for_report(lines, index.matcher("UNIGUAJIRA", "XYZ"))
+    assert indicators == {}
+
+    data = build_report_data("Ana", "XYZ", "UNIGUAJIRA", indicators, position_advice(index.advice, "XYZ"))
+    assert data["indicators"] == {}
+    assert data["advice"] == []
+    assert "No hay indicadores" in data["conclusion"]
+    assert render_report_pdf(data, str(tmp_path / "r.pdf"))
+    assert (tmp_path / "r.pdf").stat().st_size > 0
+
+
+def test_report_data_uses_result_percentages_and_flat_advice(index):
+    lines = ["Diseño académico", "Taller de liderazgo", "Nada", "Nada"]
+    result = {
+        "candidate_name": "Ana",
+        "chapter": "uniguajira",
+        "position": "dca",
+        "indicator_percentages": calculate_indicators_for_report(lines, index.matcher("uniguajira", "dca")),
+    }
+    data = report_data(result, index)
+    assert data["indicators"] == result["indicator_percentages"]
+    assert data["indicators"]["Diseño académico"]["percentage"] == 25.0
+    assert data["advice"] == ["Diseña un programa.", "Dicta un taller.", "Asiste a cursos."]
+
+
+def test_markup_characters_are_escaped(tmp_path):
+    data = build_report_data("Juan <b>Perez & Cía", "DCA <i>", "UNIGUAJIRA & <x>", {},
+                             ["Usa <herramientas> & métodos"])
+    path = tmp_path / "r.pdf"
+    render_report_pdf(data, str(path))
+    with fitz.open(str(path)) as doc:
+        text = "".join(page.get_text() for page in doc)
+    assert "Juan <b>Perez & Cía" in text
+    assert "Usa <herramientas> & métodos" in text
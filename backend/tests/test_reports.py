@@ -0,0 +1,27 @@
+# test_reports.py
+import pytest
+
+from utils.reports import parse_byte_range
+
+
+@pytest.mark.parametrize("header, expected", [
+    ("bytes=0-99", (0, 99)),
+    ("bytes=100-", (100, 999)),
+    ("bytes=-100", (900, 999)),
+    ("bytes=-5000", (0, 999)),
+    ("bytes=990-5000", (990, 999)),
+    (" bytes=0-0 ", (0, 0)),
+])
+def test_parse_byte_range(header, expected):
+    assert parse_byte_range(header, 1000) == expected
+
+
+@pytest.mark.parametrize("header", [None, "", "bytes=-", "items=0-10", "bytes=0-10,20-30", "bytes=a-b"])
+def test_parse_byte_range_ignores_missing_or_unknown(header):
+    assert parse_byte_range(header, 1000) is None
+
+
+@pytest.mark.parametrize("header", ["bytes=1000-", "bytes=500-100", "bytes=-0"])
+def test_parse_byte_range_rejects_unsatisfiable(header):
+    with pytest.raises(ValueError):
+        parse_byte_range(header, 1000)
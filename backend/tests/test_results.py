@@ -0,0 +1,44 @@
+# test_results.py
+import uuid
+
+import pytest
+
+from utils.results import get_result_cache, lookup_result, result_cache_key, store_result
+
+pytestmark = pytest.mark.skipif(get_result_cache() is None, reason="RESULT_CACHE=0")
+
+RESULT = {"candidate_name": "Ana", "indicators_version": "v1", "indicator_percentages": {"liderazgo": 50.0}}
+DATA = {"candidate_name": "Ana", "position": "DCA"}
+
+
+@pytest.fixture
+def params():
+    return {"candidate_name": "Ana", "chapter": "cap", "position": "dca", "format": "pdf",
+            "sha256": uuid.uuid4().hex}
+
+
+def test_entry_keeps_the_report_digest_not_the_pdf(params):
+    store_result(params, RESULT, DATA, "ab" * 32)
+    entry = lookup_result(params, "v1")
+    assert entry == {"result": RESULT, "report_data": DATA, "report_digest": "ab" * 32}
+
+
+def test_key_ignores_case_and_changes_with_the_version(params):
+    key = result_cache_key(params, "v1")
+    assert result_cache_key(dict(params, chapter=" CAP ", position="DCA"), "v1") == key
+    assert result_cache_key(params, "v2") != key
+
+    store_result(params, RESULT, DATA)
+    assert lookup_result(params, "v2") is None
+
+
+def test_result_without_report_data_does_not_replace_one_with_it(params):
+    store_result(params, RESULT, DATA)
+    store_result(params, RESULT)
+    assert lookup_result(params, "v1")["report_data"] == DATA
+
+
+def test_pdf_request_misses_an_entry_without_report_data(params):
+    store_result(params, RESULT)
+    assert lookup_result(params, "v1") is None
+    assert lookup_result(dict(params, format="json"), "v1")["result"] == RESULT
@@ -0,0 +1,72 @@
+# test_scoring.py
+import pytest
+
+from utils.document import ParsedPage, build_parsed_cv
+from utils.extractors import calculate_indicators_for_report, calculate_indicators_for_report_batch, rank_positions
+from utils.indicators import IndicatorIndex
+
+CHAPTER = {
+    "DCA": {
+        "liderazgo": ["líder", "coordinar", "dirigir"],
+        "docencia": ["profesor", "docencia"],
+    },
+    "DCC": {
+        "comunicaciones": ["comunicación", "boletín"],
+        "redes": ["redes sociales", "instagram"],
+        "liderazgo": ["líder"],
+    },
+    "VACIO": {},
+}
+LINES = [
+    "Líder estudiantil del capítulo",
+    "Coordinar y dirigir el boletín mensual",
+    "Profesor auxiliar de docencia en cálculo",
+    "Manejo de redes sociales e Instagram",
+    "Sin coincidencias aquí",
+]
+
+
+@pytest.fixture
+def index():
+    return IndicatorIndex({"CAP": CHAPTER}, "v1")
+
+
+@pytest.mark.parametrize("lines", [LINES, LINES[:1], []])
+def test_ranking_matches_scoring_each_position(index, lines):
+    table = {entry["position"]: entry for entry in rank_positions(lines, index.chapter_matrix("cap"))}
+    assert set(table) == set(CHAPTER)
+
+    for position, indicators in CHAPTER.items():
+        single = calculate_indicators_for_report(lines, index.matcher("CAP", position))
+        assert table[position]["indicators"] == single
+        percentages = [value["percentage"] for value in single.values()]
+        expected = sum(percentages) / len(percentages) if percentages else 0.0
+        assert table[position]["score"] == pytest.approx(expected, abs=0.01)
+
+
+def test_ranking_is_sorted_by_score(index):
+    ranking = rank_positions(LINES, index.chapter_matrix("CAP"))
+    scores = [entry["score"] for entry in ranking]
+    assert scores == sorted(scores, reverse=True)
+    assert ranking[0]["position"] == "DCA"
+
+
+def test_plain_dict_ranks_like_the_precompiled_matrix(index):
+    assert rank_positions(LINES, CHAPTER) == rank_positions(LINES, index.chapter_matrix("CAP"))
+
+
+def test_batch_scoring_matches_scoring_each_cv(index):
+    cvs = [LINES, [], LINES[2:], ["líder", "LÍDER de equipo", "lider sin tilde"]]
+    for position in CHAPTER:
+        matcher = index.matcher("CAP", position)
+        batch = calculate_indicators_for_report_batch(cvs, matcher)
+        assert batch == [calculate_indicators_for_report(lines, matcher) for lines in cvs]
+
+
+def test_batch_scoring_accepts_parsed_cvs(index):
+    cv = build_parsed_cv([ParsedPage(number=0, text="\n".join(LINES))])
+    matcher = index.matcher("CAP", "DCC")
+    assert calculate_indicators_for_report_batch([cv, LINES], matcher) == [
+        calculate_indicators_for_report(cv, matcher),
+        calculate_indicators_for_report(LINES, matcher),
+    ]
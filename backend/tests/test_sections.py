@@ -0,0 +1,77 @@
+# test_sections.py
+import random
+
+import pytest
+
+from utils.matcher import normalize_text
+from utils.sections import SECTION_HEADERS, SECTION_RULES, segment_text, segment_texts
+
+TEXT = """Juana Pérez
+PERFIL
+Estudiante de ingeniería industrial.
+EXPERIENCIA EN ANEIAP
+Directora de capítulo 2022-2023
+Reconocimientos grupales
+Mejor capítulo
+EVENTOS ORGANIZADOS
+Congreso regional
+Asistencia a eventos ANEIAP
+Congreso nacional
+Actualización profesional
+Firma"""
+
+
+def naive_slice(text, name):
+    """
+    Búsqueda con find() por cada encabezado (como lo hacía cada extractor).
+    """
+    lower = normalize_text(text)
+    starts, ends = SECTION_RULES[name]
+    for phrase in starts:
+        start_idx = lower.find(normalize_text(phrase))
+        if start_idx != -1:
+            break
+    else:
+        return None
+    end_idx = len(text)
+    for phrase in ends:
+        idx = lower.find(normalize_text(phrase), start_idx)
+        if idx != -1:
+            end_idx = min(end_idx, idx)
+    return text[start_idx:end_idx]
+
+
+def random_text(rng):
+    words = SECTION_HEADERS + ["RECONOCIMIENTOS", "Asistencia a Eventos", "relleno", "ñ", "\n", "perfiles"]
+    return " ".join(rng.choice(words) for _ in range(rng.randint(0, 25)))
+
+
+@pytest.mark.parametrize("text", [TEXT, TEXT.lower(), "", "Sin encabezados", TEXT.replace("PERFIL", "")])
+def test_sections_match_repeated_find(text):
+    table = segment_text(text)
+    for name in SECTION_RULES:
+        assert table.slice(name) == naive_slice(text, name), name
+
+
+def test_random_texts_match_repeated_find():
+    rng = random.Random(0)
+    for _ in range(200):
+        text = random_text(rng)
+        table = segment_text(text)
+        for name in SECTION_RULES:
+            assert table.slice(name) == naive_slice(text, name), (name, text)
+
+
+def test_batch_segmentation_matches_one_text_at_a_time():
+    rng = random.Random(1)
+    texts = [TEXT, "", random_text(rng), TEXT.upper(), random_text(rng)]
+    for batch, text in zip(segment_texts(texts), texts):
+        single = segment_text(text)
+        for name in SECTION_RULES:
+            assert batch.span(name) == single.span(name), (name, text)
+
+
+def test_experience_section_stops_at_the_nearest_end():
+    section = segment_text(TEXT).slice("experience")
+    assert section.startswith("EXPERIENCIA EN ANEIAP")
+    assert section.rstrip().endswith("2022-2023")
@@ -0,0 +1,72 @@
+# test_similarity.py
+import pytest
+
+from utils import similarity
+from utils.indicators import IndicatorIndex
+from utils.similarity import SimilarityService, get_similarity_service, refit_similarity_service
+
+DATA = {
+    "CAP": {
+        "DCA": {"liderazgo": ["lider", "coordinar equipos"], "docencia": ["profesor"]},
+        "DCC": {"redes": ["instagram", "redes sociales"], "prensa": ["boletín"]},
+    }
+}
+CV = "Fui líder del capítulo y me tocó coordinar equipos de profesores."
+
+
+@pytest.fixture
+def index():
+    return IndicatorIndex(DATA, "v1")
+
+
+@pytest.fixture
+def current_index(monkeypatch, index):
+    """
+    Índice vigente del servicio, reemplazable dentro de la prueba.
+    """
+    current = {"index": index}
+    monkeypatch.setattr(similarity, "_service", None)
+    monkeypatch.setattr(similarity, "get_indicator_index", lambda: current["index"])
+    return current
+
+
+def test_scores_rank_the_matching_position_first(index):
+    service = SimilarityService.fit(index)
+    scores = service.score_all(CV, chapter="cap")
+    assert set(scores) == {("CAP", "DCA"), ("CAP", "DCC")}
+    assert scores[("CAP", "DCA")] > scores[("CAP", "DCC")]
+    assert service.score(CV, "cap", "dca") == scores[("CAP", "DCA")]
+    assert service.score(CV, "CAP", "XYZ") == 0.0
+
+
+def test_saved_model_is_only_loaded_for_its_index_version(index, tmp_path):
+    path = str(tmp_path / "model.pkl")
+    service = SimilarityService.fit(index)
+    service.save(path)
+
+    loaded = SimilarityService.load(path, expected_version="v1")
+    assert loaded.version == service.version
+    assert loaded.score(CV, "CAP", "DCA") == service.score(CV, "CAP", "DCA")
+    assert SimilarityService.load(path, expected_version="v2") is None
+    assert SimilarityService.load(str(tmp_path / "missing.pkl")) is None
+
+
+def test_refit_with_past_cvs_saves_a_new_version(current_index, tmp_path):
+    path = str(tmp_path / "model.pkl")
+    base = get_similarity_service()
+    refitted = refit_similarity_service([CV, "Manejé las redes sociales del capítulo."], path=path)
+
+    assert refitted.version != base.version
+    assert refitted.index_version == base.index_version
+    assert get_similarity_service() is refitted
+    assert SimilarityService.load(path, expected_version="v1").version == refitted.version
+
+
+def test_service_is_refitted_when_the_index_changes(current_index):
+    first = get_similarity_service()
+    assert get_similarity_service() is first
+
+    current_index["index"] = IndicatorIndex({"CAP": {"DCA": {"liderazgo": ["lider"]}}}, "v2")
+    second = get_similarity_service()
+    assert second.index_version == "v2"
+    assert set(second.position_keys) == {("CAP", "DCA")}
@@ -0,0 +1,77 @@
+# test_uploads.py
+import asyncio
+
+import pytest
+
+from utils.uploads import UploadBuffer, UploadTooLargeError, _read_multipart
+
+BOUNDARY = "limite"
+CONTENT_TYPE = f"multipart/form-data; boundary={BOUNDARY}"
+
+
+def form_body(fields=(), files=()):
+    parts = []
+    for name, value in fields:
+        parts.append(f'--{BOUNDARY}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode())
+    for name, filename, data in files:
+        parts.append(
+            f'--{BOUNDARY}\r\nContent-Disposition: form-data; name="{name}"; filename="{filename}"\r\n'
+            f'Content-Type: application/pdf\r\n\r\n'.encode() + data + b"\r\n"
+        )
+    return b"".join(parts) + f"--{BOUNDARY}--\r\n".encode()
+
+
+def read(body, tmp_path, chunk_size=7, **limits):
+    uploads = []
+
+    def new_upload(field, filename):
+        upload = UploadBuffer(spool_dir=str(tmp_path))
+        uploads.append(upload)
+        return upload
+
+    async def chunks():
+        for start in range(0, len(body), chunk_size):
+            yield body[start:start + chunk_size]
+
+    fields = asyncio.run(_read_multipart(CONTENT_TYPE, chunks(), new_upload, **limits))
+    return fields, uploads
+
+
+def test_reads_fields_and_files_in_small_chunks(tmp_path):
+    body = form_body([("chapter", "UNIGUAJIRA"), ("position", "DCA")], [("pdf", "cv.pdf", b"%PDF-1.4 datos")])
+    fields, uploads = read(body, tmp_path)
+    assert fields == {"chapter": "UNIGUAJIRA", "position": "DCA"}
+    assert len(uploads) == 1 and uploads[0].size == len(b"%PDF-1.4 datos")
+
+
+def test_field_over_limit_raises_too_large(tmp_path):
+    body = form_body([("metadata", "x" * 2048)])
+    with pytest.raises(UploadTooLargeError):
+        read(body, tmp_path, max_field_size=1024)
+    fields, _ = read(body, tmp_path, max_field_size=4096)
+    assert len(fields["metadata"]) == 2048
+
+
+def test_too_many_parts_raises_value_error(tmp_path):
+    body = form_body([(f"campo{i}", "v") for i in range(11)])
+    with pytest.raises(ValueError) as excinfo:
+        read(body, tmp_path, max_parts=10)
+    assert not isinstance(excinfo.value, UploadTooLargeError)
+    fields, _ = read(body, tmp_path, max_parts=11)
+    assert len(fields) == 11
+
+
+def test_oversized_part_headers_raise_value_error(tmp_path):
+    body = (f'--{BOUNDARY}\r\nContent-Disposition: form-data; name="a"\r\n'
+            f'X-Relleno: {"r" * 20000}\r\n\r\nv\r\n--{BOUNDARY}--\r\n').encode()
+    with pytest.raises(ValueError) as excinfo:
+        read(body, tmp_path, chunk_size=4096)
+    assert not isinstance(excinfo.value, UploadTooLargeError)
+
+
+def test_rejects_non_multipart_content_type(tmp_path):
+    async def chunks():
+        yield b""
+
+    with pytest.raises(ValueError):
+        asyncio.run(_read_multipart("application/json", chunks(), lambda field, filename: None))
@@ -9,6 +9,37 @@ from .utils import (
     preprocess_image
 )
 
+from .cache import DiskCache
+
+from .jobs import JobQueue, QueueFullError
+
+from .uploads import UploadBuffer, UploadTooLargeError, receive_multipart, receive_multipart_files, iter_batch_pdfs
+
+from .reports import ReportStore, get_report_store, start_report_sweeper
+
+from .results import get_result_cache, result_cache_key, lookup_result, store_result, wants_report
+
+from .similarity import (
+    SimilarityService,
+    get_similarity_service,
+    refit_similarity_service
+)
+
+from .ocr import (
+    OCREngine,
+    OCRTimeoutError,
+    get_ocr_engine,
+    get_ocr_cache,
+    start_ocr_service
+)
+
+from .document import (
+    ParsedCV,
+    ParsedPage,
+    parse_cv,
+    as_parsed_cv
+)
+
 from .extractors import (
     extract_profile_section_with_ocr,
     extract_experience_section_with_ocr,
@@ -21,18 +52,62 @@ from .extractors import (
     extract_profile_section_with_details,
     evaluate_cv_presentation_with_headers,
     calculate_all_indicators,
-    calculate_indicators_for_report
+    calculate_indicators_for_report,
+    calculate_indicators_for_report_batch,
+    rank_positions
+)
+
+from .presentation import PresentationEngine, get_presentation_engine
+
+from .matcher import (
+    normalize_text,
+    KeywordMatcher,
+    IndicatorMatcher,
+    compile_indicator_matcher
+)
+
+from .scoring import (
+    ChapterMatrix,
+    line_keyword_matrix,
+    batch_relevant_line_counts
+)
+
+from .sections import (
+    SECTION_RULES,
+    SectionTable,
+    segment_text,
+    segment_texts,
+    get_section_table,
+    segment_cvs
 )
 
 from .indicators import (
     DEFAULT_INDICATORS,
-    load_indicators_from_json
+    load_indicators_from_json,
+    IndicatorIndex,
+    build_indicator_index,
+    get_indicator_index,
+    start_index_watcher
 )
 
 __all__ = [
     # utils
     "extract_text_with_ocr", "extract_cleaned_lines", "calculate_similarity",
     "calculate_keyword_match_percentage", "draw_full_page_cover", "add_background", "preprocess_image",
+    # similarity
+    "SimilarityService", "get_similarity_service", "refit_similarity_service",
+    # cache / ocr
+    "DiskCache", "OCREngine", "OCRTimeoutError", "get_ocr_engine", "get_ocr_cache", "start_ocr_service",
+    # jobs
+    "JobQueue", "QueueFullError",
+    # uploads
+    "UploadBuffer", "UploadTooLargeError", "receive_multipart", "receive_multipart_files", "iter_batch_pdfs",
+    # reports
+    "ReportStore", "get_report_store", "start_report_sweeper",
+    # results
+    "get_result_cache", "result_cache_key", "lookup_result", "store_result", "wants_report",
+    # document
+    "ParsedCV", "ParsedPage", "parse_cv", "as_parsed_cv",
     # extractors
     "extract_profile_section_with_ocr", "extract_experience_section_with_ocr",
     "extract_event_section_with_ocr", "extract_attendance_section_with_ocr",
@@ -40,7 +115,17 @@ __all__ = [
     "extract_event_items_with_details", "extract_asistencia_items_with_details",
     "extract_profile_section_with_details", "evaluate_cv_presentation_with_headers",
     "calculate_all_indicators", "calculate_indicators_for_report",
+    "calculate_indicators_for_report_batch", "rank_positions",
+    # presentation
+    "PresentationEngine", "get_presentation_engine",
+    # matcher
+    "normalize_text", "KeywordMatcher", "IndicatorMatcher", "compile_indicator_matcher",
+    # scoring
+    "ChapterMatrix", "line_keyword_matrix", "batch_relevant_line_counts",
+    # sections
+    "SECTION_RULES", "SectionTable", "segment_text", "segment_texts", "get_section_table", "segment_cvs",
     # indicators
-    "DEFAULT_INDICATORS", "load_indicators_from_json"
+    "DEFAULT_INDICATORS", "load_indicators_from_json",
+    "IndicatorIndex", "build_indicator_index", "get_indicator_index", "start_index_watcher"
 ]
 
@@ -0,0 +1,209 @@
+# cache.py
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+
+
+# ============================================================
+# 🔹 CARPETA PRIVADA DE DATOS
+# ============================================================
+# Las cachés guardan pickles: la carpeta no debe estar en una ruta compartida
+# y predecible como /tmp, donde otro usuario podría dejar un archivo para que
+# un worker lo cargue.
+CACHE_DIR = os.environ.get("EVALHV_CACHE_DIR") or os.path.join(
+    os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache"), "evalhv"
+)
+
+
+def private_dir(path: str) -> str:
+    """
+    Crea (si falta) una carpeta accesible solo por el usuario actual (0700) y
+    retorna su ruta. Si ya existe y pertenece a otro usuario, lanza
+    PermissionError; si otros pueden escribir en ella, le quita esos permisos.
+    """
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    st = os.stat(path)
+    if hasattr(os, "getuid") and st.st_uid != os.getuid():
+        raise PermissionError(f"La carpeta {path} pertenece a otro usuario; no se usa como caché.")
+    if st.st_mode & 0o077:
+        os.chmod(path, 0o700)
+    return path
+
+
+def _check_owner(path: str):
+    """
+    Rechaza un archivo de caché existente que pertenezca a otro usuario.
+    """
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return
+    if hasattr(os, "getuid") and st.st_uid != os.getuid():
+        raise PermissionError(f"El archivo {path} pertenece a otro usuario; no se usa como caché.")
+
+
+# ============================================================
+# 🔹 CACHÉ EN DISCO (SQLite) CON EVICCIÓN LRU Y VENCIMIENTO
+# ============================================================
+# Un acierto solo renueva la fecha de uso si la guardada tiene más de estos segundos
+ACCESS_RESOLUTION = 60.0
+# Fechas de uso renovadas que se acumulan antes de escribirlas juntas
+TOUCH_BATCH = 32
+# Cada cuántas escrituras se vuelve a sumar el tamaño real (otros procesos también escriben)
+SIZE_CHECK_EVERY = 64
+
+
+class DiskCache:
+    """
+    Caché clave→valor persistente en un archivo SQLite.
+    Limita el tamaño total (bytes) y expulsa primero las entradas usadas
+    hace más tiempo (LRU). Con `ttl` (segundos) las entradas vencen a partir
+    de su escritura. Lleva contadores de aciertos y fallos del proceso.
+    Las lecturas no escriben en la base: las fechas de uso se renuevan con
+    resolución ACCESS_RESOLUTION y se escriben por lotes (o antes de cada
+    escritura). El tamaño total se lleva en memoria y se suma de nuevo en la
+    base cada SIZE_CHECK_EVERY escrituras o cuando parece superar el máximo.
+    """
+
+    def __init__(self, path: str, max_bytes: int, ttl: Optional[float] = None):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._local = threading.local()
+        self._stats_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self._touched: Dict[str, float] = {}  # clave -> fecha de uso aún sin escribir
+        self._touched_since = 0.0
+        self._bytes: Optional[int] = None  # tamaño estimado (None: sumarlo en la próxima escritura)
+        self._writes = 0
+        private_dir(os.path.dirname(path) or ".")
+        _check_owner(path)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                " key TEXT PRIMARY KEY, value BLOB NOT NULL,"
+                " size INTEGER NOT NULL, accessed REAL NOT NULL, created REAL)"
+            )
+            if "created" not in {row[1] for row in conn.execute("PRAGMA table_info(entries)")}:
+                conn.execute("ALTER TABLE entries ADD COLUMN created REAL")
+            conn.execute("CREATE INDEX IF NOT EXISTS entries_accessed ON entries(accessed)")
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _count(self, hit: bool):
+        with self._stats_lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Retorna el valor guardado o None si no existe o ya venció.
+        """
+        conn = self._connect()
+        row = conn.execute("SELECT value, created, accessed FROM entries WHERE key = ?", (key,)).fetchone()
+        now = time.time()
+        if row is not None and self.ttl is not None and (row[1] or 0) < now - self.ttl:
+            self.delete(key)
+            row = None
+        if row is None:
+            self._count(False)
+            return None
+        if row[2] < now - ACCESS_RESOLUTION:
+            self._touch(key, now)
+        self._count(True)
+        return pickle.loads(row[0])
+
+    def _touch(self, key: str, now: float):
+        """
+        Anota la fecha de uso de `key`; escribe el lote si ya está lleno o es antiguo.
+        """
+        with self._lock:
+            if not self._touched:
+                self._touched_since = now
+            self._touched[key] = now
+            due = len(self._touched) >= TOUCH_BATCH or self._touched_since < now - ACCESS_RESOLUTION
+        if due:
+            conn = self._connect()
+            with conn:
+                self._flush_touches(conn)
+
+    def _flush_touches(self, conn: sqlite3.Connection):
+        with self._lock:
+            touched, self._touched = self._touched, {}
+        if touched:
+            conn.executemany("UPDATE entries SET accessed = ? WHERE key = ?",
+                             [(accessed, key) for key, accessed in touched.items()])
+
+    def set(self, key: str, value: Any):
+        """
+        Guarda un valor y expulsa entradas antiguas si se supera el tamaño máximo.
+        """
+        data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        if len(data) > self.max_bytes:
+            return
+        conn = self._connect()
+        now = time.time()
+        with conn:
+            # La expulsión ve las fechas de uso pendientes de este proceso
+            self._flush_touches(conn)
+            conn.execute(
+                "INSERT OR REPLACE INTO entries (key, value, size, accessed, created) VALUES (?, ?, ?, ?, ?)",
+                (key, data, len(data), now, now),
+            )
+            with self._lock:
+                # Un reemplazo cuenta su tamaño completo: la estimación solo puede pasarse
+                self._bytes = None if self._bytes is None else self._bytes + len(data)
+                self._writes += 1
+                check = self._bytes is None or self._bytes > self.max_bytes or self._writes >= SIZE_CHECK_EVERY
+            if check:
+                self._evict(conn)
+
+    def _evict(self, conn: sqlite3.Connection):
+        if self.ttl is not None:
+            conn.execute("DELETE FROM entries WHERE COALESCE(created, 0) < ?", (time.time() - self.ttl,))
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total > self.max_bytes:
+            for key, size in conn.execute("SELECT key, size FROM entries ORDER BY accessed").fetchall():
+                conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                total -= size
+                if total <= self.max_bytes:
+                    break
+        with self._lock:
+            self._bytes = total
+            self._writes = 0
+
+    def delete(self, key: str):
+        conn = self._connect()
+        with conn:
+            conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+
+    def clear(self):
+        conn = self._connect()
+        with conn:
+            conn.execute("DELETE FROM entries")
+        with self._lock:
+            self._touched.clear()
+            self._bytes = None
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Retorna aciertos, fallos, número de entradas y bytes ocupados.
+        """
+        entries, size = self._connect().execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries"
+        ).fetchone()
+        return {"hits": self.hits, "misses": self.misses, "entries": entries, "bytes": size}
@@ -0,0 +1,136 @@
+# document.py
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional, Union
+
+import fitz  # PyMuPDF
+
+from .utils import extract_pages_with_ocr
+
+
+# ---------------------------
+#  MODELO DE DOCUMENTO (se construye una sola vez por carga)
+# ---------------------------
+
+@dataclass
+class ParsedPage:
+    """
+    Página de la hoja de vida ya procesada.
+    `span_lines` conserva las líneas de `get_text("dict")` como listas de spans
+    ({"text", "font", "size", "flags", "bbox"}); queda vacía si la página fue OCR.
+    """
+    number: int
+    text: str
+    span_lines: List[List[Dict]] = field(default_factory=list)
+    ocr: bool = False
+
+
+@dataclass
+class ParsedCV:
+    """
+    Hoja de vida leída una sola vez: texto completo, texto en minúsculas,
+    líneas no vacías y datos de spans por página.
+    Todos los extractores, los indicadores y el reporte reciben este objeto.
+    `cache` guarda resultados derivados (p. ej. secciones) para calcularlos una sola vez.
+    """
+    text: str
+    text_lower: str
+    lines: List[str]
+    pages: List[ParsedPage]
+    source: Optional[str] = None
+    cache: Dict[str, Any] = field(default_factory=dict, repr=False, compare=False)
+
+    def iter_span_lines(self) -> Iterator[List[Dict]]:
+        """
+        Recorre las líneas de spans de todas las páginas en orden de lectura.
+        """
+        for page in self.pages:
+            yield from page.span_lines
+
+
+def _page_span_lines(layout: Dict) -> List[List[Dict]]:
+    """
+    Reduce el `get_text("dict")` de una página a listas de spans por línea.
+    """
+    span_lines = []
+    for block in layout["blocks"]:
+        if "lines" not in block:
+            continue
+        for line in block["lines"]:
+            span_lines.append([
+                {
+                    "text": span["text"],
+                    "font": span["font"],
+                    "size": span["size"],
+                    "flags": span["flags"],
+                    "bbox": span["bbox"],
+                }
+                for span in line["spans"]
+            ])
+    return span_lines
+
+
+def build_parsed_cv(pages: List[ParsedPage], source: Optional[str] = None) -> ParsedCV:
+    """
+    Construye un ParsedCV a partir de sus páginas.
+    """
+    text = "\n".join(page.text for page in pages)
+    lines = [ln.strip() for ln in text.split("\n") if ln.strip()]
+    return ParsedCV(text=text, text_lower=text.lower(), lines=lines, pages=pages, source=source)
+
+
+def _open_pdf(source: Union[str, bytes]):
+    """
+    Abre el PDF; un archivo inexistente, vacío, dañado o protegido con
+    contraseña lanza ValueError con un mensaje claro.
+    """
+    name = source if isinstance(source, str) else "(en memoria)"
+    try:
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            doc = fitz.open(stream=source, filetype="pdf")
+        else:
+            doc = fitz.open(source)
+    except (fitz.FileDataError, fitz.FileNotFoundError) as e:
+        raise ValueError(f"No se pudo leer el PDF {name}: {e}") from e
+    if doc.needs_pass:
+        doc.close()
+        raise ValueError(f"El PDF {name} está protegido con contraseña.")
+    return doc
+
+
+def parse_cv(pdf_path: Union[str, bytes], on_page: Optional[Callable[[int, int], None]] = None) -> ParsedCV:
+    """
+    Abre el PDF una sola vez y recorre cada página una sola vez con
+    `get_text("dict")`: de ahí salen el texto (OCR solo en páginas sin texto),
+    las imágenes de páginas híbridas y los spans. Acepta una ruta o los bytes del archivo (cargas
+    en memoria). Lanza ValueError si el PDF no se puede abrir; así un archivo
+    dañado termina el trabajo con error en vez de puntuar 0 % (y quedar en caché).
+    `on_page(número, total)` se llama a medida que el texto de cada página queda listo.
+    """
+    source = pdf_path if isinstance(pdf_path, str) else None
+    with _open_pdf(pdf_path) as doc:
+        total = doc.page_count
+        layouts = [page.get_text("dict") for page in doc]
+        pages_text = extract_pages_with_ocr(
+            doc, on_page=(lambda number: on_page(number, total)) if on_page else None, layouts=layouts
+        )
+        pages = []
+        for page, page_text, layout in zip(doc, pages_text, layouts):
+            span_lines = _page_span_lines(layout)
+            has_layer = any(span["text"].strip() for line in span_lines for span in line)
+            pages.append(ParsedPage(
+                number=page.number,
+                text=page_text,
+                span_lines=span_lines if has_layer else [],
+                ocr=not has_layer,
+            ))
+
+    return build_parsed_cv(pages, source=source)
+
+
+def as_parsed_cv(cv: Union[ParsedCV, str, bytes]) -> ParsedCV:
+    """
+    Acepta un ParsedCV, una ruta a PDF o sus bytes (compatibilidad con llamadas antiguas).
+    """
+    if isinstance(cv, ParsedCV):
+        return cv
+    return parse_cv(cv)
@@ -1,72 +1,57 @@
 # extractors.py
 import re
 from collections import Counter
-from typing import Dict, List, Tuple, Optional
+
+import numpy as np
+from typing import Dict, List, Tuple, Optional, Union
 
 # Importar funciones de utils (asegúrate de que utils.py esté en el mismo paquete)
-from .utils import extract_text_with_ocr, extract_cleaned_lines
+from .utils import extract_cleaned_lines
+from .document import ParsedCV, as_parsed_cv
+from .matcher import IndicatorMatcher, KeywordMatcher, compile_indicator_matcher
+from .scoring import ChapterMatrix, batch_relevant_line_counts
+from .sections import get_section_table
 
 
 # ---------------------------
 #  EXTRACTORES PARA FORMATO SIMPLIFICADO
 # ---------------------------
 
-def extract_profile_section_with_ocr(pdf_path: str) -> str:
+def extract_profile_section_with_ocr(cv: ParsedCV) -> str:
     """
     Extrae la sección 'Perfil' de un PDF (OCR fallback).
     Retorna cadena limpia o '' si no se encuentra.
     """
-    text = extract_text_with_ocr(pdf_path)
+    cv = as_parsed_cv(cv)
+    text = cv.text
     if not text:
         return ""
 
-    start_keyword = "perfil"
-    end_keywords = ["asistencia a eventos", "actualización profesional", "asistencia eventos", "experiencia en aneiap"]
-
-    start_idx = text.lower().find(start_keyword)
-    if start_idx == -1:
+    section_text = get_section_table(cv).slice("profile")
+    if section_text is None:
         return ""
 
-    end_idx = len(text)
-    for kw in end_keywords:
-        idx = text.lower().find(kw, start_idx)
-        if idx != -1:
-            end_idx = min(end_idx, idx)
-
-    candidate_profile_text = text[start_idx:end_idx].strip()
+    candidate_profile_text = section_text.strip()
     cleaned = re.sub(r"[^\w\s.,;:()\-]", "", candidate_profile_text)
     cleaned = re.sub(r"\s+", " ", cleaned).strip()
     return cleaned
 
 
-def extract_experience_section_with_ocr(pdf_path: str) -> Optional[str]:
+def extract_experience_section_with_ocr(cv: ParsedCV) -> Optional[str]:
     """
     Extrae la sección 'EXPERIENCIA EN ANEIAP'. Retorna texto limpió o None si no existe.
     """
-    text = extract_text_with_ocr(pdf_path)
+    cv = as_parsed_cv(cv)
+    text = cv.text
     if not text:
         return None
 
     start_keyword = "experiencia en aneiap"
-    end_keywords = [
-        "eventos organizados",
-        "reconocimientos individuales",
-        "reconocimientos grupales",
-        "reconocimientos",
-        "asistencia a eventos"
-    ]
-
-    start_idx = text.lower().find(start_keyword)
-    if start_idx == -1:
+    section_text = get_section_table(cv).slice("experience")
+    if section_text is None:
         return None
 
-    end_idx = len(text)
-    for kw in end_keywords:
-        idx = text.lower().find(kw, start_idx)
-        if idx != -1:
-            end_idx = min(end_idx, idx)
-
-    experience_text = text[start_idx:end_idx].strip()
+    experience_text = section_text.strip()
     lines = experience_text.split("\n")
     exclude = {
         "a nivel capitular", "a nivel nacional", "a nivel seccional",
@@ -87,28 +72,21 @@ def extract_experience_section_with_ocr(pdf_path: str) -> Optional[str]:
     return "\n".join(cleaned_lines)
 
 
-def extract_event_section_with_ocr(pdf_path: str) -> Optional[str]:
+def extract_event_section_with_ocr(cv: ParsedCV) -> Optional[str]:
     """
     Extrae la sección 'EVENTOS ORGANIZADOS'. Retorna texto o None.
     """
-    text = extract_text_with_ocr(pdf_path)
+    cv = as_parsed_cv(cv)
+    text = cv.text
     if not text:
         return None
 
     start_keyword = "eventos organizados"
-    end_keywords = ["experiencia laboral", "firma", "reconocimientos", "asistencia a eventos"]
-
-    start_idx = text.lower().find(start_keyword)
-    if start_idx == -1:
+    section_text = get_section_table(cv).slice("events")
+    if section_text is None:
         return None
 
-    end_idx = len(text)
-    for kw in end_keywords:
-        idx = text.lower().find(kw, start_idx)
-        if idx != -1:
-            end_idx = min(end_idx, idx)
-
-    org_text = text[start_idx:end_idx].strip()
+    org_text = section_text.strip()
     lines = org_text.split("\n")
     exclude = {"a nivel capitular", "a nivel nacional", "a nivel seccional"}
 
@@ -126,31 +104,22 @@ def extract_event_section_with_ocr(pdf_path: str) -> Optional[str]:
     return "\n".join(cleaned)
 
 
-def extract_attendance_section_with_ocr(pdf_path: str) -> Optional[str]:
+def extract_attendance_section_with_ocr(cv: ParsedCV) -> Optional[str]:
     """
     Extrae la sección 'ASISTENCIA A EVENTOS ANEIAP'. Retorna texto o None.
     """
-    text = extract_text_with_ocr(pdf_path)
+    cv = as_parsed_cv(cv)
+    text = cv.text
     if not text:
         return None
 
     start_keyword = "asistencia a eventos aneiap"
-    end_keywords = ["actualización profesional", "experiencia en aneiap", "eventos organizados", "reconocimientos"]
-
-    start_idx = text.lower().find(start_keyword)
-    if start_idx == -1:
-        # Intentar variante sin "aneiap"
-        start_idx = text.lower().find("asistencia a eventos")
-        if start_idx == -1:
-            return None
-
-    end_idx = len(text)
-    for kw in end_keywords:
-        idx = text.lower().find(kw, start_idx)
-        if idx != -1:
-            end_idx = min(end_idx, idx)
-
-    att_text = text[start_idx:end_idx].strip()
+    # Incluye la variante sin "aneiap" (ver SECTION_RULES)
+    section_text = get_section_table(cv).slice("attendance")
+    if section_text is None:
+        return None
+
+    att_text = section_text.strip()
     lines = att_text.split("\n")
     exclude = {"a nivel capitular", "a nivel nacional", "a nivel seccional", "capitular", "seccional", "nacional"}
 
@@ -168,23 +137,38 @@ def extract_attendance_section_with_ocr(pdf_path: str) -> Optional[str]:
     return "\n".join(cleaned)
 
 
+def extract_indicator_lines(cv: ParsedCV) -> List[str]:
+    """
+    Líneas limpias de perfil, experiencia, eventos y asistencia: lo que se
+    compara con los indicadores del cargo.
+    """
+    cv = as_parsed_cv(cv)
+    return extract_cleaned_lines([
+        extract_profile_section_with_ocr(cv),
+        extract_experience_section_with_ocr(cv) or "",
+        extract_event_section_with_ocr(cv) or "",
+        extract_attendance_section_with_ocr(cv) or "",
+    ])
+
+
 # ---------------------------
 #  FORMAT DESCRIPTIVO (encabezados en negrita + detalles)
 # ---------------------------
 
-def extract_text_with_headers_and_details(pdf_path: str) -> Dict[str, List[str]]:
+def extract_text_with_headers_and_details(cv: ParsedCV) -> Dict[str, List[str]]:
     """
     Extrae encabezados (negrita si está presente) y detalles.
     Retorna dict {header: [detail_lines...]}.
-    Nota: depende de que extract_text_with_ocr devuelva texto con suficiente info;
+    Nota: depende de que el texto del ParsedCV tenga suficiente info;
     si quieres distinguir negrita estrictamente, hay que usar fitz.get_text('dict') (más abajo).
     """
     # Implementación robusta usando el texto general: busca líneas en MAYÚSCULAS o con patrón de título.
-    text = extract_text_with_ocr(pdf_path)
+    cv = as_parsed_cv(cv)
+    text = cv.text
     if not text:
         return {}
 
-    lines = [ln.strip() for ln in text.split("\n") if ln.strip()]
+    lines = cv.lines
     items = {}
     current_header = None
 
@@ -203,30 +187,21 @@ def extract_text_with_headers_and_details(pdf_path: str) -> Dict[str, List[str]]
     return items
 
 
-def extract_experience_items_with_details(pdf_path: str) -> Dict[str, List[str]]:
+def extract_experience_items_with_details(cv: ParsedCV) -> Dict[str, List[str]]:
     """
     Extrae encabezados y detalles SOLO de la sección 'EXPERIENCIA EN ANEIAP'.
     Usa extract_text_with_headers_and_details y filtra por la sección.
     """
-    text = extract_text_with_ocr(pdf_path)
+    cv = as_parsed_cv(cv)
+    text = cv.text
     if not text:
         return {}
 
     # localizar la sección y luego aplicar la función de encabezados a ese fragmento
-    start_kw = "experiencia en aneiap"
-    start_idx = text.lower().find(start_kw)
-    if start_idx == -1:
+    subtext = get_section_table(cv).slice("experience_items")
+    if subtext is None:
         return {}
 
-    # delimitar fin de sección
-    end_keywords = ["reconocimientos", "eventos organizados", "asistencia a eventos", "experiencia laboral"]
-    end_idx = len(text)
-    for kw in end_keywords:
-        idx = text.lower().find(kw, start_idx)
-        if idx != -1:
-            end_idx = min(end_idx, idx)
-
-    subtext = text[start_idx:end_idx]
     # ahora parsear encabezados
     lines = [ln.strip() for ln in subtext.split("\n") if ln.strip()]
     items = {}
@@ -242,27 +217,19 @@ def extract_experience_items_with_details(pdf_path: str) -> Dict[str, List[str]]
     return items
 
 
-def extract_event_items_with_details(pdf_path: str) -> Dict[str, List[str]]:
+def extract_event_items_with_details(cv: ParsedCV) -> Dict[str, List[str]]:
     """
     Extrae encabezados y detalles de 'EVENTOS ORGANIZADOS'.
     """
-    text = extract_text_with_ocr(pdf_path)
+    cv = as_parsed_cv(cv)
+    text = cv.text
     if not text:
         return {}
 
-    start_kw = "eventos organizados"
-    start_idx = text.lower().find(start_kw)
-    if start_idx == -1:
+    subtext = get_section_table(cv).slice("event_items")
+    if subtext is None:
         return {}
 
-    end_keywords = ["firma", "experiencia laboral", "asistencia a eventos"]
-    end_idx = len(text)
-    for kw in end_keywords:
-        idx = text.lower().find(kw, start_idx)
-        if idx != -1:
-            end_idx = min(end_idx, idx)
-
-    subtext = text[start_idx:end_idx]
     lines = [ln.strip() for ln in subtext.split("\n") if ln.strip()]
     items = {}
     current = None
@@ -276,30 +243,20 @@ def extract_event_items_with_details(pdf_path: str) -> Dict[str, List[str]]:
     return items
 
 
-def extract_asistencia_items_with_details(pdf_path: str) -> Dict[str, List[str]]:
+def extract_asistencia_items_with_details(cv: ParsedCV) -> Dict[str, List[str]]:
     """
     Extrae encabezados y detalles de 'Asistencia a eventos ANEIAP'.
     Excluye campos irrelevantes como 'Dirección de residencia:'.
     """
-    text = extract_text_with_ocr(pdf_path)
+    cv = as_parsed_cv(cv)
+    text = cv.text
     if not text:
         return {}
 
-    start_kw = "asistencia a eventos aneiap"
-    start_idx = text.lower().find(start_kw)
-    if start_idx == -1:
-        start_idx = text.lower().find("asistencia a eventos")
-        if start_idx == -1:
-            return {}
-
-    end_keywords = ["actualización profesional", "firma", "experiencia en aneiap"]
-    end_idx = len(text)
-    for kw in end_keywords:
-        idx = text.lower().find(kw, start_idx)
-        if idx != -1:
-            end_idx = min(end_idx, idx)
-
-    subtext = text[start_idx:end_idx]
+    subtext = get_section_table(cv).slice("attendance_items")
+    if subtext is None:
+        return {}
+
     lines = [ln.strip() for ln in subtext.split("\n") if ln.strip()]
     excluded_terms = {"dirección de residencia:", "tiempo en aneiap:", "medios de comunicación:"}
 
@@ -320,38 +277,32 @@ def extract_asistencia_items_with_details(pdf_path: str) -> Dict[str, List[str]]
 # ---------------------------
 #  PRESENTACIÓN (resumen limpio)
 # ---------------------------
-def extract_profile_section_with_details(pdf_path: str) -> str:
+def extract_profile_section_with_details(cv: ParsedCV) -> str:
     """
     Extrae la sección 'Perfil' retornando texto continuo (detalles).
     """
-    text = extract_text_with_ocr(pdf_path)
+    cv = as_parsed_cv(cv)
+    text = cv.text
     if not text:
         return ""
 
-    start_kw = "perfil"
-    start_idx = text.lower().find(start_kw)
-    if start_idx == -1:
+    section_text = get_section_table(cv).slice("profile_details")
+    if section_text is None:
         return ""
 
-    end_keywords = ["asistencia a eventos aneiap", "actualización profesional", "asistencia a eventos"]
-    end_idx = len(text)
-    for kw in end_keywords:
-        idx = text.lower().find(kw, start_idx)
-        if idx != -1:
-            end_idx = min(end_idx, idx)
-
-    candidate_profile_text = text[start_idx:end_idx].strip()
+    candidate_profile_text = section_text.strip()
     cleaned = re.sub(r"\s+", " ", candidate_profile_text)
     cleaned = re.sub(r"[^\w\s.,;:()\-]", "", cleaned).strip()
     return cleaned
 
 
-def evaluate_cv_presentation_with_headers(pdf_path: str) -> Tuple[Optional[dict], Optional[str]]:
+def evaluate_cv_presentation_with_headers(cv: ParsedCV) -> Tuple[Optional[dict], Optional[str]]:
     """
     Evalúa la presentación de la HV usando encabezados y detalles.
     Retorna dict con métricas por sección o (None, mensaje_error).
     """
-    text = extract_text_with_ocr(pdf_path)
+    cv = as_parsed_cv(cv)
+    text = cv.text
     if not text:
         return None, "No se pudo extraer texto del archivo PDF."
 
@@ -389,33 +340,83 @@ def evaluate_cv_presentation_with_headers(pdf_path: str) -> Tuple[Optional[dict]
 # ---------------------------
 #  INDICADORES (funciones auxiliares ya definidas en main)
 # ---------------------------
-def calculate_all_indicators(lines: List[str], position_indicators: Dict[str, List[str]]) -> Dict[str, float]:
+def calculate_all_indicators(lines: Union[List[str], ParsedCV],
+                             position_indicators: Union[Dict[str, List[str]], IndicatorMatcher],
+                             all_positions: bool = False):
     """
     Calcula el porcentaje por indicador sobre la lista de líneas (EXPERIENCIA).
+    Acepta también un ParsedCV, en cuyo caso usa todas sus líneas.
+    Las coincidencias salen de un solo recorrido del autómata de palabras clave.
+
+    Con all_positions=True recibe los indicadores de todo el capítulo
+    ({cargo: {indicador: [palabras]}} o un ChapterMatrix precalculado) y retorna
+    la tabla de cargos ordenada por puntaje, calculada en una sola pasada.
     """
+    if isinstance(lines, ParsedCV):
+        lines = lines.lines
+    if all_positions:
+        return rank_positions(lines, position_indicators)
+
+    matcher = compile_indicator_matcher(position_indicators)
     total_lines = len(lines)
     if total_lines == 0:
-        return {indicator: 0.0 for indicator in position_indicators}
+        return {indicator: 0.0 for indicator in matcher.indicators}
 
-    results = {}
-    for indicator, keywords in position_indicators.items():
-        relevant = sum(1 for line in lines if any(kw.lower() in line.lower() for kw in keywords))
-        results[indicator] = round((relevant / total_lines) * 100, 2)
-    return results
+    counts = matcher.relevant_line_counts(lines)
+    return {indicator: round((relevant / total_lines) * 100, 2) for indicator, relevant in counts.items()}
 
 
-def calculate_indicators_for_report(lines: List[str], position_indicators: Dict[str, List[str]]):
+def rank_positions(lines: Union[List[str], ParsedCV],
+                   chapter_indicators: Union[Dict[str, Dict[str, List[str]]], ChapterMatrix]) -> List[Dict]:
+    """
+    Puntúa un CV contra todos los cargos de un capítulo y retorna
+    [{'position', 'score', 'indicators': {...}}] de mayor a menor puntaje.
+    """
+    if isinstance(lines, ParsedCV):
+        lines = lines.lines
+    if not isinstance(chapter_indicators, ChapterMatrix):
+        vocabulary = (kw for indicators in chapter_indicators.values() for kws in indicators.values() for kw in kws)
+        chapter_indicators = ChapterMatrix(chapter_indicators, KeywordMatcher(vocabulary))
+    return chapter_indicators.rank(lines)
+
+
+def calculate_indicators_for_report(lines: Union[List[str], ParsedCV],
+                                    position_indicators: Union[Dict[str, List[str]], IndicatorMatcher]):
     """
     Devuelve dict con {'indicator': {'percentage': X, 'relevant_lines': Y}}
+    Acepta también un ParsedCV, en cuyo caso usa todas sus líneas.
     """
+    if isinstance(lines, ParsedCV):
+        lines = lines.lines
+    matcher = compile_indicator_matcher(position_indicators)
     total_lines = len(lines)
     if total_lines == 0:
-        return {indicator: {"percentage": 0.0, "relevant_lines": 0} for indicator in position_indicators}
+        return {indicator: {"percentage": 0.0, "relevant_lines": 0} for indicator in matcher.indicators}
 
     results = {}
-    for indicator, keywords in position_indicators.items():
-        relevant_count = sum(1 for line in lines if any(kw.lower() in line.lower() for kw in keywords))
+    for indicator, relevant_count in matcher.relevant_line_counts(lines).items():
         percentage = round((relevant_count / total_lines) * 100, 2)
         results[indicator] = {"percentage": percentage, "relevant_lines": relevant_count}
     return results
 
+
+def calculate_indicators_for_report_batch(cvs: List[Union[List[str], ParsedCV]],
+                                          position_indicators: Union[Dict[str, List[str]], IndicatorMatcher]):
+    """
+    Versión por lotes de calculate_indicators_for_report para N candidatos y un cargo.
+    Retorna una lista (en el orden de entrada) de
+    {'indicator': {'percentage': X, 'relevant_lines': Y}}.
+    """
+    matcher = compile_indicator_matcher(position_indicators)
+    lines_per_cv = [cv.lines if isinstance(cv, ParsedCV) else cv for cv in cvs]
+    counts, sizes = batch_relevant_line_counts(lines_per_cv, matcher)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        percentages = np.where(sizes[:, None] > 0, counts / sizes[:, None] * 100, 0.0)
+
+    return [
+        {
+            indicator: {"percentage": round(float(percentages[i, j]), 2), "relevant_lines": int(counts[i, j])}
+            for j, indicator in enumerate(matcher.indicators)
+        }
+        for i in range(len(lines_per_cv))
+    ]
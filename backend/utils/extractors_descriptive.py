@@ -1,189 +1,134 @@
-import fitz  # PyMuPDF
-import re
-from spellchecker import SpellChecker
-import textstat
-from utils.ocr import extract_text_with_ocr
+from .document import as_parsed_cv
+from .presentation import get_presentation_engine
 
 
 # ============================================================
-# EXTRACCIÓN GENERAL DE TEXTO CON ENCABEZADOS Y DETALLES
+# RECORRIDO ÚNICO DE SPANS (todas las secciones a la vez)
 # ============================================================
 
-def extract_text_with_headers_and_details(pdf_path):
+# nombre: (inicio, fines, términos excluidos, agrupa por encabezados)
+# Sin inicio = todo el documento.
+DESCRIPTIVE_SECTIONS = {
+    "headers": (None, (), (), True),
+    "experience": ("experiencia en aneiap", ("reconocimientos", "eventos organizados"), (), True),
+    "events": ("eventos organizados", ("firma", "experiencia laboral"), (), True),
+    "attendance": (
+        "asistencia a eventos aneiap",
+        ("actualización profesional", "firma"),
+        ("dirección de residencia:", "tiempo en aneiap:", "medios de comunicación:"),
+        True,
+    ),
+    "profile": ("perfil", ("asistencia a eventos aneiap", "actualización profesional"), (), False),
+}
+
+
+class _SectionState:
     """
-    Extrae encabezados (en negrita) y detalles de un PDF.
-    Devuelve un diccionario con encabezados como claves y detalles como listas de texto.
+    Estado de una sección dentro del recorrido: si está abierta, el encabezado
+    actual y lo acumulado. `line_closed` descarta el resto de la línea tras un fin.
     """
-    items = {}
-    current_header = None
 
-    with fitz.open(pdf_path) as doc:
-        for page in doc:
-            for block in page.get_text("dict")["blocks"]:
-                if "lines" not in block:
-                    continue
-                for line in block["lines"]:
-                    for span in line["spans"]:
-                        text = span["text"].strip()
-                        if not text:
-                            continue
+    def __init__(self, start, ends, excluded, grouped):
+        self.start = start
+        self.ends = ends
+        self.excluded = excluded
+        self.grouped = grouped
+        self.in_section = start is None
+        self.line_closed = False
+        self.current_item = None
+        self.items = {}
+        self.text_content = []
+
+    def feed(self, text, lower_text, bold):
+        if self.line_closed or lower_text in self.excluded:
+            return
+        if self.start is not None:
+            if self.start in lower_text:
+                self.in_section = True
+                return
+            if any(k in lower_text for k in self.ends):
+                self.in_section = False
+                self.line_closed = True
+                return
+            if not self.in_section:
+                return
+
+        if not self.grouped:
+            self.text_content.append(text)
+        elif bold and not text.startswith("-"):
+            self.current_item = text
+            self.items[self.current_item] = []
+        elif self.current_item:
+            self.items[self.current_item].append(text)
+
+    def result(self):
+        return self.items if self.grouped else " ".join(self.text_content).strip()
+
+
+def walk_descriptive_sections(cv):
+    """
+    Recorre los spans de la hoja de vida una sola vez con una máquina de estados
+    por sección y retorna {sección: resultado} para todas las de DESCRIPTIVE_SECTIONS.
+    El resultado se guarda en el ParsedCV, así las demás llamadas no recorren de nuevo.
+    """
+    cv = as_parsed_cv(cv)
+    cached = cv.cache.get("descriptive_sections")
+    if cached is not None:
+        return cached
+
+    states = {name: _SectionState(*spec) for name, spec in DESCRIPTIVE_SECTIONS.items()}
+    for line_spans in cv.iter_span_lines():
+        for state in states.values():
+            state.line_closed = False
+        for span in line_spans:
+            text = span["text"].strip()
+            if not text:
+                continue
+            lower_text = text.lower()
+            bold = "bold" in span["font"].lower()
+            for state in states.values():
+                state.feed(text, lower_text, bold)
+
+    sections = {name: state.result() for name, state in states.items()}
+    cv.cache["descriptive_sections"] = sections
+    return sections
 
-                        if "bold" in span["font"].lower() and not text.startswith("-"):
-                            current_header = text
-                            items[current_header] = []
-                        elif current_header:
-                            items[current_header].append(text)
 
-    return items
+# ============================================================
+# EXTRACCIÓN GENERAL DE TEXTO CON ENCABEZADOS Y DETALLES
+# ============================================================
+
+def extract_text_with_headers_and_details(cv):
+    """
+    Extrae encabezados (en negrita) y detalles de un PDF.
+    Devuelve un diccionario con encabezados como claves y detalles como listas de texto.
+    """
+    return walk_descriptive_sections(cv)["headers"]
 
 
 # ============================================================
 # EXTRACCIÓN DE SECCIONES ESPECÍFICAS
 # ============================================================
 
-def extract_experience_items_with_details(pdf_path):
+def extract_experience_items_with_details(cv):
     """ Extrae encabezados y detalles de la sección 'EXPERIENCIA EN ANEIAP'. """
-    items = {}
-    current_item = None
-    in_section = False
-
-    with fitz.open(pdf_path) as doc:
-        for page in doc:
-            for block in page.get_text("dict")["blocks"]:
-                if "lines" not in block:
-                    continue
-                for line in block["lines"]:
-                    for span in line["spans"]:
-                        text = span["text"].strip()
-                        if not text:
-                            continue
-
-                        # Detectar inicio y fin
-                        lower_text = text.lower()
-                        if "experiencia en aneiap" in lower_text:
-                            in_section = True
-                            continue
-                        elif any(k in lower_text for k in ["reconocimientos", "eventos organizados"]):
-                            in_section = False
-                            break
-
-                        if not in_section:
-                            continue
-
-                        # Detectar encabezados (negrita)
-                        if "bold" in span["font"].lower() and not text.startswith("-"):
-                            current_item = text
-                            items[current_item] = []
-                        elif current_item:
-                            items[current_item].append(text)
-
-    return items
-
-
-def extract_event_items_with_details(pdf_path):
+    return walk_descriptive_sections(cv)["experience"]
+
+
+def extract_event_items_with_details(cv):
     """ Extrae encabezados y detalles de la sección 'EVENTOS ORGANIZADOS'. """
-    items = {}
-    current_item = None
-    in_section = False
-
-    with fitz.open(pdf_path) as doc:
-        for page in doc:
-            for block in page.get_text("dict")["blocks"]:
-                if "lines" not in block:
-                    continue
-                for line in block["lines"]:
-                    for span in line["spans"]:
-                        text = span["text"].strip()
-                        if not text:
-                            continue
-
-                        lower_text = text.lower()
-                        if "eventos organizados" in lower_text:
-                            in_section = True
-                            continue
-                        elif any(k in lower_text for k in ["firma", "experiencia laboral"]):
-                            in_section = False
-                            break
-
-                        if not in_section:
-                            continue
-
-                        if "bold" in span["font"].lower() and not text.startswith("-"):
-                            current_item = text
-                            items[current_item] = []
-                        elif current_item:
-                            items[current_item].append(text)
-
-    return items
-
-
-def extract_asistencia_items_with_details(pdf_path):
+    return walk_descriptive_sections(cv)["events"]
+
+
+def extract_asistencia_items_with_details(cv):
     """ Extrae encabezados y detalles de la sección 'Asistencia a eventos ANEIAP'. """
-    items = {}
-    current_item = None
-    in_section = False
-    excluded_terms = {"dirección de residencia:", "tiempo en aneiap:", "medios de comunicación:"}
-
-    with fitz.open(pdf_path) as doc:
-        for page in doc:
-            for block in page.get_text("dict")["blocks"]:
-                if "lines" not in block:
-                    continue
-                for line in block["lines"]:
-                    for span in line["spans"]:
-                        text = span["text"].strip()
-                        lower_text = text.lower()
-                        if not text or lower_text in excluded_terms:
-                            continue
-
-                        if "asistencia a eventos aneiap" in lower_text:
-                            in_section = True
-                            continue
-                        elif any(k in lower_text for k in ["actualización profesional", "firma"]):
-                            in_section = False
-                            break
-
-                        if not in_section:
-                            continue
-
-                        if "bold" in span["font"].lower() and not text.startswith("-"):
-                            current_item = text
-                            items[current_item] = []
-                        elif current_item:
-                            items[current_item].append(text)
-
-    return items
-
-
-def extract_profile_section_with_details(pdf_path):
-    """ Extrae la sección 'Perfil' del archivo PDF. """
-    text_content = []
-    in_section = False
+    return walk_descriptive_sections(cv)["attendance"]
+
 
+def extract_profile_section_with_details(cv):
+    """ Extrae la sección 'Perfil' del archivo PDF. """
     try:
-        with fitz.open(pdf_path) as doc:
-            for page in doc:
-                for block in page.get_text("dict")["blocks"]:
-                    if "lines" not in block:
-                        continue
-                    for line in block["lines"]:
-                        for span in line["spans"]:
-                            text = span["text"].strip()
-                            if not text:
-                                continue
-
-                            lower_text = text.lower()
-                            if "perfil" in lower_text:
-                                in_section = True
-                                continue
-                            elif any(k in lower_text for k in ["asistencia a eventos aneiap", "actualización profesional"]):
-                                in_section = False
-                                break
-
-                            if in_section:
-                                text_content.append(text)
-
-        return " ".join(text_content).strip()
+        return walk_descriptive_sections(cv)["profile"]
     except Exception as e:
         print(f"⚠️ Error en extract_profile_section_with_details: {e}")
         return ""
@@ -193,49 +138,12 @@ def extract_profile_section_with_details(pdf_path):
 # EVALUACIÓN DE PRESENTACIÓN DE LA HOJA DE VIDA
 # ============================================================
 
-def evaluate_cv_presentation_with_headers(pdf_path):
+def evaluate_cv_presentation_with_headers(cv):
     """
     Evalúa ortografía, capitalización y coherencia general del texto de la hoja de vida.
+    Usa el motor de presentación del proceso (diccionario cargado una sola vez).
     """
-    text = extract_text_with_ocr(pdf_path)
+    text = as_parsed_cv(cv).text
     if not text:
         return None, "No se pudo extraer texto del PDF."
-
-    spell = SpellChecker(language="es")
-
-    def evaluate_spelling(text):
-        """Evalúa la ortografía general (0–100)."""
-        words = text.split()
-        if len(words) < 2:
-            return 100
-        misspelled = spell.unknown(words)
-        return round(((len(words) - len(misspelled)) / len(words)) * 100, 2)
-
-    def evaluate_capitalization(text):
-        """Evalúa el uso correcto de mayúsculas en oraciones."""
-        sentences = re.split(r"[.!?]\s*", text.strip())
-        sentences = [s for s in sentences if s]
-        if not sentences:
-            return 100
-        correct = sum(1 for s in sentences if s and s[0].isupper())
-        return round((correct / len(sentences)) * 100, 2)
-
-    def evaluate_coherence(text):
-        """Evalúa coherencia con Flesch-Kincaid adaptado."""
-        try:
-            score = 100 - textstat.flesch_kincaid_grade(text) * 10
-            return max(0, min(100, score))
-        except Exception:
-            return 50
-
-    spelling = evaluate_spelling(text)
-    caps = evaluate_capitalization(text)
-    coherence = evaluate_coherence(text)
-    overall = round((spelling + caps + coherence) / 3, 2)
-
-    return {
-        "spelling_score": spelling,
-        "capitalization_score": caps,
-        "coherence_score": coherence,
-        "overall_score": overall,
-    }
+    return get_presentation_engine().evaluate(text)
@@ -1,6 +1,15 @@
 # indicators.py
+import hashlib
 import json
-from typing import Dict, Any
+import os
+import pickle
+import threading
+import time
+from typing import Dict, Any, List, Optional, Tuple
+
+from .cache import CACHE_DIR, _check_owner, private_dir
+from .matcher import IndicatorMatcher, KeywordMatcher
+from .scoring import ChapterMatrix
 
 
 # Ejemplo de estructura mínima de indicadores (usa mayúsculas para capítulos y códigos de cargo)
@@ -37,3 +46,298 @@ def load_indicators_from_json(path: str) -> Dict[str, Any]:
         print(f"⚠️ No se pudo cargar indicadores desde {path}: {e}. Usando DEFAULT_INDICATORS.")
         return DEFAULT_INDICATORS
 
+
+
+# ---------------------------
+#  ÍNDICE PRECOMPILADO Y VERSIONADO DE INDICADORES
+# ---------------------------
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+INDICATORS_PATH = os.path.join(BACKEND_DIR, "indicators.json")
+ADVICE_PATH = os.path.join(BACKEND_DIR, "advice.json")
+INDEX_FORMAT = 3
+# Los artefactos son pickles: van en la carpeta privada de caché, no junto al código
+INDEX_DIR = os.environ.get("INDEX_DIR", os.path.join(CACHE_DIR, "indices"))
+# Cada cuántos segundos se revisan los JSON (proceso principal) o el artefacto (workers)
+INDEX_RELOAD_INTERVAL = float(os.environ.get("INDEX_RELOAD_INTERVAL", "5"))
+
+
+def _lookup_key(name: str) -> str:
+    return name.strip().upper()
+
+
+class IndicatorIndex:
+    """
+    Indicadores listos para usar, construidos una sola vez por proceso:
+    vocabulario normalizado (minúsculas, sin tildes, sin duplicados), tablas por
+    capítulo y cargo, un autómata compartido, un matcher por cargo y una matriz
+    dispersa por capítulo para puntuar todos sus cargos, junto con los consejos. `version` es el hash del contenido de ambos JSON;
+    sirve para invalidar cachés.
+    """
+
+    def __init__(self, data: Dict[str, Any], version: str, advice: Optional[Dict[str, Any]] = None):
+        self.version = version
+        self.data = data
+        self.advice = advice or {}
+        self._chapters = {_lookup_key(ch): ch for ch in data}
+
+        vocabulary = []
+        for positions in data.values():
+            for indicators in positions.values():
+                for keywords in indicators.values():
+                    vocabulary.extend(keywords)
+        self.keyword_matcher = KeywordMatcher(vocabulary)
+        self.keywords: List[str] = self.keyword_matcher.keywords
+
+        # Muchos capítulos comparten definiciones idénticas: un matcher por contenido
+        shared: Dict[Tuple, IndicatorMatcher] = {}
+        self.position_keyword_ids: Dict[Tuple[str, str], Dict[str, Tuple[int, ...]]] = {}
+        self._matchers: Dict[Tuple[str, str], IndicatorMatcher] = {}
+        for chapter, positions in data.items():
+            for position, indicators in positions.items():
+                key = (_lookup_key(chapter), _lookup_key(position))
+                self.position_keyword_ids[key] = {
+                    indicator: tuple(sorted({self.keyword_matcher.keyword_id(kw) for kw in kws if kw}))
+                    for indicator, kws in indicators.items()
+                }
+                frozen = tuple((indicator, tuple(kws)) for indicator, kws in indicators.items())
+                if frozen not in shared:
+                    shared[frozen] = IndicatorMatcher(indicators, matcher=self.keyword_matcher)
+                self._matchers[key] = shared[frozen]
+
+        shared_chapters: Dict[Tuple, ChapterMatrix] = {}
+        self._chapter_matrices: Dict[str, ChapterMatrix] = {}
+        for chapter, positions in data.items():
+            frozen = tuple(
+                (position, tuple((indicator, tuple(kws)) for indicator, kws in indicators.items()))
+                for position, indicators in positions.items()
+            )
+            if frozen not in shared_chapters:
+                shared_chapters[frozen] = ChapterMatrix(positions, self.keyword_matcher)
+            self._chapter_matrices[_lookup_key(chapter)] = shared_chapters[frozen]
+
+    def chapters(self) -> List[str]:
+        return list(self.data)
+
+    def has_chapter(self, chapter: str) -> bool:
+        return _lookup_key(chapter) in self._chapters
+
+    def has_position(self, chapter: str, position: str) -> bool:
+        """
+        Indica si el cargo existe en el capítulo (sin distinguir mayúsculas).
+        """
+        return (_lookup_key(chapter), _lookup_key(position)) in self._matchers
+
+    def chapter_indicators(self, chapter: str) -> Dict[str, Dict[str, List[str]]]:
+        """
+        {cargo: {indicador: [palabras clave]}} del capítulo ({} si no existe).
+        """
+        return self.data.get(self._chapters.get(_lookup_key(chapter), chapter), {})
+
+    def position_indicators(self, chapter: str, position: str) -> Dict[str, List[str]]:
+        """
+        {indicador: [palabras clave]} del cargo en el capítulo ({} si no existe).
+        """
+        positions = self.chapter_indicators(chapter)
+        for name, indicators in positions.items():
+            if _lookup_key(name) == _lookup_key(position):
+                return indicators
+        return {}
+
+    def matcher(self, chapter: str, position: str) -> IndicatorMatcher:
+        """
+        Matcher precompilado del cargo (uno vacío si el cargo no existe).
+        """
+        matcher = self._matchers.get((_lookup_key(chapter), _lookup_key(position)))
+        return matcher if matcher is not None else IndicatorMatcher({}, matcher=self.keyword_matcher)
+
+    def chapter_matrix(self, chapter: str) -> ChapterMatrix:
+        """
+        Matriz precalculada (cargo·indicador × palabra clave) del capítulo.
+        """
+        matrix = self._chapter_matrices.get(_lookup_key(chapter))
+        return matrix if matrix is not None else ChapterMatrix({}, self.keyword_matcher)
+
+    def save(self, path: str):
+        """
+        Serializa el índice a un artefacto binario compacto.
+        """
+        private_dir(os.path.dirname(path) or ".")
+        tmp_path = f"{path}.tmp{os.getpid()}"
+        with open(tmp_path, "wb") as f:
+            pickle.dump((INDEX_FORMAT, self.version, self), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def load(path: str, expected_version: Optional[str] = None) -> Optional["IndicatorIndex"]:
+        """
+        Carga un artefacto. Retorna None si no existe, es de otro formato o de otra versión.
+        """
+        try:
+            _check_owner(path)
+            with open(path, "rb") as f:
+                fmt, version, index = pickle.load(f)
+        except Exception:
+            return None
+        if fmt != INDEX_FORMAT or (expected_version and version != expected_version):
+            return None
+        return index
+
+
+def sources_version(*paths: str) -> str:
+    """
+    Hash del contenido de los archivos fuente (indicadores y consejos).
+    """
+    h = hashlib.sha256()
+    for path in paths:
+        try:
+            with open(path, "rb") as f:
+                h.update(f.read())
+        except OSError:
+            h.update(json.dumps(DEFAULT_INDICATORS, sort_keys=True).encode())
+        h.update(b"\0")
+    return h.hexdigest()[:16]
+
+
+def _artifact_path(path: str) -> str:
+    """
+    Artefacto del índice de `path` en INDEX_DIR (uno por ruta de indicadores).
+    """
+    name = os.path.splitext(os.path.basename(path))[0]
+    digest = hashlib.sha256(os.path.abspath(path).encode()).hexdigest()[:12]
+    return os.path.join(INDEX_DIR, f"{name}-{digest}.idx")
+
+
+def _file_stamp(*paths: str) -> Tuple:
+    stamp = []
+    for path in paths:
+        try:
+            st = os.stat(path)
+            stamp.append((st.st_mtime_ns, st.st_size))
+        except OSError:
+            stamp.append(None)
+    return tuple(stamp)
+
+
+def build_indicator_index(path: str = INDICATORS_PATH, advice_path: str = ADVICE_PATH,
+                          artifact_path: Optional[str] = None) -> IndicatorIndex:
+    """
+    Carga el índice desde el artefacto si corresponde a la versión actual de los JSON;
+    si no, lo construye y escribe el artefacto para los demás workers.
+    """
+    version = sources_version(path, advice_path)
+    artifact_path = artifact_path or _artifact_path(path)
+    index = IndicatorIndex.load(artifact_path, expected_version=version)
+    if index is not None:
+        return index
+
+    try:
+        with open(advice_path, "r", encoding="utf-8") as f:
+            advice = json.load(f)
+    except Exception as e:
+        print(f"⚠️ No se pudo cargar consejos desde {advice_path}: {e}")
+        advice = {}
+
+    index = IndicatorIndex(load_indicators_from_json(path), version, advice=advice)
+    try:
+        index.save(artifact_path)
+    except OSError as e:
+        print(f"⚠️ No se pudo guardar el índice de indicadores en {artifact_path}: {e}")
+    return index
+
+
+# ---------------------------
+#  ÍNDICE DEL PROCESO + RECARGA EN CALIENTE
+# ---------------------------
+_index: Optional[IndicatorIndex] = None
+_index_lock = threading.Lock()
+_index_paths = (INDICATORS_PATH, ADVICE_PATH)
+_artifact_stamp: Tuple = ()
+_artifact_checked = 0.0
+_watcher: Optional["IndexWatcher"] = None
+
+
+def _swap_index(index: IndicatorIndex):
+    global _index, _artifact_stamp
+    with _index_lock:
+        _index = index
+        _artifact_stamp = _file_stamp(_artifact_path(_index_paths[0]))
+
+
+def get_indicator_index(path: str = INDICATORS_PATH, advice_path: str = ADVICE_PATH) -> IndicatorIndex:
+    """
+    Retorna el índice vigente del proceso (se construye o carga una sola vez).
+    Cada solicitud debe tomarlo una vez al empezar y usar ese mismo objeto hasta
+    terminar: una recarga posterior no altera el índice que ya tiene en mano.
+    En procesos sin vigilante (workers), detecta si el proceso principal
+    publicó un artefacto nuevo y lo carga.
+    """
+    global _index, _index_paths, _artifact_stamp, _artifact_checked
+    with _index_lock:
+        if _index is None:
+            _index_paths = (path, advice_path)
+            _index = build_indicator_index(path, advice_path)
+            _artifact_stamp = _file_stamp(_artifact_path(path))
+            _artifact_checked = time.monotonic()
+        elif _watcher is None and time.monotonic() - _artifact_checked >= INDEX_RELOAD_INTERVAL:
+            _artifact_checked = time.monotonic()
+            stamp = _file_stamp(_artifact_path(_index_paths[0]))
+            if stamp != _artifact_stamp:
+                _artifact_stamp = stamp
+                published = IndicatorIndex.load(_artifact_path(_index_paths[0]))
+                if published is not None and published.version != _index.version:
+                    _index = published
+        return _index
+
+
+class IndexWatcher(threading.Thread):
+    """
+    Hilo que vigila indicators.json y advice.json (mtime y tamaño, luego hash).
+    Ante un cambio reconstruye el índice en segundo plano, lo publica como
+    artefacto para los workers y lo intercambia de forma atómica.
+    """
+
+    def __init__(self, interval: float = INDEX_RELOAD_INTERVAL):
+        super().__init__(name="indicator-index-watcher", daemon=True)
+        self.interval = interval
+        self._stop_event = threading.Event()
+        self._stamp = _file_stamp(*_index_paths)
+
+    def check(self) -> bool:
+        """
+        Revisa los archivos una vez. Retorna True si se cargó una versión nueva.
+        """
+        stamp = _file_stamp(*_index_paths)
+        if stamp == self._stamp:
+            return False
+        self._stamp = stamp
+        current = get_indicator_index(*_index_paths)
+        if sources_version(*_index_paths) == current.version:
+            return False
+        try:
+            index = build_indicator_index(*_index_paths)
+        except Exception as e:
+            print(f"⚠️ No se pudo recargar el índice de indicadores: {e}")
+            return False
+        _swap_index(index)
+        print(f"🔄 Índice de indicadores recargado (versión {index.version}).")
+        return True
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            self.check()
+
+    def stop(self):
+        self._stop_event.set()
+
+
+def start_index_watcher(interval: float = INDEX_RELOAD_INTERVAL) -> IndexWatcher:
+    """
+    Arranca (una sola vez) el vigilante de recarga en caliente del proceso principal.
+    """
+    global _watcher
+    get_indicator_index(*_index_paths)
+    with _index_lock:
+        if _watcher is None:
+            _watcher = IndexWatcher(interval)
+            _watcher.start()
+        return _watcher
@@ -0,0 +1,369 @@
+# jobs.py
+import json
+import os
+import shutil
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, List, Optional
+
+from .cache import CACHE_DIR, private_dir
+
+
+# ============================================================
+# 🔹 CONFIGURACIÓN
+# ============================================================
+JOBS_DB_PATH = os.environ.get("JOBS_DB_PATH", os.path.join(CACHE_DIR, "jobs.sqlite3"))
+JOBS_DIR = os.environ.get("JOBS_DIR", os.path.join(CACHE_DIR, "jobs"))
+# Máximo de trabajos en cola o en ejecución; por encima se rechazan
+JOB_MAX_PENDING = int(os.environ.get("JOB_MAX_PENDING", "32"))
+# Trabajos terminados se borran (con sus archivos) pasado este tiempo
+JOB_TTL = float(os.environ.get("JOB_TTL", str(24 * 3600)))
+# Un trabajo de un proceso de otro host sin avances por este tiempo se considera
+# huérfano (en el mismo host se comprueba directamente si el proceso sigue vivo)
+JOB_STALE_AFTER = float(os.environ.get("JOB_STALE_AFTER", "900"))
+
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+
+
+class QueueFullError(Exception):
+    """
+    La cola alcanzó JOB_MAX_PENDING trabajos pendientes.
+    """
+
+
+def _owner_id() -> str:
+    """
+    Identificador de una instancia de la cola: host, pid y un sufijo único.
+    """
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex}"
+
+
+def _owner_gone(owner: str, updated: float, now: float) -> bool:
+    """
+    Indica si el proceso dueño de un trabajo ya no lo va a terminar: en este
+    host se comprueba si el pid sigue vivo; en otro, si el trabajo lleva
+    JOB_STALE_AFTER sin avances.
+    """
+    host, _, rest = owner.partition(":")
+    pid = rest.partition(":")[0]
+    if host == socket.gethostname() and pid.isdigit():
+        try:
+            os.kill(int(pid), 0)
+        except ProcessLookupError:
+            return True
+        except PermissionError:
+            return False
+        return False
+    return updated < now - JOB_STALE_AFTER
+
+
+# ============================================================
+# 🔹 COLA DE TRABAJOS PERSISTENTE (SQLite)
+# ============================================================
+class JobQueue:
+    """
+    Cola acotada de trabajos guardada en SQLite, sin servicios externos.
+    Cada trabajo tiene parámetros (JSON), una carpeta para sus archivos,
+    estado, etapa, avance, resultado y la lista de eventos de avance
+    ({"stage", "progress", ...}), que actualizan la etapa y el avance.
+    La cola se atiende desde fuera con claim()/finish(). Varios procesos pueden
+    compartir el mismo archivo: cada trabajo se reclama dentro de una
+    transacción y queda a nombre de la instancia que lo tomó; otra instancia
+    solo lo recupera si ese proceso terminó (ver _owner_gone).
+    Un trabajo puede llevar su entrada en memoria (`payload`): solo lo toma
+    esta misma instancia, y si queda huérfano se marca como fallido.
+    """
+
+    def __init__(self, path: str = JOBS_DB_PATH, jobs_dir: str = JOBS_DIR,
+                 max_pending: int = JOB_MAX_PENDING, poll_interval: float = 1.0):
+        self.path = path
+        self.jobs_dir = jobs_dir
+        self.max_pending = max_pending
+        self.poll_interval = poll_interval
+        self._local = threading.local()
+        self.owner = _owner_id()
+        self._payloads: Dict[str, bytes] = {}
+        self._payloads_lock = threading.Lock()
+        private_dir(os.path.dirname(path) or ".")
+        private_dir(jobs_dir)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                " id TEXT PRIMARY KEY, status TEXT NOT NULL, stage TEXT,"
+                " progress REAL NOT NULL DEFAULT 0, params TEXT NOT NULL,"
+                " result TEXT, error TEXT, created REAL NOT NULL, updated REAL NOT NULL, owner TEXT,"
+                " in_memory INTEGER NOT NULL DEFAULT 0)"
+            )
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(jobs)")}
+            if "owner" not in columns:
+                conn.execute("ALTER TABLE jobs ADD COLUMN owner TEXT")
+            if "in_memory" not in columns:
+                conn.execute("ALTER TABLE jobs ADD COLUMN in_memory INTEGER NOT NULL DEFAULT 0")
+                # Antes solo los trabajos con entrada en memoria tenían dueño
+                conn.execute("UPDATE jobs SET in_memory = 1 WHERE owner IS NOT NULL")
+            conn.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs(status, created)")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS job_events ("
+                " seq INTEGER PRIMARY KEY AUTOINCREMENT, job_id TEXT NOT NULL,"
+                " event TEXT NOT NULL, created REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS job_events_job ON job_events(job_id, seq)")
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.row_factory = sqlite3.Row
+            self._local.conn = conn
+        return conn
+
+    def job_dir(self, job_id: str) -> str:
+        return os.path.join(self.jobs_dir, job_id)
+
+    # ---------------------------
+    #  ENCOLAR Y CONSULTAR
+    # ---------------------------
+    def submit(self, params: Dict[str, Any], save_inputs: Optional[Callable[[str], None]] = None,
+               payload: Optional[bytes] = None) -> str:
+        """
+        Crea un trabajo. `save_inputs(job_dir)` escribe sus archivos de entrada
+        antes de que quede visible para los workers; `payload` deja la entrada
+        en memoria (sin archivo). Lanza QueueFullError si la cola está llena.
+        """
+        self.prune()
+        if self.pending_count() >= self.max_pending:
+            raise QueueFullError(f"Hay {self.max_pending} trabajos pendientes.")
+
+        job_id = uuid.uuid4().hex
+        job_dir = self.job_dir(job_id)
+        os.makedirs(job_dir)
+        try:
+            if save_inputs:
+                save_inputs(job_dir)
+            conn = self._connect()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                pending = conn.execute(
+                    "SELECT COUNT(*) FROM jobs WHERE status IN (?, ?)", (QUEUED, RUNNING)
+                ).fetchone()[0]
+                if pending >= self.max_pending:
+                    raise QueueFullError(f"Hay {self.max_pending} trabajos pendientes.")
+                now = time.time()
+                if payload is not None:
+                    with self._payloads_lock:
+                        self._payloads[job_id] = payload
+                in_memory = payload is not None
+                conn.execute(
+                    "INSERT INTO jobs (id, status, params, created, updated, owner, in_memory)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (job_id, QUEUED, json.dumps(params), now, now, self.owner if in_memory else None, int(in_memory)),
+                )
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        except BaseException:
+            with self._payloads_lock:
+                self._payloads.pop(job_id, None)
+            shutil.rmtree(job_dir, ignore_errors=True)
+            raise
+        return job_id
+
+    def record(self, params: Dict[str, Any], result: Any,
+               save_outputs: Optional[Callable[[str], None]] = None) -> str:
+        """
+        Registra un trabajo ya terminado (p. ej. un resultado en caché) para
+        consultarlo con las mismas rutas. `save_outputs(job_dir)` escribe sus archivos.
+        """
+        job_id = uuid.uuid4().hex
+        job_dir = self.job_dir(job_id)
+        os.makedirs(job_dir)
+        try:
+            if save_outputs:
+                save_outputs(job_dir)
+            now = time.time()
+            self._connect().execute(
+                "INSERT INTO jobs (id, status, progress, params, result, created, updated)"
+                " VALUES (?, ?, 1.0, ?, ?, ?, ?)",
+                (job_id, DONE, json.dumps(params), json.dumps(result), now, now),
+            )
+        except BaseException:
+            shutil.rmtree(job_dir, ignore_errors=True)
+            raise
+        return job_id
+
+    def pending_count(self) -> int:
+        return self._connect().execute(
+            "SELECT COUNT(*) FROM jobs WHERE status IN (?, ?)", (QUEUED, RUNNING)
+        ).fetchone()[0]
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Estado del trabajo (None si no existe). Incluye la posición en la cola si espera.
+        """
+        conn = self._connect()
+        row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = {
+            "job_id": row["id"],
+            "status": row["status"],
+            "stage": row["stage"],
+            "progress": round(row["progress"], 3),
+            "params": json.loads(row["params"]),
+            "result": json.loads(row["result"]) if row["result"] else None,
+            "error": row["error"],
+            "created": row["created"],
+            "updated": row["updated"],
+        }
+        if row["status"] == QUEUED:
+            job["queue_position"] = conn.execute(
+                "SELECT COUNT(*) FROM jobs WHERE status = ? AND created < ?", (QUEUED, row["created"])
+            ).fetchone()[0]
+        return job
+
+    def add_event(self, job_id: str, event: Dict[str, Any]):
+        """
+        Guarda un evento de avance y actualiza la etapa y el avance del trabajo.
+        """
+        conn = self._connect()
+        now = time.time()
+        with conn:
+            conn.execute("BEGIN")
+            conn.execute(
+                "INSERT INTO job_events (job_id, event, created) VALUES (?, ?, ?)",
+                (job_id, json.dumps(event), now),
+            )
+            conn.execute(
+                "UPDATE jobs SET stage = ?, progress = ?, updated = ? WHERE id = ?",
+                (event.get("stage"), event.get("progress", 0.0), now, job_id),
+            )
+
+    def event_sink(self, job_id: str) -> Callable[[Dict[str, Any]], None]:
+        return lambda event: self.add_event(job_id, event)
+
+    def events(self, job_id: str, after: int = 0) -> List[Dict[str, Any]]:
+        """
+        Eventos del trabajo posteriores a la secuencia `after`, cada uno con su "seq".
+        """
+        rows = self._connect().execute(
+            "SELECT seq, event FROM job_events WHERE job_id = ? AND seq > ? ORDER BY seq", (job_id, after)
+        ).fetchall()
+        return [dict(json.loads(event), seq=seq) for seq, event in rows]
+
+    def prune(self, ttl: float = JOB_TTL):
+        """
+        Borra los trabajos terminados más antiguos que `ttl` y sus archivos.
+        """
+        conn = self._connect()
+        expired = [row[0] for row in conn.execute(
+            "SELECT id FROM jobs WHERE status IN (?, ?) AND updated < ?", (DONE, FAILED, time.time() - ttl)
+        ).fetchall()]
+        for job_id in expired:
+            conn.execute("DELETE FROM jobs WHERE id = ?", (job_id,))
+            conn.execute("DELETE FROM job_events WHERE job_id = ?", (job_id,))
+            shutil.rmtree(self.job_dir(job_id), ignore_errors=True)
+
+    # ---------------------------
+    #  ATENCIÓN DE LA COLA
+    # ---------------------------
+    def _recover_orphans(self, conn: sqlite3.Connection, now: float):
+        """
+        Recupera los trabajos de instancias cuyo proceso terminó: los que tenían
+        la entrada en un archivo vuelven a la cola; los de entrada en memoria
+        (irrecuperable) se marcan como fallidos. Los trabajos de esta misma
+        instancia nunca se tocan: siguen en ejecución aquí.
+        """
+        rows = conn.execute(
+            "SELECT id, status, owner, updated, in_memory FROM jobs WHERE status IN (?, ?)"
+            " AND ((owner IS NOT NULL AND owner != ?) OR (owner IS NULL AND status = ?))",
+            (QUEUED, RUNNING, self.owner, RUNNING),
+        ).fetchall()
+        for row in rows:
+            if row["owner"] is None:
+                # Trabajo en ejecución sin dueño registrado (cola anterior): solo por tiempo
+                gone = row["updated"] < now - JOB_STALE_AFTER
+            else:
+                gone = _owner_gone(row["owner"], row["updated"], now)
+            if not gone:
+                continue
+            if row["in_memory"]:
+                conn.execute(
+                    "UPDATE jobs SET status = ?, error = ?, updated = ? WHERE id = ?",
+                    (FAILED, "El proceso que recibió el archivo terminó antes de procesarlo.", now, row["id"]),
+                )
+            elif row["status"] == RUNNING:
+                conn.execute(
+                    "UPDATE jobs SET status = ?, stage = NULL, progress = 0, owner = NULL, updated = ?"
+                    " WHERE id = ?",
+                    (QUEUED, now, row["id"]),
+                )
+
+    def claim(self) -> Optional[Dict[str, Any]]:
+        """
+        Toma el trabajo en cola más antiguo (recuperando antes los huérfanos) y
+        lo marca en ejecución a nombre de esta instancia.
+        Retorna {"job_id", "params", "job_dir", "payload"} o None si no hay trabajos.
+        """
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            now = time.time()
+            self._recover_orphans(conn, now)
+            row = conn.execute(
+                "SELECT * FROM jobs WHERE status = ? AND (owner IS NULL OR owner = ?) ORDER BY created LIMIT 1",
+                (QUEUED, self.owner),
+            ).fetchone()
+            if row is not None:
+                conn.execute(
+                    "UPDATE jobs SET status = ?, stage = ?, progress = 0, owner = ?, updated = ? WHERE id = ?",
+                    (RUNNING, "started", self.owner, now, row["id"]),
+                )
+                # Un trabajo reencolado empieza su historial de nuevo
+                conn.execute("DELETE FROM job_events WHERE job_id = ?", (row["id"],))
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        if row is None:
+            return None
+        with self._payloads_lock:
+            payload = self._payloads.pop(row["id"], None)
+        if row["in_memory"] and payload is None:
+            # Un trabajo en memoria cuya entrada ya no existe en esta instancia
+            self.finish(row["id"], FAILED, error="La entrada del trabajo ya no está disponible.")
+            return None
+        return {
+            "job_id": row["id"],
+            "params": json.loads(row["params"]),
+            "job_dir": self.job_dir(row["id"]),
+            "payload": payload,
+        }
+
+    def finish(self, job_id: str, status: str, result: Any = None, error: Optional[str] = None):
+        self._connect().execute(
+            "UPDATE jobs SET status = ?, progress = ?, result = ?, error = ?, updated = ? WHERE id = ?",
+            (status, 1.0 if status == DONE else 0.0,
+             json.dumps(result) if result is not None else None, error, time.time(), job_id),
+        )
+
+
+_queues: Dict[str, JobQueue] = {}
+_queues_lock = threading.Lock()
+
+
+def job_event_sink(job_id: str, path: str = JOBS_DB_PATH) -> Callable[[Dict[str, Any]], None]:
+    """
+    Función que guarda eventos del trabajo en la cola de `path`; sirve desde
+    otros procesos (p. ej. un pool de análisis) que no ejecutan la cola.
+    """
+    with _queues_lock:
+        queue = _queues.get(path)
+        if queue is None:
+            queue = _queues[path] = JobQueue(path=path)
+    return queue.event_sink(job_id)
@@ -0,0 +1,184 @@
+# matcher.py
+from collections import deque
+from functools import lru_cache
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+
+# ---------------------------
+#  NORMALIZACIÓN (minúsculas + tildes, conserva longitud)
+# ---------------------------
+_FOLD_TABLE = str.maketrans(
+    "áàäâãéèëêíìïîóòöôõúùüûçÁÀÄÂÃÉÈËÊÍÌÏÎÓÒÖÔÕÚÙÜÛÇİ",
+    "aaaaaeeeeiiiiooooouuuucaaaaaeeeeiiiiooooouuuuci",
+)
+
+
+def normalize_text(text: str) -> str:
+    """
+    Pasa a minúsculas y elimina tildes/diéresis (la ñ se conserva).
+    Mantiene la longitud del texto, así los índices siguen siendo válidos.
+    """
+    return text.translate(_FOLD_TABLE).lower()
+
+
+# ---------------------------
+#  AUTÓMATA AHO-CORASICK PARA PALABRAS CLAVE
+# ---------------------------
+
+class KeywordMatcher:
+    """
+    Autómata Aho-Corasick sobre un conjunto de palabras clave normalizadas.
+    Encuentra todas las apariciones (como subcadena) en una sola pasada,
+    sin importar cuántas palabras clave haya.
+    """
+
+    def __init__(self, keywords: Iterable[str]):
+        self.keywords: List[str] = []
+        self._ids: Dict[str, int] = {}
+        for kw in keywords:
+            kw = normalize_text(kw)
+            if kw and kw not in self._ids:
+                self._ids[kw] = len(self.keywords)
+                self.keywords.append(kw)
+
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[Tuple[int, ...]] = [()]
+        self._build()
+
+    def _build(self):
+        out = [[]]
+        for kw_id, kw in enumerate(self.keywords):
+            state = 0
+            for ch in kw:
+                nxt = self._goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[state][ch] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    out.append([])
+                state = nxt
+            out[state].append(kw_id)
+
+        # Enlaces de fallo por recorrido en anchura
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                target = self._goto[fail].get(ch, 0)
+                self._fail[nxt] = target if target != nxt else 0
+                out[nxt].extend(out[self._fail[nxt]])
+        self._out = [tuple(ids) for ids in out]
+
+    def keyword_id(self, keyword: str) -> int:
+        return self._ids[normalize_text(keyword)]
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, int]]:
+        """
+        Recorre `text` (ya normalizado) y produce (posición_final, id_palabra).
+        """
+        goto, fail, out = self._goto, self._fail, self._out
+        state = 0
+        for pos, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if out[state]:
+                for kw_id in out[state]:
+                    yield pos, kw_id
+
+    def find_ids(self, text: str) -> Set[int]:
+        """
+        Conjunto de ids de palabras clave presentes en `text` (ya normalizado).
+        """
+        return {kw_id for _, kw_id in self.iter_matches(text)}
+
+    def hits_per_line(self, lines: List[str]) -> List[Set[int]]:
+        """
+        Une las líneas, las normaliza una sola vez y recorre el texto
+        una única vez. Retorna, por línea, el conjunto de ids encontrados.
+        """
+        hits: List[Set[int]] = [set() for _ in lines]
+        if not lines:
+            return hits
+        goto, fail, out = self._goto, self._fail, self._out
+        line_idx = 0
+        state = 0
+        for ch in normalize_text("\n".join(lines)):
+            if ch == "\n":
+                line_idx += 1
+                state = 0
+                continue
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if out[state]:
+                hits[line_idx].update(out[state])
+        return hits
+
+
+# ---------------------------
+#  MATCHER DE INDICADORES DE UN CARGO
+# ---------------------------
+
+class IndicatorMatcher:
+    """
+    Compila los indicadores de un cargo ({indicador: [palabras clave]}) en un
+    solo autómata y traduce cada palabra encontrada a los indicadores que la usan.
+    Puede reutilizar un autómata compartido que ya contenga esas palabras.
+    """
+
+    def __init__(self, position_indicators: Dict[str, List[str]], matcher: Optional[KeywordMatcher] = None):
+        self.indicators: List[str] = list(position_indicators)
+        if matcher is None:
+            matcher = KeywordMatcher(kw for kws in position_indicators.values() for kw in kws)
+        self.matcher = matcher
+        self.keyword_indicators: List[Set[int]] = [set() for _ in self.matcher.keywords]
+        for ind_idx, kws in enumerate(position_indicators.values()):
+            for kw in kws:
+                if kw:
+                    self.keyword_indicators[self.matcher.keyword_id(kw)].add(ind_idx)
+
+    def line_indicator_hits(self, lines: List[str]) -> List[Set[int]]:
+        """
+        Por cada línea, el conjunto de índices de indicadores con alguna coincidencia.
+        """
+        kw_ind = self.keyword_indicators
+        result = []
+        for kw_ids in self.matcher.hits_per_line(lines):
+            inds = set()
+            for kw_id in kw_ids:
+                inds |= kw_ind[kw_id]
+            result.append(inds)
+        return result
+
+    def relevant_line_counts(self, lines: List[str]) -> Dict[str, int]:
+        """
+        Número de líneas con al menos una palabra clave de cada indicador.
+        """
+        counts = [0] * len(self.indicators)
+        for inds in self.line_indicator_hits(lines):
+            for ind_idx in inds:
+                counts[ind_idx] += 1
+        return dict(zip(self.indicators, counts))
+
+
+@lru_cache(maxsize=256)
+def _compile_frozen(frozen: Tuple[Tuple[str, Tuple[str, ...]], ...]) -> IndicatorMatcher:
+    return IndicatorMatcher({indicator: list(kws) for indicator, kws in frozen})
+
+
+def compile_indicator_matcher(position_indicators) -> IndicatorMatcher:
+    """
+    Retorna el matcher compilado para los indicadores del cargo (memoizado).
+    Acepta también un IndicatorMatcher ya compilado.
+    """
+    if isinstance(position_indicators, IndicatorMatcher):
+        return position_indicators
+    frozen = tuple((indicator, tuple(kws)) for indicator, kws in position_indicators.items())
+    return _compile_frozen(frozen)
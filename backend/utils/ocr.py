@@ -0,0 +1,717 @@
+# ocr.py
+import os
+import hashlib
+import re
+import threading
+import time
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from multiprocessing import util as mp_util
+from multiprocessing.managers import BaseManager
+from typing import Callable, Dict, List, Optional
+
+import fitz  # PyMuPDF
+import numpy as np
+import pytesseract
+from PIL import Image, ImageEnhance, ImageOps
+
+from .cache import CACHE_DIR, DiskCache
+
+
+# ============================================================
+# 🔹 CONFIGURACIÓN DEL MOTOR OCR
+# ============================================================
+# OCR_WORKERS=0 ejecuta el OCR en el mismo proceso (también en los workers de análisis).
+OCR_WORKERS = int(os.environ.get("OCR_WORKERS", os.cpu_count() or 1))
+OCR_PAGE_TIMEOUT = float(os.environ.get("OCR_PAGE_TIMEOUT", "60"))
+OCR_MAX_PENDING = int(os.environ.get("OCR_MAX_PENDING", max(OCR_WORKERS, 1) * 4))
+OCR_LANG = os.environ.get("OCR_LANG", "eng")
+OCR_DPI = 300
+OCR_CONFIG = "--psm 3"
+# OCR selectivo por regiones (OCR_REGIONS=0 vuelve a la página completa a 300 dpi)
+OCR_REGIONS = os.environ.get("OCR_REGIONS", "1") != "0"
+OCR_LAYOUT_DPI = 72          # pasada barata para ubicar el texto (1 px = 1 pt)
+OCR_REGION_MIN_DPI = 150     # resolución base de cada región
+OCR_REGION_MAX_DPI = 400     # tope al ampliar regiones con letra pequeña
+OCR_TARGET_LINE_PX = 32      # alto de línea deseado para tesseract
+OCR_REGION_CONFIG = "--psm 6"
+# Páginas híbridas: OCR de imágenes embebidas en páginas con texto (OCR_HYBRID=0 lo desactiva)
+OCR_HYBRID = os.environ.get("OCR_HYBRID", "1") != "0"
+OCR_HYBRID_MIN_PX = (100, 30)      # ancho, alto mínimos de la imagen
+OCR_HYBRID_MIN_AREA = 0.02         # fracción mínima del área de la página
+# Caché de páginas ya reconocidas (OCR_CACHE=0 la desactiva).
+OCR_CACHE_ENABLED = os.environ.get("OCR_CACHE", "1") != "0"
+OCR_CACHE_MAX_MB = int(os.environ.get("OCR_CACHE_MAX_MB", "256"))
+
+
+# ============================================================
+# 🔹 PREPROCESAMIENTO DE IMÁGENES PARA OCR
+# ============================================================
+def preprocess_image(image):
+    """
+    Preprocesa una imagen antes de aplicar OCR.
+    Mejora contraste, elimina ruido y convierte a blanco y negro.
+    """
+    image = image.convert("L")  # Escala de grises
+    enhancer = ImageEnhance.Contrast(image)
+    image = enhancer.enhance(2.0)  # Mejora contraste
+    image = ImageOps.autocontrast(image)
+    return image
+
+
+def _contrast_lut(histogram, factor=2.0):
+    """
+    Tabla de 256 valores equivalente a ImageEnhance.Contrast(factor)
+    seguido de ImageOps.autocontrast(), calculada a partir del histograma.
+    """
+    levels = np.arange(256, dtype=np.float64)
+    total = histogram.sum()
+    mean = int((histogram * levels).sum() / total + 0.5) if total else 0
+    contrast = np.clip(mean + factor * (levels - mean), 0, 255).astype(np.uint8)
+
+    # autocontrast sobre el histograma ya contrastado
+    used = np.unique(contrast[histogram > 0])
+    if used.size < 2:
+        return contrast
+    lo, hi = int(used[0]), int(used[-1])
+    scale = 255.0 / (hi - lo)
+    stretch = np.clip(levels * scale - lo * scale, 0, 255).astype(np.uint8)
+    return stretch[contrast]
+
+
+def preprocess_gray_array(pixels):
+    """
+    Aplica contraste y autocontraste en el lugar sobre un arreglo uint8 en
+    escala de grises (una pasada para el histograma y otra para la tabla).
+    """
+    lut = _contrast_lut(np.bincount(pixels.ravel(), minlength=256))
+    np.take(lut, pixels, out=pixels)
+    return pixels
+
+
+def render_gray_image(page, dpi=OCR_DPI, clip=None):
+    """
+    Renderiza la página directamente en escala de grises y envuelve el búfer
+    del pixmap como imagen PIL sin copiarlo ni pasar por PNG.
+    Retorna (imagen, pixmap); el pixmap debe seguir vivo mientras se use la imagen.
+    """
+    pix = page.get_pixmap(dpi=dpi, colorspace=fitz.csGRAY, alpha=False, clip=clip)
+    pixels = np.frombuffer(pix.samples_mv, dtype=np.uint8).reshape(pix.height, pix.stride)
+    preprocess_gray_array(pixels[:, :pix.width])
+    img = Image.frombuffer("L", (pix.width, pix.height), pix.samples_mv, "raw", "L", pix.stride, 1)
+    return img, pix
+
+
+# ============================================================
+# 🔹 OCR DE UNA PÁGINA (se ejecuta dentro de los workers)
+# ============================================================
+_tess_api = None
+
+
+class OCRTimeoutError(RuntimeError):
+    """
+    El OCR de una página (o imagen) excedió su plazo.
+    """
+
+
+def ocr_deadline(timeout):
+    """
+    Plazo absoluto (reloj monotónico) para una página que empieza ahora; None sin límite.
+    """
+    return time.monotonic() + timeout if timeout else None
+
+
+def _remaining(deadline):
+    """
+    Segundos que le quedan al plazo (0 sin límite). Lanza OCRTimeoutError si ya venció.
+    """
+    if deadline is None:
+        return 0
+    remaining = deadline - time.monotonic()
+    if remaining <= 0:
+        raise OCRTimeoutError("plazo de OCR vencido")
+    return remaining
+
+
+def _init_worker():
+    """
+    Inicializa un worker del pool: limita hilos de tesseract y, si está
+    instalado tesserocr, deja una instancia de la API abierta para todo
+    el ciclo de vida del proceso (evita lanzar tesseract en cada página).
+    """
+    global _tess_api
+    os.environ["OMP_THREAD_LIMIT"] = "1"
+    try:
+        import tesserocr
+        _tess_api = tesserocr.PyTessBaseAPI(lang=OCR_LANG)
+    except Exception:
+        _tess_api = None
+
+
+def _image_to_string(img, config=OCR_CONFIG, lang=OCR_LANG, deadline=None):
+    """
+    Aplica OCR a una imagen PIL, con la API persistente si existe o con pytesseract.
+    Ambos caminos respetan `deadline` (ver ocr_deadline); si vence, lanza OCRTimeoutError.
+    """
+    timeout = _remaining(deadline)
+    if _tess_api is not None:
+        psm = re.search(r"--psm\s+(\d+)", config)
+        if psm:
+            _tess_api.SetPageSegMode(int(psm.group(1)))
+        _tess_api.SetImage(img)
+        # Recognize() corta el reconocimiento al vencer el plazo (en milisegundos)
+        if not _tess_api.Recognize(timeout=int(timeout * 1000)):
+            raise OCRTimeoutError("tesseract no terminó dentro del plazo")
+        return _tess_api.GetUTF8Text()
+    try:
+        return pytesseract.image_to_string(img, lang=lang, config=config, timeout=timeout)
+    except pytesseract.TesseractNotFoundError as e:
+        # Esta excepción no se puede reconstruir en el proceso padre y rompería el pool
+        raise RuntimeError(str(e)) from None
+    except RuntimeError as e:  # pytesseract lanza RuntimeError cuando vence el timeout
+        if "timeout" in str(e).lower():
+            raise OCRTimeoutError(str(e)) from None
+        raise
+
+
+# ============================================================
+# 🔹 OCR SELECTIVO POR REGIONES (resolución adaptativa)
+# ============================================================
+def _otsu_threshold(histogram):
+    """
+    Umbral de Otsu a partir de un histograma de 256 niveles.
+    """
+    levels = np.arange(256, dtype=np.float64)
+    weight_bg = np.cumsum(histogram)
+    weight_fg = weight_bg[-1] - weight_bg
+    cum_mean = np.cumsum(histogram * levels)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean_bg = cum_mean / weight_bg
+        mean_fg = (cum_mean[-1] - cum_mean) / weight_fg
+        between = weight_bg * weight_fg * (mean_bg - mean_fg) ** 2
+    return int(np.nanargmax(between))
+
+
+def _runs(mask):
+    """
+    Tramos [inicio, fin) donde `mask` es verdadero.
+    """
+    padded = np.concatenate(([0], mask.astype(np.int8), [0]))
+    edges = np.flatnonzero(np.diff(padded))
+    return list(zip(edges[::2], edges[1::2]))
+
+
+def _xy_cut(ink, top, left, min_row_gap, min_col_gap, boxes):
+    """
+    Corte recursivo X-Y: separa por franjas horizontales vacías y luego por
+    columnas vacías. Agrega las cajas (top, left, bottom, right) en orden de lectura.
+    """
+    rows = _runs(ink.any(axis=1))
+    if not rows:
+        return
+    bands = [list(rows[0])]
+    for start, end in rows[1:]:
+        if start - bands[-1][1] < min_row_gap:
+            bands[-1][1] = end
+        else:
+            bands.append([start, end])
+
+    for r0, r1 in bands:
+        band = ink[r0:r1]
+        cols = _runs(band.any(axis=0))
+        blocks = [list(cols[0])]
+        for start, end in cols[1:]:
+            if start - blocks[-1][1] < min_col_gap:
+                blocks[-1][1] = end
+            else:
+                blocks.append([start, end])
+
+        if len(bands) == 1 and len(blocks) == 1:
+            c0, c1 = blocks[0]
+            boxes.append((top + r0, left + c0, top + r1, left + c1))
+            continue
+        for c0, c1 in blocks:
+            _xy_cut(band[:, c0:c1], top + r0, left + c0, min_row_gap, min_col_gap, boxes)
+
+
+def find_text_regions(page):
+    """
+    Pasada de diseño a baja resolución: ubica bloques de texto y estima su alto
+    de línea. Descarta fotos y fondos (bloques casi completamente entintados).
+    Retorna [(fitz.Rect, alto_de_línea_en_puntos)] en orden de lectura.
+    """
+    pix = page.get_pixmap(dpi=OCR_LAYOUT_DPI, colorspace=fitz.csGRAY, alpha=False)
+    pixels = np.frombuffer(pix.samples_mv, dtype=np.uint8).reshape(pix.height, pix.stride)[:, :pix.width]
+    threshold = _otsu_threshold(np.bincount(pixels.ravel(), minlength=256))
+    ink = pixels <= threshold
+    if not ink.any() or ink.mean() > 0.5:
+        return []
+
+    boxes = []
+    _xy_cut(ink, 0, 0, min_row_gap=12, min_col_gap=18, boxes=boxes)
+
+    scale = 72.0 / OCR_LAYOUT_DPI
+    regions = []
+    for r0, c0, r1, c1 in boxes:
+        block = ink[r0:r1, c0:c1]
+        if r1 - r0 < 3 or c1 - c0 < 3 or block.mean() > 0.45:
+            continue
+        line_heights = [end - start for start, end in _runs(block.any(axis=1))]
+        line_pts = float(np.median(line_heights)) * scale
+        rect = fitz.Rect(c0 * scale, r0 * scale, c1 * scale, r1 * scale) + (-4, -4, 4, 4)
+        regions.append((rect & page.rect, line_pts))
+    return regions
+
+
+def region_dpi(line_pts):
+    """
+    Resolución para que una línea de `line_pts` puntos mida ~OCR_TARGET_LINE_PX píxeles;
+    solo se amplía por encima de la base cuando la letra es pequeña.
+    """
+    if line_pts <= 0:
+        return OCR_REGION_MIN_DPI
+    needed = OCR_TARGET_LINE_PX * 72.0 / line_pts
+    return int(min(OCR_REGION_MAX_DPI, max(OCR_REGION_MIN_DPI, needed)))
+
+
+def ocr_page(page, dpi=OCR_DPI, config=OCR_CONFIG, lang=OCR_LANG, timeout=OCR_PAGE_TIMEOUT):
+    """
+    Renderiza una página sin capa de texto y le aplica OCR.
+    Con OCR_REGIONS activo, solo renderiza y reconoce las regiones con texto,
+    cada una a la resolución que necesita; si no se detectan regiones, procesa
+    la página completa. El `timeout` cubre la página entera (todas sus
+    regiones) y empieza a correr aquí; si vence, lanza OCRTimeoutError.
+    """
+    deadline = ocr_deadline(timeout)
+    regions = find_text_regions(page) if OCR_REGIONS else []
+    if not regions:
+        img, pix = render_gray_image(page, dpi=dpi)
+        return _image_to_string(img, config=config, lang=lang, deadline=deadline).strip()
+
+    texts = []
+    for rect, line_pts in regions:
+        _remaining(deadline)
+        img, pix = render_gray_image(page, dpi=region_dpi(line_pts), clip=rect)
+        text = _image_to_string(img, config=OCR_REGION_CONFIG, lang=lang, deadline=deadline).strip()
+        if text:
+            texts.append(text)
+    return "\n".join(texts)
+
+
+def _ocr_page_task(page_pdf, dpi, config, lang, timeout):
+    """
+    Tarea del pool: recibe la página como un PDF de una sola página. El plazo
+    de la página empieza cuando el worker la toma, no cuando se encoló.
+    """
+    with fitz.open(stream=page_pdf, filetype="pdf") as doc:
+        return ocr_page(doc[0], dpi=dpi, config=config, lang=lang, timeout=timeout)
+
+
+def _page_pdf_bytes(page):
+    """
+    Copia una página a un PDF independiente para enviarla al worker.
+    """
+    single = fitz.open()
+    single.insert_pdf(page.parent, from_page=page.number, to_page=page.number)
+    data = single.tobytes()
+    single.close()
+    return data
+
+
+# ============================================================
+# 🔹 OCR DE IMÁGENES EMBEBIDAS (páginas híbridas)
+# ============================================================
+def ocr_image_bytes(image_bytes, config=OCR_REGION_CONFIG, lang=OCR_LANG, timeout=OCR_PAGE_TIMEOUT):
+    """
+    Decodifica una imagen embebida a su resolución nativa, la lleva a escala de
+    grises y le aplica OCR, sin renderizar la página. El plazo empieza aquí.
+    """
+    deadline = ocr_deadline(timeout)
+    pix = fitz.Pixmap(image_bytes)
+    if pix.alpha:
+        pix = fitz.Pixmap(pix, 0)
+    if pix.n != 1:
+        pix = fitz.Pixmap(fitz.csGRAY, pix)
+    pixels = np.frombuffer(pix.samples_mv, dtype=np.uint8).reshape(pix.height, pix.stride)
+    preprocess_gray_array(pixels[:, :pix.width])
+    img = Image.frombuffer("L", (pix.width, pix.height), pix.samples_mv, "raw", "L", pix.stride, 1)
+    text = _image_to_string(img, config=config, lang=lang, deadline=deadline).strip()
+    del img, pixels  # liberar las vistas antes que el pixmap
+    return text
+
+
+def page_image_blocks(page, layout=None):
+    """
+    Imágenes de una página con capa de texto que vale la pena reconocer
+    (capturas de certificados, tablas pegadas): retorna [(bbox, bytes de la
+    imagen)] sin logos ni íconos. Las toma de `layout` (el `get_text("dict")`
+    de la página, que ya trae los bloques de imagen) si se entrega.
+    """
+    layout = layout if layout is not None else page.get_text("dict")
+    page_area = abs(page.rect)
+    blocks = []
+    seen = set()
+    for block in layout["blocks"]:
+        if block["type"] != 1:
+            continue
+        image = block.get("image")
+        bbox = fitz.Rect(block["bbox"]) & page.rect
+        if not image or image in seen or bbox.is_empty:
+            continue
+        if block["width"] < OCR_HYBRID_MIN_PX[0] or block["height"] < OCR_HYBRID_MIN_PX[1]:
+            continue
+        if abs(bbox) < page_area * OCR_HYBRID_MIN_AREA:
+            continue
+        seen.add(image)
+        blocks.append((bbox, image))
+    return blocks
+
+
+# ============================================================
+# 🔹 CACHÉ DE PÁGINAS POR CONTENIDO
+# ============================================================
+def page_cache_key(page, dpi=OCR_DPI, config=OCR_CONFIG, lang=OCR_LANG):
+    """
+    Calcula una huella de la página a partir de su flujo de contenido, las
+    imágenes y formularios que referencia, su geometría y la configuración OCR.
+    Dos páginas idénticas en cargas distintas producen la misma clave.
+    """
+    doc = page.parent
+    h = hashlib.sha256()
+    regions = (OCR_REGIONS, OCR_LAYOUT_DPI, OCR_REGION_MIN_DPI, OCR_REGION_MAX_DPI, OCR_TARGET_LINE_PX)
+    h.update(repr((tuple(page.rect), page.rotation, dpi, config, lang, regions)).encode())
+    h.update(page.read_contents())
+    xrefs = {img[0] for img in page.get_images(full=True)}
+    xrefs.update(xobj[0] for xobj in page.get_xobjects())
+    for xref in sorted(xrefs):
+        h.update(doc.xref_stream_raw(xref) or b"")
+    return h.hexdigest()
+
+
+def image_cache_key(image_bytes, config=OCR_REGION_CONFIG, lang=OCR_LANG):
+    """
+    Huella de una imagen embebida (sus bytes) más la configuración OCR.
+    """
+    h = hashlib.sha256(repr(("image", config, lang)).encode())
+    h.update(image_bytes)
+    return h.hexdigest()
+
+
+_ocr_cache = None
+_ocr_cache_lock = threading.Lock()
+
+
+def get_ocr_cache() -> Optional[DiskCache]:
+    """
+    Retorna la caché de páginas OCR del proceso, o None si está desactivada.
+    """
+    global _ocr_cache
+    if not OCR_CACHE_ENABLED:
+        return None
+    with _ocr_cache_lock:
+        if _ocr_cache is None:
+            _ocr_cache = DiskCache(os.path.join(CACHE_DIR, "ocr_pages.sqlite3"),
+                                   max_bytes=OCR_CACHE_MAX_MB * 1024 * 1024)
+        return _ocr_cache
+
+
+# ============================================================
+# 🔹 MOTOR OCR CON POOL DE PROCESOS PERSISTENTE
+# ============================================================
+class OCREngine:
+    """
+    Envía las páginas a un pool acotado de procesos de larga vida.
+    El pool es compartido por todas las solicitudes concurrentes, conserva
+    el orden de las páginas y aplica un timeout por página que el worker
+    cuenta desde que la toma (la espera en cola no lo consume).
+    """
+
+    def __init__(self, workers: Optional[int] = None, page_timeout: Optional[float] = None,
+                 max_pending: Optional[int] = None, dpi: int = OCR_DPI,
+                 config: str = OCR_CONFIG, lang: str = OCR_LANG,
+                 cache: Optional[DiskCache] = None):
+        self.workers = OCR_WORKERS if workers is None else workers
+        self.page_timeout = OCR_PAGE_TIMEOUT if page_timeout is None else page_timeout
+        self.dpi = dpi
+        self.config = config
+        self.lang = lang
+        self.cache = get_ocr_cache() if cache is None else cache
+        self._pending = threading.BoundedSemaphore(OCR_MAX_PENDING if max_pending is None else max_pending)
+        self._lock = threading.Lock()
+        self._executor = None
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                )
+            return self._executor
+
+    def _submit(self, fn, *args):
+        """
+        Encola una tarea en el pool. Bloquea si ya hay demasiadas pendientes.
+        """
+        self._pending.acquire()
+        try:
+            future = self._get_executor().submit(fn, *args)
+        except Exception:
+            self._pending.release()
+            raise
+        future.add_done_callback(lambda _: self._pending.release())
+        return future
+
+    def submit_page(self, page):
+        """
+        Encola una página en el pool.
+        """
+        return self._submit(_ocr_page_task, _page_pdf_bytes(page), self.dpi, self.config,
+                            self.lang, self.page_timeout)
+
+    def ocr_pages(self, pages, on_page: Optional[Callable[[int, str], None]] = None) -> List[str]:
+        """
+        Aplica OCR a varias páginas en paralelo y retorna los textos en el mismo orden.
+        Las páginas ya vistas se toman de la caché sin pasar por tesseract.
+        Una página que excede el timeout o falla queda como cadena vacía.
+        `on_page(i, texto)` se llama a medida que cada página queda lista.
+        """
+        keys = [page_cache_key(page, self.dpi, self.config, self.lang) for page in pages] if self.cache else []
+        return self._ocr_cached(pages, keys, self._run_pages, on_page)
+
+    def ocr_images(self, images: List[bytes]) -> List[str]:
+        """
+        Aplica OCR a imágenes embebidas (bytes) en paralelo, con la misma caché.
+        """
+        keys = [image_cache_key(data, OCR_REGION_CONFIG, self.lang) for data in images] if self.cache else []
+        return self._ocr_cached(images, keys, self._run_images)
+
+    def _ocr_cached(self, items, keys, run, on_item=None) -> List[str]:
+        cache = self.cache
+        results = [cache.get(key) for key in keys] if cache else [None] * len(items)
+        missing = [i for i, text in enumerate(results) if text is None]
+        if on_item:
+            for i, text in enumerate(results):
+                if text is not None:
+                    on_item(i, text)
+
+        # Elementos idénticos dentro del mismo documento se reconocen una sola vez
+        waiting: Dict[int, List[int]] = {}
+        first_by_key = {}
+        for i in missing:
+            first = first_by_key.setdefault(keys[i], i) if cache else i
+            waiting.setdefault(first, []).append(i)
+        to_run = list(waiting)
+
+        def done(j, text):
+            first = to_run[j]
+            if text is not None and cache:
+                cache.set(keys[first], text)
+            for i in waiting[first]:
+                results[i] = text if text is not None else ""
+                if on_item:
+                    on_item(i, results[i])
+
+        run([items[i] for i in to_run], done)
+        return results
+
+    def _run_pages(self, pages, on_done):
+        """
+        Ejecuta el OCR de las páginas y llama a on_done(i, texto); texto es None si falló.
+        """
+        labels = [f"la página {page.number + 1}" for page in pages]
+        if self.workers <= 0:
+            for i, page in enumerate(pages):
+                on_done(i, self._run_inline(labels[i], ocr_page, page, dpi=self.dpi, config=self.config,
+                                            lang=self.lang, timeout=self.page_timeout))
+            return
+        futures = [self.submit_page(page) for page in pages]
+        self._collect(futures, labels, on_done)
+
+    def _run_images(self, images, on_done):
+        """
+        Ejecuta el OCR de las imágenes embebidas y llama a on_done(i, texto).
+        """
+        if self.workers <= 0:
+            for i, data in enumerate(images):
+                on_done(i, self._run_inline(f"la imagen {i + 1}", ocr_image_bytes, data,
+                                            lang=self.lang, timeout=self.page_timeout))
+            return
+        futures = [self._submit(ocr_image_bytes, data, OCR_REGION_CONFIG, self.lang, self.page_timeout)
+                   for data in images]
+        self._collect(futures, [f"la imagen {i + 1}" for i in range(len(images))], on_done)
+
+    def _run_inline(self, label, fn, *args, **kwargs):
+        """
+        Ejecuta una tarea OCR en este proceso; retorna None si vence o falla.
+        """
+        try:
+            return fn(*args, **kwargs)
+        except OCRTimeoutError:
+            print(f"⚠️ OCR de {label} excedió {self.page_timeout}s.")
+        except Exception as e:
+            print(f"⚠️ Error en OCR de {label}: {e}")
+        return None
+
+    def _collect(self, futures, labels, on_done):
+        """
+        Entrega cada resultado apenas termina. El plazo lo aplica el worker
+        desde que toma la tarea, así el tiempo en cola detrás de páginas de
+        otras solicitudes no cuenta como timeout.
+        """
+        index = {future: i for i, future in enumerate(futures)}
+        for future in as_completed(futures):
+            i = index[future]
+            try:
+                text = future.result()
+            except OCRTimeoutError:
+                print(f"⚠️ OCR de {labels[i]} excedió {self.page_timeout}s.")
+                text = None
+            except Exception as e:
+                print(f"⚠️ Error en OCR de {labels[i]}: {e}")
+                text = None
+            on_done(i, text)
+
+    def shutdown(self, wait: bool = True):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=wait, cancel_futures=True)
+                self._executor = None
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_ocr_engine() -> OCREngine:
+    """
+    Retorna el motor OCR del proceso (se crea una sola vez).
+    """
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = OCREngine()
+        return _engine
+
+
+def use_inline_ocr():
+    """
+    Configura el proceso actual para aplicar OCR en línea, sin pool propio:
+    las páginas de un documento se reconocen una tras otra. Solo para
+    OCR_WORKERS=0; los workers de otros pools usan use_ocr_service().
+    """
+    global _engine
+    _init_worker()
+    with _engine_lock:
+        if _engine is not None:
+            _engine.shutdown(wait=False)
+        _engine = OCREngine(workers=0)
+
+
+# ============================================================
+# 🔹 SERVICIO OCR COMPARTIDO (workers de análisis y de lotes)
+# ============================================================
+class OCRService:
+    """
+    Motor OCR con pool propio que atiende a los workers de otros pools.
+    Vive en el proceso del OCRManager: todas las páginas de todos los workers
+    pasan por el mismo pool acotado, su semáforo de pendientes y el plazo por
+    página que cuenta el worker OCR.
+    """
+
+    def __init__(self):
+        self.engine = OCREngine()
+        # Al salir el proceso del manager, cancela lo pendiente y despide a sus
+        # workers antes de que se cierren las colas del pool (prioridad 10);
+        # si no, quedarían huérfanos esperando tareas
+        mp_util.Finalize(self, self.engine.shutdown, exitpriority=20)
+
+    def ocr_page(self, page_pdf, dpi, config, lang, timeout):
+        return self.engine._submit(_ocr_page_task, page_pdf, dpi, config, lang, timeout).result()
+
+    def ocr_image(self, image_bytes, config, lang, timeout):
+        return self.engine._submit(ocr_image_bytes, image_bytes, config, lang, timeout).result()
+
+
+_service = None
+_service_lock = threading.Lock()
+
+
+def _get_ocr_service() -> OCRService:
+    """
+    Servicio único del proceso del manager (cada conexión recibe un proxy al mismo objeto).
+    """
+    global _service
+    with _service_lock:
+        if _service is None:
+            _service = OCRService()
+        return _service
+
+
+class OCRManager(BaseManager):
+    pass
+
+
+OCRManager.register("ocr_service", callable=_get_ocr_service)
+
+
+def start_ocr_service() -> OCRManager:
+    """
+    Arranca el servicio OCR compartido en un proceso aparte y retorna su
+    manager; `manager.address` se entrega a los workers (use_ocr_service) y
+    `manager.shutdown()` lo detiene junto con su pool.
+    """
+    # Al detenerlo se espera la página en curso (acotada por su plazo) antes de forzar la salida
+    manager = OCRManager(ctx=multiprocessing.get_context("spawn"), shutdown_timeout=OCR_PAGE_TIMEOUT + 5)
+    manager.start()
+    return manager
+
+
+class RemoteOCREngine(OCREngine):
+    """
+    Motor OCR de un worker de otro pool (análisis, lotes): consulta la caché
+    aquí y envía cada página o imagen al servicio compartido desde hilos
+    locales, así las páginas de un documento se reconocen en paralelo en el
+    pool OCR, con su límite de pendientes y su plazo por página.
+    """
+
+    _methods = {_ocr_page_task: "ocr_page", ocr_image_bytes: "ocr_image"}
+
+    def __init__(self, address, workers: Optional[int] = None, **kwargs):
+        super().__init__(workers=max(1, OCR_WORKERS if workers is None else workers), **kwargs)
+        self.address = address
+        self._proxy = None
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="ocr")
+                manager = OCRManager(address=self.address)
+                manager.connect()
+                self._proxy = manager.ocr_service()
+            return self._executor
+
+    def _submit(self, fn, *args):
+        executor = self._get_executor()
+        method = getattr(self._proxy, self._methods[fn])
+        self._pending.acquire()
+        try:
+            future = executor.submit(method, *args)
+        except Exception:
+            self._pending.release()
+            raise
+        future.add_done_callback(lambda _: self._pending.release())
+        return future
+
+
+def use_ocr_service(address):
+    """
+    Configura el proceso actual (worker de otro pool) para enviar su OCR al
+    servicio compartido que escucha en `address` (ver start_ocr_service).
+    """
+    global _engine
+    with _engine_lock:
+        if _engine is not None:
+            _engine.shutdown(wait=False)
+        _engine = RemoteOCREngine(address)
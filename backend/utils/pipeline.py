@@ -0,0 +1,195 @@
+# pipeline.py
+import re
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional, Tuple, Union
+
+from .document import ParsedCV, parse_cv
+from .extractors import (
+    extract_indicator_lines,
+    evaluate_cv_presentation_with_headers,
+    calculate_indicators_for_report,
+    rank_positions
+)
+from .indicators import IndicatorIndex, get_indicator_index
+from .jobs import JOBS_DB_PATH, job_event_sink
+from .ocr import use_inline_ocr, use_ocr_service
+from .report_generator import build_report_data, position_advice, render_report_pdf
+from .results import wants_report
+
+
+# ---------------------------
+#  PIPELINE COMPLETO DE ANÁLISIS DE UNA HOJA DE VIDA
+# ---------------------------
+
+# Avance aproximado (0 a 1) al terminar cada etapa
+STAGE_PROGRESS = {
+    "text": 0.5,
+    "sections": 0.6,
+    "indicators": 0.7,
+    "presentation": 0.8,
+    "report": 1.0,
+}
+
+
+class StageTimer:
+    """
+    Mide la duración de cada etapa y envía un evento al terminarla:
+    {"stage", "progress", "elapsed_ms" (de la etapa), "total_ms", ...datos}.
+    """
+
+    def __init__(self, on_event: Optional[Callable[[Dict[str, Any]], None]] = None,
+                 timings: Optional[Dict[str, float]] = None):
+        """
+        `timings` retoma las etapas ya medidas en otro proceso; el total las incluye.
+        """
+        self.on_event = on_event or (lambda event: None)
+        self.timings: Dict[str, float] = dict(timings or {})
+        self.stage_started = time.perf_counter()
+        self.started = self.stage_started - sum(self.timings.values()) / 1000
+
+    def _event(self, stage: str, progress: float, now: float, **data) -> Dict[str, Any]:
+        event = {
+            "stage": stage,
+            "progress": round(progress, 3),
+            "elapsed_ms": round((now - self.stage_started) * 1000, 1),
+            "total_ms": round((now - self.started) * 1000, 1),
+        }
+        event.update(data)
+        return event
+
+    def tick(self, stage: str, progress: float, **data):
+        """
+        Avance dentro de una etapa (p. ej. cada página); no la cierra.
+        """
+        self.on_event(self._event(stage, progress, time.perf_counter(), **data))
+
+    def done(self, stage: str, progress: float, **data):
+        """
+        Cierra la etapa, guarda su duración y envía el evento.
+        """
+        now = time.perf_counter()
+        event = self._event(stage, progress, now, **data)
+        self.timings[stage] = event["elapsed_ms"]
+        self.stage_started = now
+        self.on_event(event)
+
+
+def report_filename(candidate_name: str) -> str:
+    """
+    Nombre del archivo de reporte del candidato.
+    """
+    safe_name = re.sub(r"[^\w\-]", "_", candidate_name.replace(" ", "_"))
+    return f"Reporte_{safe_name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
+
+
+def analyze_cv(pdf_path: Union[str, bytes], candidate_name: str, chapter: str, position: str,
+               all_positions: bool = False, index: Optional[IndicatorIndex] = None,
+               timer: Optional[StageTimer] = None) -> Tuple[ParsedCV, Dict[str, Any]]:
+    """
+    Parte de CPU del análisis: lee el PDF, extrae secciones, calcula indicadores
+    y evalúa la presentación. Retorna (ParsedCV, resultado). En modo todos los
+    cargos el resultado es la tabla de cargos.
+    """
+    timer = timer or StageTimer()
+    # El análisis usa de principio a fin la versión de indicadores con la que empezó
+    index = index or get_indicator_index()
+
+    # Leer el PDF una sola vez (texto, líneas y spans)
+    pages_done = []
+
+    def page_ready(number, total):
+        pages_done.append(number)
+        timer.tick("page", STAGE_PROGRESS["text"] * len(pages_done) / total,
+                   page=number + 1, pages=total, pages_done=len(pages_done))
+
+    cv = parse_cv(pdf_path, on_page=page_ready)
+    timer.done("text", STAGE_PROGRESS["text"], pages=len(cv.pages),
+               ocr_pages=sum(1 for page in cv.pages if page.ocr))
+
+    # Extraer secciones específicas (perfil, experiencia, eventos y asistencia)
+    section_lines = extract_indicator_lines(cv)
+    timer.done("sections", STAGE_PROGRESS["sections"])
+
+    # Calcular indicadores
+    result = {
+        "candidate_name": candidate_name,
+        "chapter": chapter,
+        "indicators_version": index.version,
+    }
+    if all_positions:
+        # Una sola pasada de coincidencias puntúa todos los cargos del capítulo
+        result["ranking"] = rank_positions(section_lines, index.chapter_matrix(chapter))
+        timer.done("indicators", 1.0)
+        result["timings_ms"] = timer.timings
+        return cv, result
+
+    result["position"] = position
+    result["indicator_percentages"] = calculate_indicators_for_report(
+        section_lines, index.matcher(chapter, position)
+    )
+    timer.done("indicators", STAGE_PROGRESS["indicators"])
+
+    # Evaluar presentación del CV
+    result["presentation_scores"], _ = evaluate_cv_presentation_with_headers(cv)
+    timer.done("presentation", STAGE_PROGRESS["presentation"])
+    result["timings_ms"] = timer.timings
+    return cv, result
+
+
+def report_data(result: Dict[str, Any], index: Optional[IndicatorIndex] = None) -> Dict[str, Any]:
+    """
+    Datos estructurados del reporte PDF (serializables en JSON), para dibujarlo
+    después con write_report. Usa los porcentajes ya calculados en el resultado,
+    así el PDF y el JSON muestran los mismos números.
+    """
+    index = index or get_indicator_index()
+    return build_report_data(
+        result["candidate_name"],
+        result["position"],
+        result["chapter"],
+        result["indicator_percentages"],
+        position_advice(index.advice, result["position"])
+    )
+
+
+def write_report(data: Dict[str, Any], output_path: str, timer: Optional[StageTimer] = None) -> str:
+    """
+    Dibuja el reporte PDF de `data` (ver report_data) en `output_path`.
+    """
+    timer = timer or StageTimer()
+    render_report_pdf(data, output_path)
+    timer.done("report", STAGE_PROGRESS["report"])
+    return output_path
+
+
+# ---------------------------
+#  TAREAS PARA POOLS DE PROCESOS
+# ---------------------------
+
+def init_analysis_worker(ocr_address=None):
+    """
+    Inicializa un proceso del pool de análisis: envía el OCR al servicio
+    compartido en `ocr_address` (ver start_ocr_service), o lo ejecuta en el
+    mismo proceso si no hay servicio (OCR_WORKERS=0).
+    """
+    if ocr_address is not None:
+        use_ocr_service(ocr_address)
+    else:
+        use_inline_ocr()
+
+
+def analysis_task(pdf_path: Union[str, bytes], params: Dict[str, Any], job_id: Optional[str] = None,
+                  jobs_path: str = JOBS_DB_PATH) -> Tuple[Dict[str, Any], Optional[Dict[str, Any]]]:
+    """
+    Ejecuta analyze_cv en un proceso del pool (el PDF llega como ruta o como
+    bytes). Si recibe `job_id`, guarda los eventos de avance directamente en la
+    cola de trabajos. Retorna (resultado, datos del reporte); el PDF no se
+    dibuja aquí, y con format=json ni siquiera se preparan sus datos.
+    """
+    timer = StageTimer(job_event_sink(job_id, jobs_path) if job_id else None)
+    index = get_indicator_index()
+    _, result = analyze_cv(pdf_path, params["candidate_name"], params["chapter"], params["position"],
+                           all_positions=params.get("all_positions", False), index=index, timer=timer)
+    data = report_data(result, index) if wants_report(params) else None
+    return result, data
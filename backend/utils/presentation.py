@@ -0,0 +1,134 @@
+# presentation.py
+import os
+import re
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional, Tuple
+
+from spellchecker import SpellChecker
+
+
+# ============================================================
+# 🔹 CONFIGURACIÓN
+# ============================================================
+PRESENTATION_LANGUAGE = os.environ.get("PRESENTATION_LANGUAGE", "es")
+# Palabras distintas recordadas entre solicitudes (conocida/desconocida y sílabas)
+PRESENTATION_WORD_CACHE = int(os.environ.get("PRESENTATION_WORD_CACHE", "50000"))
+
+# Una palabra (solo letras), un token con dígitos o un fin de oración
+_TOKEN_RE = re.compile(r"(?P<word>[^\W\d_]+)|(?P<other>\w+)|(?P<end>[.!?]+)")
+_VOWEL_GROUP_RE = re.compile(r"[aeiouáéíóúü]+")
+# Vocales seguidas que se pronuncian por separado (hiato): fuerte+fuerte o débil tildada
+_HIATUS_RE = re.compile(r"[aeoáéó](?=[aeoáéóíú])|[íú](?=[aeiouáéíóú])|[aeiou](?=[íú])")
+
+
+def count_syllables(word: str) -> int:
+    """
+    Cuenta aproximada de sílabas de una palabra en español (minúsculas):
+    grupos de vocales más los hiatos.
+    """
+    return max(1, len(_VOWEL_GROUP_RE.findall(word)) + len(_HIATUS_RE.findall(word)))
+
+
+# ============================================================
+# 🔹 MOTOR DE EVALUACIÓN DE PRESENTACIÓN
+# ============================================================
+class PresentationEngine:
+    """
+    Evalúa ortografía, capitalización y legibilidad de un texto. El diccionario
+    del corrector se carga una sola vez; las palabras se normalizan (sin
+    puntuación, en minúsculas) y se consultan una vez por palabra distinta.
+    Un LRU compartido entre solicitudes guarda (conocida, sílabas) por palabra.
+    """
+
+    def __init__(self, language: str = PRESENTATION_LANGUAGE, cache_size: int = PRESENTATION_WORD_CACHE):
+        self.spell = SpellChecker(language=language)
+        self.cache_size = cache_size
+        self._words: "OrderedDict[str, Tuple[bool, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def lookup(self, words: Iterable[str]) -> Dict[str, Tuple[bool, int]]:
+        """
+        Retorna {palabra: (conocida, sílabas)} para palabras ya normalizadas.
+        Las que no están en el LRU se consultan al corrector en un solo lote.
+        """
+        found: Dict[str, Tuple[bool, int]] = {}
+        missing = []
+        with self._lock:
+            for word in set(words):
+                entry = self._words.get(word)
+                if entry is None:
+                    missing.append(word)
+                else:
+                    self._words.move_to_end(word)
+                    found[word] = entry
+
+        if missing:
+            unknown = self.spell.unknown(missing)
+            fresh = {word: (word not in unknown, count_syllables(word)) for word in missing}
+            found.update(fresh)
+            with self._lock:
+                self._words.update(fresh)
+                while len(self._words) > self.cache_size:
+                    self._words.popitem(last=False)
+        return found
+
+    def evaluate(self, text: str) -> Dict[str, float]:
+        """
+        Puntajes de 0 a 100 en una sola pasada por los tokens:
+        - ortografía: proporción de palabras que reconoce el diccionario;
+        - capitalización: oraciones que empiezan con mayúscula;
+        - coherencia: legibilidad de Fernández-Huerta (Flesch adaptado al español).
+        """
+        counts: Dict[str, int] = {}
+        total_words = 0
+        sentences = capitalized = 0
+        sentence_open = False
+
+        for match in _TOKEN_RE.finditer(text):
+            kind = match.lastgroup
+            if kind == "end":
+                sentence_open = False
+                continue
+            token = match.group()
+            if not sentence_open:
+                sentence_open = True
+                sentences += 1
+                capitalized += token[0].isupper()
+            if kind == "word":
+                word = token.lower()
+                counts[word] = counts.get(word, 0) + 1
+                total_words += 1
+
+        words = self.lookup(counts)
+        known = sum(n for word, n in counts.items() if words[word][0])
+        syllables = sum(n * words[word][1] for word, n in counts.items())
+
+        spelling = round(known / total_words * 100, 2) if total_words >= 2 else 100
+        caps = round(capitalized / sentences * 100, 2) if sentences else 100
+        if total_words:
+            reading_ease = 206.84 - 60 * syllables / total_words - 102 * sentences / total_words
+            coherence = round(max(0, min(100, reading_ease)), 2)
+        else:
+            coherence = 50
+        return {
+            "spelling_score": spelling,
+            "capitalization_score": caps,
+            "coherence_score": coherence,
+            "overall_score": round((spelling + caps + coherence) / 3, 2),
+        }
+
+
+_engine: Optional[PresentationEngine] = None
+_engine_lock = threading.Lock()
+
+
+def get_presentation_engine() -> PresentationEngine:
+    """
+    Retorna el motor de presentación del proceso (lo crea la primera vez).
+    """
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = PresentationEngine()
+        return _engine
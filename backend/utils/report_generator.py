@@ -1,67 +1,175 @@
+import os
+from functools import lru_cache
+from xml.sax.saxutils import escape
+
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, PageBreak
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.pagesizes import letter
 from reportlab.lib.enums import TA_CENTER
 from reportlab.lib import colors
-from .extractors import extract_experience_section_with_ocr
-from .indicators import calculate_indicators_for_report
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+from .extractors import extract_indicator_lines, calculate_indicators_for_report
+
+ASSETS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "assets")
+
+
+# ---------------------------
+#  RECURSOS DEL REPORTE (una sola vez por proceso)
+# ---------------------------
 
-def generate_report(pdf_path, candidate, cargo, capitulo, indicators_json, advice_json, output_filename):
+@lru_cache(maxsize=1)
+def report_fonts():
+    """
+    Registra Century Gothic (normal y negrita) y retorna sus nombres.
+    Si faltan los archivos, usa Helvetica.
+    """
+    try:
+        pdfmetrics.registerFont(TTFont("CenturyGothic", os.path.join(ASSETS_DIR, "centurygothic.ttf")))
+        pdfmetrics.registerFont(TTFont("CenturyGothic-Bold", os.path.join(ASSETS_DIR, "centurygothic_bold.ttf")))
+        pdfmetrics.registerFontFamily("CenturyGothic", normal="CenturyGothic", bold="CenturyGothic-Bold",
+                                      italic="CenturyGothic", boldItalic="CenturyGothic-Bold")
+        return "CenturyGothic", "CenturyGothic-Bold"
+    except Exception as e:
+        print(f"⚠️ No se pudo cargar Century Gothic, se usa Helvetica: {e}")
+        return "Helvetica", "Helvetica-Bold"
+
+
+@lru_cache(maxsize=1)
+def report_styles():
+    """
+    Estilos de párrafo y de tabla del reporte, construidos una sola vez.
+    """
+    regular, bold = report_fonts()
     styles = getSampleStyleSheet()
+    return {
+        "title": ParagraphStyle("ReportTitle", parent=styles["Title"], fontName=bold, alignment=TA_CENTER,
+                                fontSize=20),
+        "normal": ParagraphStyle("ReportNormal", parent=styles["Normal"], fontName=regular),
+        "heading": ParagraphStyle("ReportHeading", parent=styles["Heading2"], fontName=bold),
+        # Texto del reporte descriptivo
+        "body": ParagraphStyle("ReportBody", fontName=regular, fontSize=10, leading=14),
+        "body_bold": ParagraphStyle("ReportBodyBold", fontName=bold, fontSize=10, leading=14),
+        "table": TableStyle([
+            ("FONTNAME", (0, 0), (-1, -1), regular),
+            ("FONTNAME", (0, 0), (-1, 0), bold),
+            ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#0D62AD")),
+            ("TEXTCOLOR", (0, 0), (-1, 0), colors.white),
+            ("ALIGN", (1, 1), (-1, -1), "CENTER"),
+            ("GRID", (0, 0), (-1, -1), 1, colors.grey),
+        ]),
+        "summary_table": TableStyle([
+            ("FONTNAME", (0, 0), (-1, -1), regular),
+            ("FONTNAME", (0, 0), (-1, 0), bold),
+            ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#F0F0F0")),
+            ("ALIGN", (0, 0), (-1, -1), "CENTER"),
+            ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
+        ]),
+    }
+
+
+# ---------------------------
+#  DATOS DEL REPORTE (estructurados, sin dibujar)
+# ---------------------------
+
+def report_conclusion(indicadores):
+    """
+    Conclusión general según el promedio de los porcentajes por indicador.
+    """
+    if not indicadores:
+        return "No hay indicadores definidos para este cargo en el capítulo; no se pudo calcular la afinidad."
+    promedio = sum(v["percentage"] for v in indicadores.values()) / len(indicadores)
+    if promedio >= 75:
+        return "El candidato presenta un alto nivel de afinidad con las funciones del cargo."
+    elif promedio >= 50:
+        return "El candidato presenta afinidad media con el cargo, se recomienda fortalecer su experiencia."
+    return "El candidato presenta baja afinidad con el cargo, debe adquirir más experiencia relacionada."
+
+
+def position_advice(advice_json, cargo):
+    """
+    Consejos del cargo como lista plana. advice.json guarda por cargo
+    {indicador: [consejos]}; el cargo se busca sin distinguir mayúsculas.
+    """
+    advice = next(
+        (value for name, value in (advice_json or {}).items() if name.strip().upper() == cargo.strip().upper()), []
+    )
+    if isinstance(advice, dict):
+        return [tip for tips in advice.values() for tip in (tips if isinstance(tips, list) else [tips])]
+    return list(advice)
+
+
+def build_report_data(candidate, cargo, capitulo, indicadores, consejos):
+    """
+    Reúne lo que muestra el reporte en un diccionario serializable en JSON;
+    render_report_pdf lo dibuja cuando haga falta. `indicadores` son los
+    porcentajes del análisis ({indicador: {"percentage", "relevant_lines"}},
+    p. ej. result["indicator_percentages"]), así el PDF muestra los mismos
+    números que el resultado JSON; `consejos` es la lista de position_advice.
+    """
+    return {
+        "candidate": candidate,
+        "position": cargo,
+        "chapter": capitulo,
+        "indicators": indicadores,
+        "conclusion": report_conclusion(indicadores),
+        "advice": list(consejos),
+    }
+
+
+# ---------------------------
+#  GENERACIÓN DEL REPORTE
+# ---------------------------
+
+def render_report_pdf(data, output_filename):
+    """
+    Dibuja el PDF a partir de los datos de build_report_data. Los valores se
+    escapan antes de entrar al marcado de Paragraph (p. ej. un nombre con "<" o "&").
+    """
+    styles = report_styles()
     pdf = SimpleDocTemplate(output_filename, pagesize=letter)
     story = []
 
     # Portada
-    title_style = ParagraphStyle('Title', parent=styles['Title'], alignment=TA_CENTER, fontSize=20)
     story.append(Spacer(1, 100))
-    story.append(Paragraph("Evaluador Hoja de Vida ANEIAP", title_style))
+    story.append(Paragraph("Evaluador Hoja de Vida ANEIAP", styles['title']))
     story.append(Spacer(1, 20))
-    story.append(Paragraph(f"<b>Candidato:</b> {candidate}", styles['Normal']))
-    story.append(Paragraph(f"<b>Cargo:</b> {cargo}", styles['Normal']))
-    story.append(Paragraph(f"<b>Capítulo:</b> {capitulo}", styles['Normal']))
+    story.append(Paragraph(f"<b>Candidato:</b> {escape(data['candidate'])}", styles['normal']))
+    story.append(Paragraph(f"<b>Cargo:</b> {escape(data['position'])}", styles['normal']))
+    story.append(Paragraph(f"<b>Capítulo:</b> {escape(data['chapter'])}", styles['normal']))
     story.append(PageBreak())
 
-    # Extracción de experiencia
-    experiencia = extract_experience_section_with_ocr(pdf_path)
-    lines = experiencia.split("\n")
-
-    # Cálculo de indicadores
-    indicadores = calculate_indicators_for_report(lines, indicators_json.get(cargo, {}))
-
     # Tabla de resultados
-    data = [["Indicador", "Porcentaje", "Coincidencias"]]
-    for ind, vals in indicadores.items():
-        data.append([ind, f"{vals['percentage']:.1f}%", vals['relevant_lines']])
-    table = Table(data, colWidths=[200, 100, 100])
-    table.setStyle(TableStyle([
-        ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#0D62AD")),
-        ("TEXTCOLOR", (0, 0), (-1, 0), colors.white),
-        ("ALIGN", (1, 1), (-1, -1), "CENTER"),
-        ("GRID", (0, 0), (-1, -1), 1, colors.grey),
-    ]))
-    story.append(Paragraph("<b>Resultados de Concordancia</b>", styles['Heading2']))
+    rows = [["Indicador", "Porcentaje", "Coincidencias"]]
+    for ind, vals in data["indicators"].items():
+        rows.append([ind, f"{vals['percentage']:.1f}%", vals['relevant_lines']])
+    table = Table(rows, colWidths=[200, 100, 100])
+    table.setStyle(styles["table"])
+    story.append(Paragraph("<b>Resultados de Concordancia</b>", styles['heading']))
     story.append(Spacer(1, 10))
     story.append(table)
     story.append(PageBreak())
 
     # Conclusión general
-    promedio = sum(v["percentage"] for v in indicadores.values()) / len(indicadores)
-    if promedio >= 75:
-        conclusion = "El candidato presenta un alto nivel de afinidad con las funciones del cargo."
-    elif promedio >= 50:
-        conclusion = "El candidato presenta afinidad media con el cargo, se recomienda fortalecer su experiencia."
-    else:
-        conclusion = "El candidato presenta baja afinidad con el cargo, debe adquirir más experiencia relacionada."
-
-    story.append(Paragraph("<b>Conclusión General</b>", styles['Heading2']))
-    story.append(Paragraph(conclusion, styles['Normal']))
+    story.append(Paragraph("<b>Conclusión General</b>", styles['heading']))
+    story.append(Paragraph(escape(data["conclusion"]), styles['normal']))
     story.append(PageBreak())
 
     # Consejos personalizados
-    consejos = advice_json.get(cargo, [])
-    story.append(Paragraph("<b>Consejos personalizados</b>", styles['Heading2']))
-    for consejo in consejos:
-        story.append(Paragraph(f"• {consejo}", styles['Normal']))
+    story.append(Paragraph("<b>Consejos personalizados</b>", styles['heading']))
+    for consejo in data["advice"]:
+        story.append(Paragraph(f"• {escape(str(consejo))}", styles['normal']))
 
     pdf.build(story)
     return output_filename
+
+
+def generate_report(cv, candidate, cargo, capitulo, indicators_json, advice_json, output_filename):
+    # indicators_json: {cargo: {indicador: [palabras]}} del capítulo; el cargo se busca sin distinguir mayúsculas
+    position_indicators = next(
+        (value for name, value in indicators_json.items() if name.strip().upper() == cargo.strip().upper()), {}
+    )
+    # Mismas líneas que puntúa el análisis (perfil, experiencia, eventos y asistencia)
+    indicadores = calculate_indicators_for_report(extract_indicator_lines(cv), position_indicators)
+    data = build_report_data(candidate, cargo, capitulo, indicadores, position_advice(advice_json, cargo))
+    return render_report_pdf(data, output_filename)
@@ -0,0 +1,216 @@
+# reports.py
+import hashlib
+import os
+import re
+import tempfile
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+from .cache import CACHE_DIR, private_dir
+
+
+# ============================================================
+# 🔹 CONFIGURACIÓN
+# ============================================================
+REPORTS_DIR = os.environ.get("REPORTS_DIR", os.path.join(CACHE_DIR, "reports"))
+REPORTS_MAX_MB = float(os.environ.get("REPORTS_MAX_MB", "1024"))
+# Un reporte sin descargas durante este tiempo se borra (se puede volver a dibujar)
+REPORTS_TTL = float(os.environ.get("REPORTS_TTL", str(7 * 24 * 3600)))
+REPORTS_SWEEP_INTERVAL = float(os.environ.get("REPORTS_SWEEP_INTERVAL", "300"))
+# Temporales de dibujos interrumpidos que se borran pasado este tiempo
+REPORTS_TMP_TTL = 3600
+
+_DIGEST_RE = re.compile(r"^[0-9a-f]{64}$")
+_RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+# ============================================================
+# 🔹 ALMACÉN DE REPORTES (nombre = hash del contenido)
+# ============================================================
+class ReportStore:
+    """
+    Carpeta de reportes PDF guardados como `<sha256>.pdf`: el nombre identifica
+    el contenido (sirve de ETag) y dos reportes iguales ocupan un solo archivo.
+    Cada lectura renueva la fecha del archivo; sweep() borra los que llevan
+    más de `ttl` sin usarse y luego los más antiguos hasta quedar bajo `max_bytes`.
+    """
+
+    def __init__(self, root: str = REPORTS_DIR, max_bytes: int = int(REPORTS_MAX_MB * 1024 * 1024),
+                 ttl: float = REPORTS_TTL):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        private_dir(root)
+
+    def path(self, digest: str) -> str:
+        return os.path.join(self.root, f"{digest}.pdf")
+
+    def temp_path(self) -> str:
+        """
+        Ruta temporal dentro del almacén para dibujar un reporte antes de put_file().
+        """
+        fd, path = tempfile.mkstemp(dir=self.root, suffix=".tmp")
+        os.close(fd)
+        return path
+
+    def put_file(self, src_path: str) -> str:
+        """
+        Mueve un archivo al almacén con su hash como nombre y retorna el hash.
+        """
+        sha = hashlib.sha256()
+        with open(src_path, "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                sha.update(chunk)
+        digest = sha.hexdigest()
+        os.replace(src_path, self.path(digest))
+        return digest
+
+    def put_bytes(self, data: bytes) -> str:
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.path(digest)
+        if not os.path.exists(path):
+            tmp_path = self.temp_path()
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        else:
+            os.utime(path)
+        return digest
+
+    def get(self, digest: str) -> Optional[str]:
+        """
+        Ruta del reporte, o None si el hash no es válido o ya se borró.
+        """
+        if not _DIGEST_RE.match(digest or ""):
+            return None
+        path = self.path(digest)
+        try:
+            os.utime(path)
+        except OSError:
+            return None
+        return path
+
+    def sweep(self) -> Dict[str, int]:
+        """
+        Aplica el vencimiento y el límite de tamaño. Retorna archivos y bytes borrados.
+        """
+        now = time.time()
+        removed = freed = 0
+        entries = []
+        with os.scandir(self.root) as it:
+            for entry in it:
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                if entry.name.endswith(".tmp"):
+                    expired = stat.st_mtime < now - REPORTS_TMP_TTL
+                elif entry.name.endswith(".pdf"):
+                    expired = stat.st_mtime < now - self.ttl
+                else:
+                    continue
+                if expired:
+                    removed, freed = removed + 1, freed + stat.st_size
+                    self.discard(entry.path)
+                elif entry.name.endswith(".pdf"):
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            self.discard(path)
+            total -= size
+            removed, freed = removed + 1, freed + size
+        return {"removed": removed, "bytes_freed": freed, "bytes": total}
+
+    @staticmethod
+    def discard(path: str):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+class ReportSweeper(threading.Thread):
+    """
+    Hilo que ejecuta ReportStore.sweep() al arrancar y luego cada `interval` segundos.
+    """
+
+    def __init__(self, store: ReportStore, interval: float = REPORTS_SWEEP_INTERVAL):
+        super().__init__(name="report-sweeper", daemon=True)
+        self.store = store
+        self.interval = interval
+        self._stop_event = threading.Event()
+
+    def run(self):
+        # Primera limpieza al arrancar: el host pudo estar detenido un buen rato
+        while True:
+            try:
+                stats = self.store.sweep()
+                if stats["removed"]:
+                    print(f"🧹 Reportes borrados: {stats['removed']} ({stats['bytes_freed'] // 1024} KB).")
+            except Exception as e:
+                print(f"⚠️ Error al limpiar el almacén de reportes: {e}")
+            if self._stop_event.wait(self.interval):
+                return
+
+    def stop(self):
+        self._stop_event.set()
+
+
+_store: Optional[ReportStore] = None
+_sweeper: Optional[ReportSweeper] = None
+_store_lock = threading.Lock()
+
+
+def get_report_store() -> ReportStore:
+    """
+    Retorna el almacén de reportes del proceso (lo crea la primera vez).
+    """
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = ReportStore()
+        return _store
+
+
+def start_report_sweeper(interval: float = REPORTS_SWEEP_INTERVAL) -> ReportSweeper:
+    """
+    Arranca (una sola vez) la limpieza periódica del almacén de reportes.
+    """
+    global _sweeper
+    store = get_report_store()
+    with _store_lock:
+        if _sweeper is None:
+            _sweeper = ReportSweeper(store, interval)
+            _sweeper.start()
+        return _sweeper
+
+
+# ============================================================
+# 🔹 RANGOS HTTP (Range: bytes=...)
+# ============================================================
+def parse_byte_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    Interpreta un encabezado Range de un solo rango y retorna (inicio, fin)
+    inclusivos. None si no hay rango o no se entiende (se envía el archivo
+    completo); lanza ValueError si el rango queda fuera del archivo.
+    """
+    match = _RANGE_RE.match((header or "").strip())
+    if not match:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        suffix = int(last)
+        if suffix == 0:
+            raise ValueError("Rango vacío.")
+        return max(0, size - suffix), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        raise ValueError("Rango fuera del archivo.")
+    return start, end
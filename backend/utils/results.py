@@ -0,0 +1,103 @@
+# results.py
+import hashlib
+import json
+import os
+import threading
+from typing import Any, Dict, Optional
+
+from .cache import CACHE_DIR, DiskCache
+
+
+# ============================================================
+# 🔹 CONFIGURACIÓN
+# ============================================================
+# Caché de resultados completos (RESULT_CACHE=0 la desactiva)
+RESULT_CACHE_ENABLED = os.environ.get("RESULT_CACHE", "1") != "0"
+RESULT_CACHE_MAX_MB = int(os.environ.get("RESULT_CACHE_MAX_MB", "512"))
+# Un resultado guardado vence pasado este tiempo aunque se siga usando
+RESULT_CACHE_TTL = float(os.environ.get("RESULT_CACHE_TTL", str(7 * 24 * 3600)))
+# Formato de los datos del reporte guardados; al cambiarlo se ignoran las entradas anteriores
+REPORT_DATA_FORMAT = 3
+
+
+# ============================================================
+# 🔹 CACHÉ DE RESULTADOS (hash del PDF + capítulo + cargo + versión)
+# ============================================================
+_result_cache: Optional[DiskCache] = None
+_result_cache_lock = threading.Lock()
+
+
+def get_result_cache() -> Optional[DiskCache]:
+    """
+    Retorna la caché de resultados del proceso, o None si está desactivada.
+    """
+    global _result_cache
+    if not RESULT_CACHE_ENABLED:
+        return None
+    with _result_cache_lock:
+        if _result_cache is None:
+            _result_cache = DiskCache(os.path.join(CACHE_DIR, "results.sqlite3"),
+                                      max_bytes=RESULT_CACHE_MAX_MB * 1024 * 1024,
+                                      ttl=RESULT_CACHE_TTL)
+        return _result_cache
+
+
+def result_cache_key(params: Dict[str, Any], version: str) -> str:
+    """
+    Clave del resultado: hash del PDF, capítulo, cargo (o todos los cargos) y
+    versión de indicadores y consejos. El nombre del candidato también entra,
+    porque va impreso en el reporte.
+    """
+    parts = [
+        params["sha256"],
+        params["chapter"].strip().upper(),
+        "*" if params.get("all_positions") else params["position"].strip().upper(),
+        version,
+        " ".join(params["candidate_name"].split()),
+        REPORT_DATA_FORMAT,
+    ]
+    return "result:" + hashlib.sha256(json.dumps(parts).encode("utf-8")).hexdigest()
+
+
+def lookup_result(params: Dict[str, Any], version: str) -> Optional[Dict[str, Any]]:
+    """
+    Retorna {"result", "report_data", "report_digest"} de un análisis ya hecho,
+    o None. `report_digest` es el hash del PDF en el almacén de reportes, que
+    pudo haberse borrado desde entonces (ver ReportStore.get).
+    Si se pide el reporte PDF y lo guardado no trae sus datos, cuenta como fallo.
+    """
+    cache = get_result_cache()
+    if cache is None or not params.get("sha256"):
+        return None
+    entry = cache.get(result_cache_key(params, version))
+    if entry is None:
+        return None
+    if wants_report(params) and entry.get("report_data") is None:
+        return None
+    return entry
+
+
+def wants_report(params: Dict[str, Any]) -> bool:
+    """
+    Indica si el trabajo ofrece reporte PDF (format=pdf y un solo cargo).
+    """
+    return params.get("format", "pdf") == "pdf" and not params.get("all_positions")
+
+
+def store_result(params: Dict[str, Any], result: Dict[str, Any],
+                 report_data: Optional[Dict[str, Any]] = None, report_digest: Optional[str] = None):
+    """
+    Guarda el resultado, los datos del reporte y el hash del PDF ya dibujado
+    (si lo hay) con la versión de indicadores con la que se calcularon. El PDF
+    queda solo en el almacén de reportes. No reemplaza una entrada que ya
+    tiene datos de reporte por otra que no los tiene.
+    """
+    cache = get_result_cache()
+    if cache is None or not params.get("sha256"):
+        return
+    key = result_cache_key(params, result["indicators_version"])
+    if report_data is None:
+        current = cache.get(key)
+        if current is not None and current.get("report_data") is not None:
+            return
+    cache.set(key, {"result": result, "report_data": report_data, "report_digest": report_digest})
@@ -0,0 +1,133 @@
+# scoring.py
+from typing import Dict, List
+
+import numpy as np
+from scipy import sparse
+
+from .matcher import IndicatorMatcher, KeywordMatcher
+
+
+# ---------------------------
+#  MATRICES DE COINCIDENCIA (líneas × palabras clave)
+# ---------------------------
+
+def line_keyword_matrix(lines: List[str], keyword_matcher: KeywordMatcher) -> sparse.csr_matrix:
+    """
+    Matriz dispersa binaria (líneas × vocabulario) con las palabras clave
+    encontradas en cada línea, a partir de un solo recorrido del autómata.
+    """
+    hits = keyword_matcher.hits_per_line(lines)
+    indptr = np.zeros(len(hits) + 1, dtype=np.int64)
+    indptr[1:] = np.cumsum([len(h) for h in hits])
+    indices = np.fromiter((kw_id for h in hits for kw_id in h), dtype=np.int32, count=int(indptr[-1]))
+    data = np.ones(len(indices), dtype=np.float32)
+    return sparse.csr_matrix((data, indices, indptr), shape=(len(hits), len(keyword_matcher.keywords)))
+
+
+def indicator_keyword_matrix(matcher: IndicatorMatcher) -> sparse.csr_matrix:
+    """
+    Matriz dispersa binaria (vocabulario × indicadores) de un cargo.
+    """
+    rows, cols = [], []
+    for kw_id, indicators in enumerate(matcher.keyword_indicators):
+        for ind_idx in indicators:
+            rows.append(kw_id)
+            cols.append(ind_idx)
+    return sparse.csr_matrix(
+        (np.ones(len(rows), dtype=np.float32), (rows, cols)),
+        shape=(len(matcher.keyword_indicators), len(matcher.indicators)),
+    )
+
+
+# ---------------------------
+#  LOTES DE CANDIDATOS CONTRA UN MISMO CARGO
+# ---------------------------
+
+def batch_relevant_line_counts(lines_per_cv: List[List[str]], matcher: IndicatorMatcher):
+    """
+    Puntúa N candidatos contra un mismo cargo con operaciones matriciales.
+    Apila todas las líneas en una sola matriz (líneas × vocabulario), la cruza con
+    (vocabulario × indicadores) y agrupa por candidato con una matriz (N × líneas).
+    Retorna (conteos N × indicadores, líneas por candidato).
+    """
+    sizes = np.array([len(lines) for lines in lines_per_cv], dtype=np.int64)
+    all_lines = [line for lines in lines_per_cv for line in lines]
+    n_cvs, n_lines = len(lines_per_cv), len(all_lines)
+    if not n_lines or not matcher.indicators:
+        return np.zeros((n_cvs, len(matcher.indicators)), dtype=np.int64), sizes
+
+    hits = line_keyword_matrix(all_lines, matcher.matcher)
+    relevant = (hits @ indicator_keyword_matrix(matcher)) > 0
+    owner = np.repeat(np.arange(n_cvs), sizes)
+    grouping = sparse.csr_matrix(
+        (np.ones(n_lines, dtype=np.int64), (owner, np.arange(n_lines))), shape=(n_cvs, n_lines)
+    )
+    counts = (grouping @ relevant.astype(np.int64)).toarray()
+    return counts, sizes
+
+
+# ---------------------------
+#  TODOS LOS CARGOS DE UN CAPÍTULO EN UNA SOLA PASADA
+# ---------------------------
+
+class ChapterMatrix:
+    """
+    Matriz dispersa precalculada (cargo·indicador × palabra clave) de un capítulo.
+    Con la matriz de coincidencias de un candidato se puntúan todos los cargos
+    a la vez: (líneas × K) · (K × filas) → líneas relevantes por indicador,
+    y una matriz de promedios (cargos × filas) da el puntaje de cada cargo.
+    """
+
+    def __init__(self, chapter_indicators: Dict[str, Dict[str, List[str]]], keyword_matcher: KeywordMatcher):
+        self.keyword_matcher = keyword_matcher
+        self.positions: List[str] = list(chapter_indicators)
+        self.rows = []  # (cargo, indicador)
+
+        row_ids, col_ids, agg_rows, agg_cols, agg_vals = [], [], [], [], []
+        for pos_idx, (position, indicators) in enumerate(chapter_indicators.items()):
+            for indicator, keywords in indicators.items():
+                row = len(self.rows)
+                self.rows.append((position, indicator))
+                kw_ids = {keyword_matcher.keyword_id(kw) for kw in keywords if kw}
+                row_ids.extend([row] * len(kw_ids))
+                col_ids.extend(kw_ids)
+                agg_rows.append(pos_idx)
+                agg_cols.append(row)
+                agg_vals.append(1.0 / len(indicators))
+
+        self.matrix = sparse.csr_matrix(
+            (np.ones(len(row_ids), dtype=np.float32), (row_ids, col_ids)),
+            shape=(len(self.rows), len(keyword_matcher.keywords)),
+        )
+        self.position_average = sparse.csr_matrix(
+            (agg_vals, (agg_rows, agg_cols)), shape=(len(self.positions), len(self.rows))
+        )
+
+    def relevant_line_counts(self, hit_matrix: sparse.csr_matrix) -> np.ndarray:
+        """
+        Líneas con al menos una coincidencia por fila (cargo·indicador).
+        """
+        relevant = (hit_matrix @ self.matrix.T) > 0
+        return np.asarray(relevant.sum(axis=0)).ravel()
+
+    def rank(self, lines: List[str]) -> List[Dict]:
+        """
+        Tabla de cargos ordenada de mayor a menor puntaje (promedio de sus indicadores).
+        """
+        total_lines = len(lines)
+        if total_lines and self.rows:
+            counts = self.relevant_line_counts(line_keyword_matrix(lines, self.keyword_matcher))
+            percentages = counts / total_lines * 100
+        else:
+            counts = np.zeros(len(self.rows), dtype=np.int64)
+            percentages = np.zeros(len(self.rows))
+        scores = self.position_average @ percentages if self.rows else np.zeros(len(self.positions))
+
+        table = {position: {"position": position, "score": round(float(scores[i]), 2), "indicators": {}}
+                 for i, position in enumerate(self.positions)}
+        for row, (position, indicator) in enumerate(self.rows):
+            table[position]["indicators"][indicator] = {
+                "percentage": round(float(percentages[row]), 2),
+                "relevant_lines": int(counts[row]),
+            }
+        return sorted(table.values(), key=lambda entry: entry["score"], reverse=True)
@@ -0,0 +1,169 @@
+# sections.py
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .matcher import KeywordMatcher, normalize_text
+
+
+# ---------------------------
+#  ENCABEZADOS CONOCIDOS Y REGLAS DE CADA EXTRACTOR
+# ---------------------------
+
+# Regla: (inicios en orden de preferencia, fines). La sección va desde el primer
+# inicio encontrado hasta el fin más cercano a partir de ese punto.
+SECTION_RULES: Dict[str, Tuple[Tuple[str, ...], Tuple[str, ...]]] = {
+    # Formato simplificado
+    "profile": (
+        ("perfil",),
+        ("asistencia a eventos", "actualización profesional", "asistencia eventos", "experiencia en aneiap"),
+    ),
+    "experience": (
+        ("experiencia en aneiap",),
+        ("eventos organizados", "reconocimientos individuales", "reconocimientos grupales",
+         "reconocimientos", "asistencia a eventos"),
+    ),
+    "events": (
+        ("eventos organizados",),
+        ("experiencia laboral", "firma", "reconocimientos", "asistencia a eventos"),
+    ),
+    "attendance": (
+        ("asistencia a eventos aneiap", "asistencia a eventos"),
+        ("actualización profesional", "experiencia en aneiap", "eventos organizados", "reconocimientos"),
+    ),
+    # Formato descriptivo
+    "profile_details": (
+        ("perfil",),
+        ("asistencia a eventos aneiap", "actualización profesional", "asistencia a eventos"),
+    ),
+    "experience_items": (
+        ("experiencia en aneiap",),
+        ("reconocimientos", "eventos organizados", "asistencia a eventos", "experiencia laboral"),
+    ),
+    "event_items": (
+        ("eventos organizados",),
+        ("firma", "experiencia laboral", "asistencia a eventos"),
+    ),
+    "attendance_items": (
+        ("asistencia a eventos aneiap", "asistencia a eventos"),
+        ("actualización profesional", "firma", "experiencia en aneiap"),
+    ),
+}
+
+SECTION_HEADERS: List[str] = list(dict.fromkeys(
+    phrase for starts, ends in SECTION_RULES.values() for phrase in starts + ends
+))
+
+# Un solo autómata con todos los encabezados (incluye los que se solapan,
+# p. ej. "reconocimientos" dentro de "reconocimientos grupales")
+_HEADER_MATCHER = KeywordMatcher(SECTION_HEADERS)
+_HEADER_LENGTHS = [len(kw) for kw in _HEADER_MATCHER.keywords]
+# Separa documentos en el recorrido por lotes; ningún encabezado lo contiene
+_DOC_SEPARATOR = "\x00"
+
+
+# ---------------------------
+#  TABLA DE POSICIONES DE ENCABEZADOS
+# ---------------------------
+
+class SectionTable:
+    """
+    Posiciones de todos los encabezados conocidos en un texto, obtenidas en una
+    sola pasada sobre el texto normalizado (minúsculas y sin tildes, misma longitud).
+    Los extractores recortan sus secciones de aquí sin volver a buscar.
+    """
+
+    def __init__(self, text: str, positions: Dict[int, List[int]]):
+        self.text = text
+        self._positions = positions  # id de encabezado -> inicios ordenados
+
+    def find(self, phrase: str, start: int = 0) -> int:
+        """
+        Primer inicio de `phrase` en o después de `start` (-1 si no aparece).
+        """
+        found = self._positions.get(_HEADER_MATCHER.keyword_id(phrase), ())
+        i = bisect_left(found, start)
+        return found[i] if i < len(found) else -1
+
+    def span(self, name: str) -> Optional[Tuple[int, int]]:
+        """
+        (inicio, fin) de la sección según SECTION_RULES, o None si no se encuentra.
+        """
+        starts, ends = SECTION_RULES[name]
+        for phrase in starts:
+            start_idx = self.find(phrase)
+            if start_idx != -1:
+                break
+        else:
+            return None
+
+        end_idx = len(self.text)
+        for phrase in ends:
+            idx = self.find(phrase, start_idx)
+            if idx != -1:
+                end_idx = min(end_idx, idx)
+        return start_idx, end_idx
+
+    def slice(self, name: str) -> Optional[str]:
+        """
+        Texto original de la sección, o None si no se encuentra.
+        """
+        bounds = self.span(name)
+        return self.text[bounds[0]:bounds[1]] if bounds else None
+
+
+def _scan(normalized: str, offsets: List[int]) -> List[Dict[int, List[int]]]:
+    """
+    Recorre el texto una vez y reparte los inicios de cada encabezado entre
+    los documentos que empiezan en `offsets`.
+    """
+    tables: List[Dict[int, List[int]]] = [{} for _ in offsets]
+    doc = 0
+    for end_pos, kw_id in _HEADER_MATCHER.iter_matches(normalized):
+        start = end_pos - _HEADER_LENGTHS[kw_id] + 1
+        while doc + 1 < len(offsets) and start >= offsets[doc + 1]:
+            doc += 1
+        tables[doc].setdefault(kw_id, []).append(start - offsets[doc])
+    return tables
+
+
+def segment_text(text: str) -> SectionTable:
+    """
+    Construye la tabla de secciones de un texto.
+    """
+    return SectionTable(text, _scan(normalize_text(text), [0])[0])
+
+
+def segment_texts(texts: Iterable[str]) -> List[SectionTable]:
+    """
+    Construye las tablas de varios textos con un único recorrido del autómata
+    sobre todos ellos (normalizados una sola vez, separados por un carácter nulo).
+    """
+    texts = list(texts)
+    if not texts:
+        return []
+    offsets, pos = [], 0
+    for text in texts:
+        offsets.append(pos)
+        pos += len(text) + len(_DOC_SEPARATOR)
+    normalized = normalize_text(_DOC_SEPARATOR.join(texts))
+    return [SectionTable(text, table) for text, table in zip(texts, _scan(normalized, offsets))]
+
+
+def get_section_table(cv) -> SectionTable:
+    """
+    Tabla de secciones de un ParsedCV (se calcula una vez y se guarda en el documento).
+    """
+    table = cv.cache.get("sections")
+    if table is None:
+        table = cv.cache["sections"] = segment_text(cv.text)
+    return table
+
+
+def segment_cvs(cvs) -> List[SectionTable]:
+    """
+    Calcula en un solo recorrido las tablas de varios ParsedCV que aún no la tienen.
+    """
+    pending = [cv for cv in cvs if "sections" not in cv.cache]
+    for cv, table in zip(pending, segment_texts(cv.text for cv in pending)):
+        cv.cache["sections"] = table
+    return [cv.cache["sections"] for cv in cvs]
@@ -0,0 +1,215 @@
+# similarity.py
+import hashlib
+import os
+import pickle
+import re
+import sys
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+from .cache import CACHE_DIR, _check_owner, private_dir
+from .indicators import IndicatorIndex, _lookup_key, get_indicator_index
+from .matcher import normalize_text
+
+
+# ============================================================
+# 🔹 CONFIGURACIÓN
+# ============================================================
+# El modelo es un pickle: va en la carpeta privada de caché, no junto al código
+SIMILARITY_MODEL_PATH = os.environ.get("SIMILARITY_MODEL_PATH", os.path.join(CACHE_DIR, "similarity_model.pkl"))
+MODEL_FORMAT = 2
+
+# sklearn solo trae stop words en inglés; van sin tildes porque clean_text las quita
+SPANISH_STOP_WORDS = [
+    "a", "al", "algo", "ante", "antes", "como", "con", "contra", "cual", "cuando", "de", "del",
+    "desde", "donde", "durante", "e", "el", "ella", "ellas", "ellos", "en", "entre", "era", "es",
+    "esa", "ese", "eso", "esta", "este", "esto", "fue", "ha", "han", "hasta", "hay", "la", "las",
+    "le", "les", "lo", "los", "mas", "me", "mi", "mis", "muy", "no", "nos", "o", "para", "pero",
+    "por", "que", "se", "sin", "sobre", "son", "su", "sus", "tambien", "te", "tu", "un", "una",
+    "uno", "unos", "y", "ya", "yo",
+]
+
+
+def clean_text(text: str) -> str:
+    """
+    Quita signos de puntuación y tildes, colapsa espacios y pasa a minúsculas
+    (la misma normalización de las palabras clave, ver normalize_text).
+    """
+    text = re.sub(r"[^\w\s]", "", normalize_text(text))
+    return re.sub(r"\s+", " ", text).strip()
+
+
+# ============================================================
+# 🔹 CORPUS DE CARGOS
+# ============================================================
+def position_texts(index: IndicatorIndex) -> Dict[Tuple[str, str], str]:
+    """
+    Texto de cada (capítulo, cargo): nombres de indicadores, palabras clave y consejos.
+    """
+    advice_by_position = {_lookup_key(name): value for name, value in index.advice.items()}
+    texts = {}
+    for chapter, positions in index.data.items():
+        for position, indicators in positions.items():
+            parts = []
+            for indicator, keywords in indicators.items():
+                parts.append(indicator)
+                parts.extend(keywords)
+            advice = advice_by_position.get(_lookup_key(position), {})
+            if isinstance(advice, dict):
+                for tips in advice.values():
+                    parts.extend(tips if isinstance(tips, list) else [str(tips)])
+            texts[(chapter, position)] = clean_text(" ".join(parts))
+    return texts
+
+
+# ============================================================
+# 🔹 SERVICIO DE SIMILITUD (TF-IDF AJUSTADO UNA SOLA VEZ)
+# ============================================================
+class SimilarityService:
+    """
+    Vectorizador TF-IDF ajustado una vez sobre el corpus (textos de cargos y
+    hojas de vida anteriores) con los vectores de los cargos ya calculados en
+    una matriz dispersa. Puntuar un candidato contra uno o todos los cargos es
+    una sola transformación y un producto disperso. Capítulos y cargos se
+    buscan sin distinguir mayúsculas, igual que en IndicatorIndex.
+    `index_version` es la versión del índice con la que se ajustó.
+    """
+
+    def __init__(self, vectorizer: TfidfVectorizer, position_keys: List[Tuple[str, str]], position_matrix,
+                 version: str, index_version: str):
+        self.vectorizer = vectorizer
+        self.position_keys = position_keys
+        self.position_matrix = position_matrix  # filas normalizadas L2
+        self.version = version
+        self.index_version = index_version
+        self._rows = {(_lookup_key(chapter), _lookup_key(position)): i
+                      for i, (chapter, position) in enumerate(position_keys)}
+
+    @classmethod
+    def fit(cls, index: IndicatorIndex, past_cvs: Iterable[str] = ()) -> "SimilarityService":
+        """
+        Ajusta el vectorizador. Es la única operación costosa y debe llamarse de forma explícita.
+        """
+        positions = position_texts(index)
+        cvs = [clean_text(text) for text in past_cvs if text]
+        corpus = list(positions.values()) + [text for text in cvs if text]
+
+        h = hashlib.sha256(index.version.encode())
+        for text in cvs:
+            h.update(hashlib.sha256(text.encode()).digest())
+        version = h.hexdigest()[:16]
+
+        vectorizer = TfidfVectorizer(ngram_range=(1, 2), stop_words=SPANISH_STOP_WORDS)
+        vectorizer.fit(corpus)
+        keys = list(positions)
+        return cls(vectorizer, keys, vectorizer.transform([positions[k] for k in keys]).tocsr(), version,
+                   index.version)
+
+    def _vectorize(self, texts: List[str]):
+        return self.vectorizer.transform([clean_text(t) for t in texts])
+
+    def similarity(self, text1: str, text2: str) -> float:
+        """
+        Similitud coseno (0 a 100) entre dos textos con el vocabulario ajustado.
+        """
+        vectors = self._vectorize([text1, text2])
+        return round(float(vectors[0].multiply(vectors[1]).sum()) * 100, 2)
+
+    def score_all(self, text: str, chapter: Optional[str] = None) -> Dict[Tuple[str, str], float]:
+        """
+        Similitud del candidato contra todos los cargos (o los de un capítulo).
+        """
+        scores = (self.position_matrix @ self._vectorize([text]).T).toarray().ravel()
+        wanted = _lookup_key(chapter) if chapter is not None else None
+        return {
+            key: round(float(scores[i]) * 100, 2)
+            for i, key in enumerate(self.position_keys)
+            if wanted is None or _lookup_key(key[0]) == wanted
+        }
+
+    def score(self, text: str, chapter: str, position: str) -> float:
+        """
+        Similitud del candidato contra un cargo.
+        """
+        row = self._rows.get((_lookup_key(chapter), _lookup_key(position)))
+        if row is None:
+            return 0.0
+        scores = self.position_matrix[row] @ self._vectorize([text]).T
+        return round(float(scores.toarray()[0, 0]) * 100, 2)
+
+    def save(self, path: str = SIMILARITY_MODEL_PATH):
+        private_dir(os.path.dirname(path) or ".")
+        tmp_path = f"{path}.tmp{os.getpid()}"
+        with open(tmp_path, "wb") as f:
+            pickle.dump((MODEL_FORMAT, self), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def load(path: str = SIMILARITY_MODEL_PATH,
+             expected_version: Optional[str] = None) -> Optional["SimilarityService"]:
+        """
+        Carga un modelo guardado. Retorna None si no existe, es de otro formato
+        o se ajustó con otra versión de indicadores (`expected_version`).
+        """
+        try:
+            _check_owner(path)
+            with open(path, "rb") as f:
+                fmt, service = pickle.load(f)
+        except Exception:
+            return None
+        if fmt != MODEL_FORMAT:
+            return None
+        if expected_version and service.index_version != expected_version:
+            print(f"⚠️ El modelo de similitud en {path} es de otra versión de indicadores; se descarta.")
+            return None
+        return service
+
+
+_service: Optional[SimilarityService] = None
+_service_lock = threading.Lock()
+
+
+def get_similarity_service() -> SimilarityService:
+    """
+    Retorna el servicio del proceso: el modelo guardado si corresponde a la
+    versión vigente de indicadores; si no, uno ajustado sobre los textos de
+    cargos. Si los indicadores se recargan, se vuelve a ajustar.
+    """
+    global _service
+    index = get_indicator_index()
+    with _service_lock:
+        if _service is None or _service.index_version != index.version:
+            _service = SimilarityService.load(expected_version=index.version) or SimilarityService.fit(index)
+        return _service
+
+
+def refit_similarity_service(past_cvs: Iterable[str] = (), path: str = SIMILARITY_MODEL_PATH) -> SimilarityService:
+    """
+    Reajusta el modelo (nueva versión), lo guarda y lo deja como servicio vigente.
+    """
+    global _service
+    service = SimilarityService.fit(get_indicator_index(), past_cvs)
+    service.save(path)
+    with _service_lock:
+        _service = service
+    print(f"✅ Modelo de similitud ajustado (versión {service.version}).")
+    return service
+
+
+if __name__ == "__main__":
+    # Uso: python -m utils.similarity <carpeta_con_hojas_de_vida_pdf>
+    from .document import parse_cv
+
+    folder = sys.argv[1] if len(sys.argv) > 1 else None
+    pdfs = sorted(os.path.join(folder, name) for name in os.listdir(folder) if name.lower().endswith(".pdf")) if folder else []
+
+    def past_texts():
+        for pdf in pdfs:
+            try:
+                yield parse_cv(pdf).text
+            except ValueError as e:
+                print(f"⚠️ {e}")
+
+    refit_similarity_service(past_texts())
@@ -0,0 +1,328 @@
+# uploads.py
+import hashlib
+import os
+import tempfile
+import zipfile
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional, Tuple, Union
+
+try:
+    from python_multipart.multipart import MultipartParser, parse_options_header
+except ImportError:  # python-multipart < 0.0.13
+    from multipart.multipart import MultipartParser, parse_options_header
+
+from .cache import CACHE_DIR, private_dir
+
+
+# ============================================================
+# 🔹 CONFIGURACIÓN
+# ============================================================
+# Por debajo de este tamaño el archivo no toca el disco
+UPLOAD_MAX_MEMORY_MB = float(os.environ.get("UPLOAD_MAX_MEMORY_MB", "8"))
+# Tamaño máximo aceptado por archivo
+UPLOAD_MAX_MB = float(os.environ.get("UPLOAD_MAX_MB", "25"))
+UPLOAD_SPOOL_DIR = os.environ.get("UPLOAD_SPOOL_DIR", os.path.join(CACHE_DIR, "uploads"))
+UPLOAD_CHUNK_SIZE = 64 * 1024
+# Límites del formulario: tamaño de cada campo de texto, partes por solicitud
+# y encabezados por parte (un cliente no puede llenar la memoria con ellos)
+UPLOAD_MAX_FIELD_KB = float(os.environ.get("UPLOAD_MAX_FIELD_KB", "64"))
+UPLOAD_MAX_PARTS = int(os.environ.get("UPLOAD_MAX_PARTS", "1000"))
+UPLOAD_MAX_HEADER_BYTES = 16 * 1024
+
+
+class UploadTooLargeError(ValueError):
+    """
+    El archivo recibido supera UPLOAD_MAX_MB.
+    """
+
+
+# ============================================================
+# 🔹 BÚFER DE CARGA (memoria, con desborde a disco)
+# ============================================================
+class UploadBuffer:
+    """
+    Recibe un archivo por partes y calcula su SHA-256 mientras llega.
+    Lo guarda en memoria y solo lo pasa a un archivo temporal si supera
+    `max_memory` bytes. `source()` entrega los bytes o la ruta para parse_cv.
+    """
+
+    def __init__(self, max_memory: int = int(UPLOAD_MAX_MEMORY_MB * 1024 * 1024),
+                 max_size: int = int(UPLOAD_MAX_MB * 1024 * 1024), spool_dir: str = UPLOAD_SPOOL_DIR):
+        self.max_memory = max_memory
+        self.max_size = max_size
+        self.spool_dir = spool_dir
+        self.size = 0
+        self.path: Optional[str] = None
+        self._tmp_path: Optional[str] = None
+        self._hash = hashlib.sha256()
+        self._memory = bytearray()
+        self._file = None
+
+    @property
+    def in_memory(self) -> bool:
+        return self.path is None
+
+    @property
+    def digest(self) -> str:
+        return self._hash.hexdigest()
+
+    def write(self, chunk: bytes):
+        self.size += len(chunk)
+        if self.size > self.max_size:
+            raise UploadTooLargeError(f"El archivo supera {self.max_size // (1024 * 1024)} MB.")
+        self._hash.update(chunk)
+        if self._file is not None:
+            self._file.write(chunk)
+        elif self.size > self.max_memory:
+            private_dir(self.spool_dir)
+            self._file = tempfile.NamedTemporaryFile(dir=self.spool_dir, suffix=".pdf", delete=False)
+            self.path = self._tmp_path = self._file.name
+            self._file.write(self._memory)
+            self._file.write(chunk)
+            self._memory = bytearray()
+        else:
+            self._memory += chunk
+
+    def finish(self):
+        """
+        Cierra el archivo temporal (si lo hay); se llama al terminar de recibir.
+        """
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def getvalue(self) -> bytes:
+        return bytes(self._memory)
+
+    def source(self) -> Union[bytes, str]:
+        return self.getvalue() if self.in_memory else self.path
+
+    def move_to(self, path: str) -> str:
+        """
+        Deja el contenido en `path`: renombra el temporal o escribe los bytes.
+        """
+        self.finish()
+        if self.in_memory:
+            with open(path, "wb") as f:
+                f.write(self._memory)
+        else:
+            os.replace(self.path, path)
+            self._tmp_path = None
+        self.path = path
+        return path
+
+    def close(self):
+        """
+        Libera la memoria y borra el temporal si no se movió.
+        """
+        self.finish()
+        if self._tmp_path:
+            try:
+                os.remove(self._tmp_path)
+            except OSError:
+                pass
+            self._tmp_path = None
+        self._memory = bytearray()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# ============================================================
+# 🔹 LECTURA DE FORMULARIOS MULTIPART EN STREAMING
+# ============================================================
+async def _read_multipart(content_type: str, chunks: AsyncIterator[bytes],
+                          new_upload: Callable[[str, str], Optional[UploadBuffer]],
+                          max_field_size: int = int(UPLOAD_MAX_FIELD_KB * 1024),
+                          max_parts: int = UPLOAD_MAX_PARTS) -> Dict[str, str]:
+    """
+    Lee un cuerpo multipart/form-data a medida que llega. Los campos de texto
+    quedan en un diccionario; cada parte con archivo va al búfer que retorne
+    `new_upload(campo, nombre)` (None la trata como campo de texto). Un campo
+    de texto (o un archivo sin búfer) de más de `max_field_size` bytes lanza
+    UploadTooLargeError; más de `max_parts` partes o encabezados demasiado
+    largos, ValueError. Si algo falla, cierra los búferes que abrió y relanza el error.
+    """
+    ctype, options = parse_options_header(content_type)
+    boundary = options.get(b"boundary")
+    if ctype != b"multipart/form-data" or not boundary:
+        raise ValueError("Se esperaba un formulario multipart/form-data.")
+
+    fields: Dict[str, str] = {}
+    state = {"headers": {}, "field": None, "value": bytearray(), "header": b"", "upload": None,
+             "parts": 0, "header_bytes": 0}
+    opened: List[UploadBuffer] = []
+
+    def count_header_bytes(size):
+        state["header_bytes"] += size
+        if state["header_bytes"] > UPLOAD_MAX_HEADER_BYTES:
+            raise ValueError("Encabezados de una parte del formulario demasiado largos.")
+
+    def on_part_begin():
+        state["parts"] += 1
+        if state["parts"] > max_parts:
+            raise ValueError(f"El formulario supera {max_parts} partes.")
+        state["header_bytes"] = 0
+        state["headers"] = {}
+        state["value"] = bytearray()
+        state["field"] = None
+        state["upload"] = None
+
+    def on_header_field(data, start, end):
+        count_header_bytes(end - start)
+        state["header"] += data[start:end]
+
+    def on_header_value(data, start, end):
+        count_header_bytes(end - start)
+        name = state["header"].lower()
+        state["headers"][name] = state["headers"].get(name, b"") + data[start:end]
+
+    def on_header_end():
+        state["header"] = b""
+
+    def on_headers_finished():
+        _, disposition = parse_options_header(state["headers"].get(b"content-disposition", b""))
+        state["field"] = disposition.get(b"name", b"").decode("utf-8", "replace")
+        if b"filename" in disposition:
+            upload = new_upload(state["field"], disposition[b"filename"].decode("utf-8", "replace"))
+            if upload is not None:
+                opened.append(upload)
+                state["upload"] = upload
+
+    def on_part_data(data, start, end):
+        if state["upload"] is not None:
+            state["upload"].write(data[start:end])
+        else:
+            if len(state["value"]) + end - start > max_field_size:
+                raise UploadTooLargeError(
+                    f"El campo '{state['field']}' supera {max_field_size // 1024} KB."
+                )
+            state["value"] += data[start:end]
+
+    def on_part_end():
+        if state["upload"] is not None:
+            state["upload"].finish()
+        elif state["field"]:
+            fields[state["field"]] = state["value"].decode("utf-8", "replace")
+
+    parser = MultipartParser(boundary, {
+        "on_part_begin": on_part_begin,
+        "on_header_field": on_header_field,
+        "on_header_value": on_header_value,
+        "on_header_end": on_header_end,
+        "on_headers_finished": on_headers_finished,
+        "on_part_data": on_part_data,
+        "on_part_end": on_part_end,
+    })
+    try:
+        async for chunk in chunks:
+            parser.write(chunk)
+        parser.finalize()
+    except BaseException:
+        for upload in opened:
+            upload.close()
+        raise
+    return fields
+
+
+async def receive_multipart(content_type: str, chunks: AsyncIterator[bytes],
+                            file_field: str = "pdf") -> Tuple[Dict[str, str], Optional[UploadBuffer], Optional[str]]:
+    """
+    Lee un formulario con un solo archivo: el campo `file_field` va directo a
+    un UploadBuffer (hash incluido). Retorna (campos, búfer o None, nombre del archivo).
+    """
+    received: Dict[str, Any] = {"upload": None, "filename": None}
+
+    def new_upload(field, filename):
+        if field != file_field:
+            return None
+        if received["upload"] is not None:
+            received["upload"].close()
+        received["upload"], received["filename"] = UploadBuffer(), filename
+        return received["upload"]
+
+    fields = await _read_multipart(content_type, chunks, new_upload)
+    return fields, received["upload"], received["filename"]
+
+
+async def receive_multipart_files(content_type: str, chunks: AsyncIterator[bytes], spool_dir: str,
+                                  file_fields: Tuple[str, ...] = ("pdf", "archive"),
+                                  max_size: int = int(UPLOAD_MAX_MB * 1024 * 1024),
+                                  max_files: int = 100,
+                                  max_field_size: int = int(UPLOAD_MAX_FIELD_KB * 1024)
+                                  ) -> Tuple[Dict[str, str], List[Tuple[str, UploadBuffer]]]:
+    """
+    Lee un formulario con varios archivos y los escribe directo en `spool_dir`
+    (nada queda en memoria, sin importar cuántos lleguen). Retorna
+    (campos, [(nombre del archivo, búfer)]) en el orden de llegada.
+    `max_field_size` permite campos de texto más grandes (p. ej. metadatos por archivo).
+    """
+    files: List[Tuple[str, UploadBuffer]] = []
+
+    def new_upload(field, filename):
+        # Un campo de archivo sin nombre es un selector vacío del formulario
+        if field not in file_fields or not filename:
+            return None
+        if len(files) >= max_files:
+            raise ValueError(f"Se aceptan como máximo {max_files} archivos por solicitud.")
+        upload = UploadBuffer(max_memory=0, max_size=max_size, spool_dir=spool_dir)
+        files.append((filename, upload))
+        return upload
+
+    fields = await _read_multipart(content_type, chunks, new_upload, max_field_size=max_field_size,
+                                   max_parts=max(UPLOAD_MAX_PARTS, max_files + 50))
+    return fields, files
+
+
+# ============================================================
+# 🔹 PDFs DE UN LOTE (sueltos o dentro de archivos ZIP)
+# ============================================================
+def iter_batch_pdfs(files: List[Tuple[str, UploadBuffer]], dest_dir: str,
+                    max_size: int = int(UPLOAD_MAX_MB * 1024 * 1024),
+                    max_files: int = 500) -> Iterator[Dict[str, Any]]:
+    """
+    Recorre los archivos recibidos y entrega un PDF a la vez como
+    {"name", "path", "sha256"} o {"name", "error"}. Los ZIP se extraen de a un
+    miembro por iteración (en trozos, calculando el hash), así el disco y la
+    memoria solo cargan lo que se está procesando. Omite carpetas y archivos ocultos.
+    """
+    count = 0
+    for filename, upload in files:
+        if upload.path is None:
+            yield {"name": filename, "error": "Archivo vacío."}
+            continue
+        if not zipfile.is_zipfile(upload.path):
+            count += 1
+            if count > max_files:
+                yield {"name": filename, "error": f"El lote supera {max_files} archivos."}
+                continue
+            yield {"name": filename, "path": upload.path, "sha256": upload.digest}
+            continue
+
+        with zipfile.ZipFile(upload.path) as archive:
+            for info in archive.infolist():
+                base = os.path.basename(info.filename)
+                if info.is_dir() or not base or base.startswith(".") or "__MACOSX" in info.filename:
+                    continue
+                count += 1
+                if count > max_files:
+                    yield {"name": info.filename, "error": f"El lote supera {max_files} archivos."}
+                    continue
+                if not base.lower().endswith(".pdf"):
+                    yield {"name": info.filename, "error": "No es un archivo PDF."}
+                    continue
+                if info.file_size > max_size:
+                    yield {"name": info.filename, "error": f"El archivo supera {max_size // (1024 * 1024)} MB."}
+                    continue
+                try:
+                    with archive.open(info) as src, UploadBuffer(max_memory=0, max_size=max_size,
+                                                                 spool_dir=dest_dir) as buffer:
+                        for chunk in iter(lambda: src.read(UPLOAD_CHUNK_SIZE), b""):
+                            buffer.write(chunk)
+                        path = buffer.move_to(os.path.join(dest_dir, f"{count:05d}.pdf"))
+                except (zipfile.BadZipFile, UploadTooLargeError, OSError, RuntimeError) as e:
+                    yield {"name": info.filename, "error": f"No se pudo extraer: {e}"}
+                    continue
+                yield {"name": info.filename, "path": path, "sha256": buffer.digest}
@@ -0,0 +1,281 @@
+import io
+import os
+import re
+import zlib
+from functools import lru_cache
+from typing import Tuple
+
+import fitz  # PyMuPDF
+from PIL import Image
+from reportlab.lib.pagesizes import letter
+from reportlab.lib import colors
+from reportlab.lib.styles import ParagraphStyle
+from reportlab.lib.utils import ImageReader
+
+from .ocr import OCR_HYBRID, get_ocr_engine, page_image_blocks, preprocess_image
+from .similarity import clean_text, get_similarity_service
+
+
+# ============================================================
+# 🔹 EXTRACCIÓN DE TEXTO DESDE PDF (OCR + TEXTO EMBEBIDO)
+# ============================================================
+def _block_text(block):
+    """
+    Texto de un bloque de `get_text("dict")`: sus líneas, una por renglón.
+    """
+    return "\n".join("".join(span["text"] for span in line["spans"]) for line in block["lines"])
+
+
+def layout_text(layout):
+    """
+    Texto plano de una página a partir de su `get_text("dict")` (el mismo de
+    get_text("text")), sin volver a recorrer la página.
+    """
+    return "\n".join(_block_text(block) for block in layout["blocks"] if block["type"] == 0).strip()
+
+
+def _merge_in_reading_order(layout, image_texts):
+    """
+    Intercala el texto reconocido de cada imagen [(bbox, texto)] entre los bloques
+    de texto embebido de la página (su `get_text("dict")`), según su posición vertical.
+    """
+    pending = sorted((bbox.y0, text) for bbox, text in image_texts if text)
+    parts = []
+    for block in layout["blocks"]:
+        if block["type"] != 0:  # solo bloques de texto
+            continue
+        while pending and pending[0][0] < block["bbox"][1]:
+            parts.append(pending.pop(0)[1])
+        parts.append(_block_text(block).strip())
+    parts.extend(text for _, text in pending)
+    return "\n".join(part for part in parts if part).strip()
+
+
+def extract_pages_with_ocr(doc, on_page=None, layouts=None):
+    """
+    Extrae el texto de cada página de un documento ya abierto.
+    Usa el texto embebido y envía al motor OCR (en paralelo) solo las páginas sin texto.
+    En páginas híbridas (texto + imágenes con texto) conserva la capa de texto y
+    reconoce solo las imágenes embebidas, a su resolución nativa.
+    Texto, imágenes y orden de los bloques salen de una sola pasada de
+    `get_text("dict")` por página; `layouts` permite entregar esas pasadas ya
+    hechas (una por página, ver parse_cv).
+    Retorna una lista con el texto de cada página, en orden.
+    `on_page(número)` se llama cuando el texto de cada página queda listo.
+    """
+    on_page = on_page or (lambda number: None)
+    pages_text = []
+    ocr_pending = []
+    hybrid_pending = []  # (página, dict de la página, [(bbox, imagen)])
+    for page in doc:
+        # Intentar obtener texto directo
+        layout = layouts[page.number] if layouts is not None else page.get_text("dict")
+        page_text = layout_text(layout)
+        if not page_text:  # Si no hay texto, usar OCR
+            ocr_pending.append(page)
+        elif OCR_HYBRID:
+            blocks = page_image_blocks(page, layout)
+            if blocks:
+                hybrid_pending.append((page, layout, blocks))
+        pages_text.append(page_text)
+        if page_text and not (hybrid_pending and hybrid_pending[-1][0] is page):
+            on_page(page.number)
+
+    engine = get_ocr_engine() if ocr_pending or hybrid_pending else None
+    if ocr_pending:
+        def page_done(i, page_text):
+            pages_text[ocr_pending[i].number] = page_text
+            on_page(ocr_pending[i].number)
+
+        engine.ocr_pages(ocr_pending, on_page=page_done)
+
+    if hybrid_pending:
+        # Cada imagen se reconoce una sola vez aunque se repita en varias páginas
+        images = list(dict.fromkeys(image for _, _, blocks in hybrid_pending for _, image in blocks))
+        texts = dict(zip(images, engine.ocr_images(images)))
+        for page, layout, blocks in hybrid_pending:
+            image_texts = [(bbox, texts.get(image, "")) for bbox, image in blocks]
+            if any(text for _, text in image_texts):
+                pages_text[page.number] = _merge_in_reading_order(layout, image_texts)
+            on_page(page.number)
+    return pages_text
+
+
+def extract_text_with_ocr(pdf_path):
+    """
+    Extrae texto de un PDF utilizando PyMuPDF y OCR si es necesario.
+    """
+    with fitz.open(pdf_path) as doc:
+        return "\n".join(extract_pages_with_ocr(doc))
+
+
+# ============================================================
+# 🔹 LIMPIEZA DE TEXTO EXTRAÍDO
+# ============================================================
+def extract_cleaned_lines(text):
+    """
+    Limpia el texto extraído eliminando líneas vacías, errores de OCR,
+    números de página y caracteres no alfanuméricos.
+    """
+    if isinstance(text, list):
+        text = "\n".join(text)
+
+    lines = text.split("\n")
+    cleaned_lines = []
+
+    for line in lines:
+        line = line.strip()
+        if not line or not any(char.isalnum() for char in line):
+            continue
+        if re.fullmatch(r"\d+", line):
+            continue
+        if len(line) < 3:
+            continue
+        cleaned_lines.append(line)
+
+    return cleaned_lines
+
+
+# ============================================================
+# 🔹 CÁLCULO DE SIMILITUD ENTRE TEXTOS
+# ============================================================
+def calculate_similarity(text1, text2):
+    """
+    Calcula la similitud entre dos textos con TF-IDF + Cosine Similarity.
+    Usa el vectorizador compartido (ajustado una vez sobre el corpus de cargos).
+    Retorna el porcentaje de similitud (0 a 100).
+    """
+    if not isinstance(text1, str) or not isinstance(text2, str):
+        return 0
+
+    if not clean_text(text1) or not clean_text(text2):
+        return 0
+
+    try:
+        return get_similarity_service().similarity(text1, text2)
+    except Exception:
+        return 0
+
+
+# ============================================================
+# 🔹 CÁLCULO DE COINCIDENCIA POR PALABRAS CLAVE
+# ============================================================
+def calculate_keyword_match_percentage(candidate_text, position_indicators, functions_text, profile_text):
+    """
+    Calcula coincidencia por palabras clave para 'Funciones' y 'Perfil del cargo'.
+    Retorna: (porcentaje_funciones, porcentaje_perfil)
+    """
+    if not candidate_text or not isinstance(candidate_text, str):
+        return (0.0, 0.0)
+
+    if not position_indicators or not isinstance(position_indicators, dict):
+        return (0.0, 0.0)
+
+    function_keywords = []
+    profile_keywords = []
+
+    for indicator, keywords in position_indicators.items():
+        if functions_text and indicator.lower() in functions_text.lower():
+            function_keywords.extend(keywords)
+        if profile_text and indicator.lower() in profile_text.lower():
+            profile_keywords.extend(keywords)
+
+    def keyword_match_score(keywords, text):
+        if not keywords:
+            return 0.0
+        found = sum(1 for kw in keywords if kw.lower() in text.lower())
+        return round((found / len(keywords)) * 100, 2)
+
+    func_match = keyword_match_score(function_keywords, candidate_text)
+    profile_match = keyword_match_score(profile_keywords, candidate_text)
+
+    return func_match, profile_match
+
+
+# ============================================================
+# 🔹 IMÁGENES DEL REPORTE (reducidas una vez por proceso)
+# ============================================================
+# Resolución a la que se guardan las imágenes de página completa del reporte
+REPORT_IMAGE_DPI = int(os.environ.get("REPORT_IMAGE_DPI", "110"))
+REPORT_JPEG_QUALITY = int(os.environ.get("REPORT_JPEG_QUALITY", "80"))
+
+
+@lru_cache(maxsize=16)
+def load_report_image(path: str, dpi: int = REPORT_IMAGE_DPI) -> Tuple[bytes, Tuple[int, int]]:
+    """
+    Lee una imagen de página completa, la aplana sobre blanco, la reduce a
+    `dpi` sobre una hoja carta y la comprime como JPEG. Retorna (bytes, tamaño);
+    se calcula una sola vez por proceso y ruta.
+    """
+    with Image.open(path) as img:
+        img = img.convert("RGBA")
+        flat = Image.new("RGB", img.size, "white")
+        flat.paste(img, mask=img.getchannel("A"))
+    # Suficiente para cubrir la página carta
+    scale = max(letter[0] / 72 * dpi / flat.width, letter[1] / 72 * dpi / flat.height)
+    if scale < 1:
+        flat = flat.resize((round(flat.width * scale), round(flat.height * scale)), Image.LANCZOS)
+    buffer = io.BytesIO()
+    flat.save(buffer, "JPEG", quality=REPORT_JPEG_QUALITY, optimize=True)
+    return buffer.getvalue(), flat.size
+
+
+def _page_image_form(canvas, path: str) -> str:
+    """
+    Define (una vez por documento) un XObject con la imagen estirada a página
+    completa y retorna su nombre: las páginas siguientes solo lo referencian.
+    """
+    name = f"page_image_{zlib.crc32(path.encode('utf-8')):08x}"
+    if canvas.hasForm(name):
+        return name
+    data, _ = load_report_image(path)
+    canvas.beginForm(name)
+    canvas.drawImage(ImageReader(io.BytesIO(data)), 0, 0, width=letter[0], height=letter[1])
+    canvas.endForm()
+    return name
+
+
+# ============================================================
+# 🔹 PORTADA DEL REPORTE
+# ============================================================
+def draw_full_page_cover(canvas, portada_path, candidate_name, position, chapter):
+    """
+    Dibuja una portada con imagen a página completa y texto centrado.
+    """
+    page_width, page_height = letter
+    img = ImageReader(portada_path)
+    img_width, img_height = img.getSize()
+    scale = max(page_width / img_width, page_height / img_height)
+    new_w, new_h = img_width * scale, img_height * scale
+    x_offset = (page_width - new_w) / 2
+    y_offset = (page_height - new_h) / 2
+    canvas.drawImage(portada_path, x_offset, y_offset, width=new_w, height=new_h)
+
+    canvas.setFont("Helvetica-Bold", 36)
+    canvas.setFillColor(colors.black)
+    lines = [
+        "REPORTE DE ANÁLISIS",
+        candidate_name.upper(),
+        f"CARGO: {position.upper()}",
+        f"CAPÍTULO: {chapter.upper()}",
+    ]
+    total_height = len(lines) * 40
+    start_y = (page_height + total_height) / 2 - 100
+    for i, line in enumerate(lines):
+        line_width = canvas.stringWidth(line, "Helvetica-Bold", 36)
+        x = (page_width - line_width) / 2
+        y = start_y - (i * 45)
+        canvas.drawString(x, y, line)
+
+
+# ============================================================
+# 🔹 FONDO DE PÁGINAS
+# ============================================================
+def add_background(canvas, background_path):
+    """
+    Dibuja una imagen de fondo en cada página del PDF. La imagen se guarda
+    una sola vez en el documento y cada página la referencia.
+    """
+    canvas.saveState()
+    canvas.doForm(_page_image_form(canvas, background_path))
+    canvas.restoreState()